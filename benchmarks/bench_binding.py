@@ -0,0 +1,42 @@
+"""Binding of handler arguments from the context per dispatch: `magic_bundle` (walks all context keys)
+against a precompiled `BindingPlan` (looks up only the parameter names).
+
+Run with `python -m benchmarks.bench_binding`.
+"""
+
+import timeit
+
+from mubble.bot.dispatch.context import Context
+from mubble.tools.magic import get_binding_plan, magic_bundle
+
+CONTEXT_SIZE = 30
+NUMBER = 100_000
+
+
+async def handler(message: object, user_id: int, name: str, lang: str = "en", *, limit: int = 10) -> None:
+    pass
+
+
+def make_context() -> Context:
+    ctx = Context(**{f"key_{i}": i for i in range(CONTEXT_SIZE - 2)})
+    ctx |= {"user_id": 1, "name": "bob"}
+    return ctx
+
+
+def main() -> None:
+    ctx = make_context()
+    plan = get_binding_plan(handler)
+    assert plan.bind(ctx) == magic_bundle(handler, ctx)
+
+    results = {
+        "magic_bundle": timeit.timeit(lambda: magic_bundle(handler, ctx), number=NUMBER),
+        "BindingPlan.bind": timeit.timeit(lambda: plan.bind(ctx), number=NUMBER),
+        "get_binding_plan + bind": timeit.timeit(lambda: get_binding_plan(handler).bind(ctx), number=NUMBER),
+    }
+    print(f"Binding handler arguments from a {len(ctx)}-key context:")
+    for name, seconds in results.items():
+        print(f"  {name:<25} {seconds / NUMBER * 1e6:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
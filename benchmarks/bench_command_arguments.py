@@ -0,0 +1,86 @@
+"""Adversarial `Command.parse_arguments`: arguments of repeated "w" tokens which no split can satisfy,
+parsed by `ArgumentsParser` against the previous recursive search over every split.
+
+Run with `python -m benchmarks.bench_command_arguments`.
+"""
+
+import time
+import typing
+
+from mubble.bot.rules.command import Argument, Command
+
+PREVIOUS_MAX_TOKENS = 26
+"""The previous search is exponential, so it is skipped for more tokens."""
+
+
+def to_int(s: str) -> int | None:
+    return int(s) if s.isdigit() else None
+
+
+# The first argument takes any text, the optional ones take any text too and the last one
+# needs a number, so every split is a dead end and the whole search space is visited.
+ARGUMENTS = (
+    Argument("first"),
+    *(Argument(f"optional_{i}", optional=True) for i in range(4)),
+    Argument("number", [to_int]),
+)
+
+
+class PreviousCommand(Command):
+    """`Command` with the non-lazy parsing as it was before `ArgumentsParser`."""
+
+    def parse_arguments(self, arguments: list[Argument], s: str) -> dict[str, typing.Any] | None:
+        if not arguments:
+            return {} if not s else None
+
+        if self.lazy:
+            return super().parse_arguments(arguments, s)
+
+        all_split = s.split(self.separator)
+        for i in range(1, len(all_split) + 1):
+            ctx = self.parse_argument(
+                arguments,
+                self.separator.join(all_split[:i]),
+                self.separator.join(all_split[i:]),
+                s,
+            )
+            if ctx is not None:
+                return ctx
+
+        return None
+
+
+def measure(command: Command, arguments: typing.Sequence[Argument], s: str) -> tuple[float, dict | None]:
+    start = time.perf_counter()
+    result = command.parse_arguments(list(arguments), s)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    commands = {
+        "recursive (previous)": PreviousCommand("cmd"),
+        "ArgumentsParser": Command("cmd"),
+        "ArgumentsParser, max_tokens=64": Command("cmd", max_tokens=64),
+    }
+
+    for arguments, counts in ((ARGUMENTS, (8, 12, 16, 100, 1000)), (ARGUMENTS[-4:], (26, 2000))):
+        print(f"{len(arguments)} arguments ({sum(argument.optional for argument in arguments)} optional):")
+        for count in counts:
+            s = " ".join("w" * count)
+            timings = []
+            for name, command in commands.items():
+                if isinstance(command, PreviousCommand) and count > PREVIOUS_MAX_TOKENS:
+                    timings.append(f"{name} skipped")
+                    continue
+                elapsed, result = measure(command, arguments, s)
+                assert result is None
+                timings.append(f"{name} {elapsed * 1e3:.2f} ms")
+            print(f"  {count:>5} tokens: " + ", ".join(timings))
+
+    s = "42 " * 20 + "7"
+    results = {name: command.parse_arguments(list(ARGUMENTS), s) for name, command in commands.items()}
+    assert len({repr(result) for result in results.values()}) == 1, results
+
+
+if __name__ == "__main__":
+    main()
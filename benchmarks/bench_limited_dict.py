@@ -0,0 +1,79 @@
+"""Registering and then releasing waiters in random order in the `LimitedDict` of `WaiterMachine`:
+the previous dict + deque implementation (linear search and removal in the deque) against
+the current `OrderedDict` LRU.
+
+The previous implementation is quadratic, it is only run for 10k waiters (100k waiters take about a minute).
+Run with `python -m benchmarks.bench_limited_dict`.
+"""
+
+import random
+import time
+import typing
+from collections import UserDict, deque
+
+from mubble.tools.limited_dict import LimitedDict
+
+SIZES = (10_000, 100_000)
+PREVIOUS_MAX_SIZE = 10_000
+
+
+class DequeLimitedDict[Key, Value](UserDict[Key, Value]):
+    """`LimitedDict` before the `OrderedDict` rewrite."""
+
+    def __init__(self, *, maxlimit: int = 1000) -> None:
+        super().__init__()
+        self.maxlimit = maxlimit
+        self.queue: deque[Key] = deque(maxlen=maxlimit)
+
+    def set(self, key: Key, value: Value, /) -> Value | None:
+        deleted_item = None
+        if len(self.queue) >= self.maxlimit:
+            deleted_item = self.pop(self.queue.popleft(), None)
+        if key not in self.queue:
+            self.queue.append(key)
+        super().__setitem__(key, value)
+        return deleted_item
+
+    def __setitem__(self, key: Key, value: Value, /) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Key) -> None:
+        if key in self.queue:
+            self.queue.remove(key)
+        return super().__delitem__(key)
+
+
+def run(factory: typing.Callable[[int], typing.Any], size: int) -> tuple[float, float]:
+    waiters = factory(size)
+    keys = list(range(size))
+    random.Random(size).shuffle(keys)
+
+    started = time.perf_counter()
+    for key in keys:
+        waiters[key] = object()
+    registered = time.perf_counter()
+
+    random.Random(-size).shuffle(keys)
+    for key in keys:
+        del waiters[key]
+    return registered - started, time.perf_counter() - registered
+
+
+def main() -> None:
+    implementations: dict[str, typing.Callable[[int], typing.Any]] = {
+        "dict + deque": lambda size: DequeLimitedDict(maxlimit=size),
+        "LimitedDict": lambda size: LimitedDict(maxlimit=size),
+        "LimitedDict (ttl)": lambda size: LimitedDict(maxlimit=size, ttl=3600),
+    }
+
+    print("Registering and releasing waiters in random order:")
+    for size in SIZES:
+        for name, factory in implementations.items():
+            if name == "dict + deque" and size > PREVIOUS_MAX_SIZE:
+                continue
+            register, release = run(factory, size)
+            print(f"  {size:>7} waiters  {name:<18} {register:8.3f} s + {release:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
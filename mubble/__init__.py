@@ -49,6 +49,7 @@ from .bot import (
     ABCScenario,
     ABCStateView,
     ABCView,
+    ABCWaiterBackend,
     AudioReplyHandler,
     BaseCute,
     BaseReturnManager,
@@ -73,6 +74,8 @@ from .bot import (
     InlineQueryCute,
     InlineQueryReturnManager,
     InlineQueryRule,
+    Lane,
+    LaneScheduler,
     MediaGroupReplyHandler,
     MessageCute,
     MessageReplyHandler,
@@ -85,7 +88,9 @@ from .bot import (
     PreCheckoutQueryManager,
     PreCheckoutQueryView,
     RawEventView,
+    RedisWaiterBackend,
     ShortState,
+    SQLiteWaiterBackend,
     StateViewHasher,
     StickerReplyHandler,
     Mubble,
@@ -108,6 +113,7 @@ from .tools.i18n import (
     SimpleI18n,
     SimpleTranslator,
 )
+from .tools.identity_set import IdentitySet
 from .tools.input_file_directory import InputFileDirectory
 from .tools.keyboard import (
     AnyMarkup,
@@ -121,7 +127,8 @@ from .tools.lifespan import Lifespan
 from .tools.loop_wrapper import ABCLoopWrapper, DelayedTask, LoopWrapper
 from .tools.magic import cache_translation, get_cached_translation, magic_bundle
 from .tools.parse_mode import ParseMode
-from .tools.state_storage import ABCStateStorage, MemoryStateStorage, StateData
+from .tools.regex_set import RegexSet
+from .tools.state_storage import ABCStateStorage, MemoryStateStorage, SQLiteStateStorage, StateData
 
 Update: typing.TypeAlias = UpdateCute
 Message: typing.TypeAlias = MessageCute
@@ -151,6 +158,7 @@ __all__ = (
     "ABCTranslator",
     "ABCTranslatorMiddleware",
     "ABCView",
+    "ABCWaiterBackend",
     "API",
     "APIError",
     "APIResponse",
@@ -193,6 +201,7 @@ __all__ = (
     "HTMLFormatter",
     "Hasher",
     "I18nEnum",
+    "IdentitySet",
     "InlineButton",
     "InlineKeyboard",
     "InlineQuery",
@@ -201,6 +210,8 @@ __all__ = (
     "InlineQueryRule",
     "InputFileDirectory",
     "Keyboard",
+    "Lane",
+    "LaneScheduler",
     "Lifespan",
     "LoopWrapper",
     "MESSAGE_FROM_USER",
@@ -225,7 +236,11 @@ __all__ = (
     "PreCheckoutQueryManager",
     "PreCheckoutQueryView",
     "RawEventView",
+    "RedisWaiterBackend",
+    "RegexSet",
     "RowButtons",
+    "SQLiteStateStorage",
+    "SQLiteWaiterBackend",
     "ShortState",
     "SimpleI18n",
     "SimpleTranslator",
@@ -22,6 +22,7 @@ from mubble.bot.dispatch import (
     ABCReturnManager,
     ABCStateView,
     ABCView,
+    ABCWaiterBackend,
     AudioReplyHandler,
     BaseReturnManager,
     BaseStateView,
@@ -36,6 +37,8 @@ from mubble.bot.dispatch import (
     FuncHandler,
     Hasher,
     InlineQueryReturnManager,
+    Lane,
+    LaneScheduler,
     Manager,
     MediaGroupReplyHandler,
     MessageReplyHandler,
@@ -45,7 +48,9 @@ from mubble.bot.dispatch import (
     PreCheckoutQueryManager,
     PreCheckoutQueryView,
     RawEventView,
+    RedisWaiterBackend,
     ShortState,
+    SQLiteWaiterBackend,
     StateViewHasher,
     StickerReplyHandler,
     VideoReplyHandler,
@@ -74,6 +79,7 @@ __all__ = (
     "ABCScenario",
     "ABCStateView",
     "ABCView",
+    "ABCWaiterBackend",
     "AudioReplyHandler",
     "BaseCute",
     "BaseReturnManager",
@@ -101,6 +107,8 @@ __all__ = (
     "InlineQueryCute",
     "InlineQueryReturnManager",
     "InlineQueryRule",
+    "Lane",
+    "LaneScheduler",
     "MESSAGE_FROM_USER",
     "MESSAGE_FROM_USER_IN_CHAT",
     "MESSAGE_IN_CHAT",
@@ -117,6 +125,8 @@ __all__ = (
     "PreCheckoutQueryManager",
     "PreCheckoutQueryView",
     "RawEventView",
+    "RedisWaiterBackend",
+    "SQLiteWaiterBackend",
     "ShortState",
     "StateViewHasher",
     "StickerReplyHandler",
@@ -3,11 +3,13 @@ import typing_extensions as typing
 from mubble.api.api import API, HTTPClient
 from mubble.bot.dispatch import dispatch as dp
 from mubble.bot.dispatch.abc import ABCDispatch
+from mubble.bot.dispatch.scheduler import LaneScheduler
 from mubble.bot.polling import polling as pg
 from mubble.bot.polling.abc import ABCPolling
 from mubble.modules import logger
 from mubble.tools.loop_wrapper import ABCLoopWrapper
 from mubble.tools.loop_wrapper import loop_wrapper as lw
+from mubble.types.objects import Update
 
 Dispatch = typing.TypeVar(
     "Dispatch", bound=ABCDispatch, default=dp.Dispatch[HTTPClient]
@@ -26,19 +28,22 @@ class Mubble(typing.Generic[HTTPClient, Dispatch, Polling, LoopWrapper]):
         dispatch: Dispatch | None = None,
         polling: Polling | None = None,
         loop_wrapper: LoopWrapper | None = None,
+        lane_scheduler: LaneScheduler | None = None,
     ) -> None:
         self.api = api
         self.dispatch = typing.cast(Dispatch, dispatch or dp.Dispatch())
         self.polling = typing.cast(Polling, polling or pg.Polling(api))
         self.loop_wrapper = typing.cast(LoopWrapper, loop_wrapper or lw.LoopWrapper())
+        self.lane_scheduler = lane_scheduler
 
     def __repr__(self) -> str:
-        return "<{}: api={!r}, dispatch={!r}, polling={!r}, loop_wrapper={!r}>".format(
+        return "<{}: api={!r}, dispatch={!r}, polling={!r}, loop_wrapper={!r}, lane_scheduler={!r}>".format(
             self.__class__.__name__,
             self.api,
             self.dispatch,
             self.polling,
             self.loop_wrapper,
+            self.lane_scheduler,
         )
 
     @property
@@ -56,6 +61,9 @@ class Mubble(typing.Generic[HTTPClient, Dispatch, Polling, LoopWrapper]):
         offset: int = 0,
         skip_updates: bool = False,
     ) -> typing.NoReturn:
+        async def feed(update: Update) -> bool:
+            return await self.dispatch.feed(update, self.api)
+
         async def polling() -> typing.NoReturn:
             if skip_updates:
                 logger.debug("Dropping pending updates")
@@ -70,7 +78,10 @@ class Mubble(typing.Generic[HTTPClient, Dispatch, Polling, LoopWrapper]):
                         update.update_id,
                         update.update_type.name,
                     )
-                    self.loop_wrapper.add_task(self.dispatch.feed(update, self.api))
+                    if self.lane_scheduler is not None:
+                        self.lane_scheduler.submit(update, feed)
+                    else:
+                        self.loop_wrapper.add_task(self.dispatch.feed(update, self.api))
 
         if self.loop_wrapper.is_running:
             await polling()
@@ -10,6 +10,7 @@ from mubble.bot.cute_types.base import BaseCute, compose_method_params
 from mubble.bot.cute_types.message import MediaType, MessageCute, ReplyMarkup, execute_method_edit
 from mubble.model import UNSET, From, field, get_params
 from mubble.msgspec_utils import Option, decoder
+from mubble.tools.callback_data_serilization.overflow import unpack_callback_data
 from mubble.tools.magic import shortcut
 from mubble.types.objects import *
 
@@ -78,20 +79,25 @@ class CallbackQueryCute(BaseCute[CallbackQuery], CallbackQuery, kw_only=True):
         if not self.data:
             return Nothing()
 
-        if "cached_callback_data" in self.__dict__:
-            return self.__dict__["cached_callback_data"]
+        cached_data = self.__dict__.setdefault("cached_callback_data", {})
+        if to in cached_data:
+            return cached_data[to]
 
         data = Nothing()
+        raw_data = unpack_callback_data(self.data.unwrap())
+        origin = typing.get_origin(to) or to
         with suppress(msgspec.ValidationError, msgspec.DecodeError):
             data = (
-                Some(decoder.decode(self.data.unwrap(), type=to))
-                if not issubclass(to, str | bytes)
-                else self.data
-                if issubclass(to, str)
-                else Some(base64.urlsafe_b64decode(self.data.unwrap()))
+                Nothing()
+                if raw_data is None
+                else Some(decoder.decode(raw_data, type=to))
+                if not isinstance(origin, type) or not issubclass(origin, str | bytes)
+                else Some(raw_data)
+                if issubclass(origin, str)
+                else Some(base64.urlsafe_b64decode(raw_data))
             )
 
-        self.__dict__["cached_callback_data"] = data
+        cached_data[to] = data
         return data  # type: ignore
 
     @shortcut("answer_callback_query", custom_params={"callback_query_id"})
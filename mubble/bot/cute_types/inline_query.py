@@ -5,6 +5,7 @@ from fntypes.result import Result
 from mubble.api.api import API, APIError
 from mubble.bot.cute_types.base import BaseCute, compose_method_params
 from mubble.model import get_params
+from mubble.tools.inline_cache import record_answer
 from mubble.tools.magic import shortcut
 from mubble.types.objects import *
 
@@ -38,6 +39,7 @@ class InlineQueryCute(BaseCute[InlineQuery], InlineQuery, kw_only=True):
             default_params={("inline_query_id", "id")},
         )
         params["results"] = [results] if not isinstance(results, list) else results
+        record_answer(params)
         return await self.ctx_api.answer_inline_query(**params)
 
 
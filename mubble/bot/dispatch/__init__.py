@@ -12,6 +12,7 @@ from mubble.bot.dispatch.handler import (
     StickerReplyHandler,
     VideoReplyHandler,
 )
+from mubble.bot.dispatch.index import HandlerIndex, Trigger, TriggerKind
 from mubble.bot.dispatch.middleware import ABCMiddleware
 from mubble.bot.dispatch.process import check_rule, process_inner
 from mubble.bot.dispatch.return_manager import (
@@ -24,6 +25,7 @@ from mubble.bot.dispatch.return_manager import (
     PreCheckoutQueryManager,
     register_manager,
 )
+from mubble.bot.dispatch.scheduler import DEFAULT_LANES, Lane, LaneScheduler, LaneStats, get_default_lanes
 from mubble.bot.dispatch.view import (
     ABCStateView,
     ABCView,
@@ -45,8 +47,11 @@ from mubble.bot.dispatch.waiter_machine import (
     MESSAGE_FROM_USER,
     MESSAGE_FROM_USER_IN_CHAT,
     MESSAGE_IN_CHAT,
+    ABCWaiterBackend,
     Hasher,
+    RedisWaiterBackend,
     ShortState,
+    SQLiteWaiterBackend,
     StateViewHasher,
     WaiterMachine,
     clear_wm_storage_worker,
@@ -59,6 +64,7 @@ __all__ = (
     "ABCReturnManager",
     "ABCStateView",
     "ABCView",
+    "ABCWaiterBackend",
     "AudioReplyHandler",
     "BaseReturnManager",
     "BaseStateView",
@@ -71,12 +77,17 @@ __all__ = (
     "ChatJoinRequestView",
     "ChatMemberView",
     "Context",
+    "DEFAULT_LANES",
     "Dispatch",
     "DocumentReplyHandler",
     "FuncHandler",
+    "HandlerIndex",
     "Hasher",
     "InlineQueryReturnManager",
     "InlineQueryView",
+    "Lane",
+    "LaneScheduler",
+    "LaneStats",
     "MESSAGE_FROM_USER",
     "MESSAGE_FROM_USER_IN_CHAT",
     "MESSAGE_IN_CHAT",
@@ -89,9 +100,13 @@ __all__ = (
     "PreCheckoutQueryManager",
     "PreCheckoutQueryView",
     "RawEventView",
+    "RedisWaiterBackend",
+    "SQLiteWaiterBackend",
     "ShortState",
     "StateViewHasher",
     "StickerReplyHandler",
+    "Trigger",
+    "TriggerKind",
     "MubbleContext",
     "VideoReplyHandler",
     "ViewBox",
@@ -99,6 +114,7 @@ __all__ = (
     "check_rule",
     "clear_wm_storage_worker",
     "clear_wm_storage_worker",
+    "get_default_lanes",
     "process_inner",
     "register_manager",
 )
@@ -13,6 +13,9 @@ type Key = str | enum.Enum
 type AnyValue = typing.Any
 
 
+_MISSING: typing.Final[typing.Any] = object()
+
+
 class Context(dict[str, AnyValue]):
     """Context class like dict & dotdict.
 
@@ -24,34 +27,53 @@ class Context(dict[str, AnyValue]):
             ctx["items"] = [1, 2, 3]
             return True
     ```
+
+    Speculative changes are made in branches instead of copies, changes
+    made after `branch()` are journaled and can be undone with `rollback()`:
+    ```python
+    branch = ctx.branch()
+    if not await check_rule(api, rule, update, ctx):
+        ctx.rollback(branch)
+    else:
+        ctx.commit(branch)
+    ```
     """
 
     raw_update: Update
     node_col: NodeCollection | None = None
 
-    def __init__(self, **kwargs: AnyValue) -> None:
-        cls_vars = vars(self.__class__)
-        defaults = {}
-
-        for k in self.__class__.__annotations__:
-            if k in cls_vars:
-                defaults[k] = cls_vars[k]
-                delattr(self.__class__, k)
+    _journal: list[tuple[str, AnyValue]] | None = None
+    _branches: list[int] | None = None
+    """Journal positions of the open branches, journaling stops when the outermost branch is closed."""
 
-        dict.__init__(self, **defaults | kwargs)
+    def __init__(self, **kwargs: AnyValue) -> None:
+        dict.__init__(self, **self.get_defaults() | kwargs)
 
     @recursive_repr()
     def __repr__(self) -> str:
         return "{}({})".format(self.__class__.__name__, ", ".join(f"{k}={v!r}" for k, v in self.items()))
 
     def __setitem__(self, __key: Key, __value: AnyValue) -> None:
-        dict.__setitem__(self, self.key_to_str(__key), __value)
+        __key = self.key_to_str(__key)
+        if self._journal is not None:
+            self._journal.append((__key, dict.get(self, __key, _MISSING)))
+        dict.__setitem__(self, __key, __value)
 
     def __getitem__(self, __key: Key) -> AnyValue:
         return dict.__getitem__(self, self.key_to_str(__key))
 
     def __delitem__(self, __key: Key) -> None:
-        dict.__delitem__(self, self.key_to_str(__key))
+        __key = self.key_to_str(__key)
+        if self._journal is not None and __key in self:
+            self._journal.append((__key, dict.__getitem__(self, __key)))
+        dict.__delitem__(self, __key)
+
+    def __contains__(self, __key: object) -> bool:
+        return dict.__contains__(self, self.key_to_str(__key) if isinstance(__key, enum.Enum) else __key)
+
+    def __ior__(self, __value: typing.Any) -> typing.Self:  # type: ignore[override]
+        self.update(__value)
+        return self
 
     def __setattr__(self, __name: str, __value: AnyValue) -> None:
         self.__setitem__(__name, __value)
@@ -62,12 +84,85 @@ class Context(dict[str, AnyValue]):
     def __delattr__(self, __name: str) -> None:
         self.__delitem__(__name)
 
+    @classmethod
+    def get_defaults(cls) -> dict[str, AnyValue]:
+        """Default values of annotated keys, they are moved from class attributes on the first call."""
+        if "__context_defaults__" not in cls.__dict__:
+            cls_vars = vars(cls)
+            defaults = {}
+
+            for k in cls.__annotations__:
+                if k in cls_vars and not k.startswith("_"):
+                    defaults[k] = cls_vars[k]
+                    delattr(cls, k)
+
+            type.__setattr__(cls, "__context_defaults__", defaults)
+        return cls.__dict__["__context_defaults__"]
+
     @staticmethod
     def key_to_str(key: Key) -> str:
         return key if isinstance(key, str) else str(key.value)
 
     def copy(self) -> typing.Self:
-        return self.__class__(**dict.copy(self))
+        context = dict.__new__(self.__class__)
+        dict.update(context, self)
+        return context
+
+    def branch(self) -> int:
+        """Start journaling changes, returns the branch for `commit()` and `rollback()`. Branches can be nested."""
+        if self._journal is None:
+            object.__setattr__(self, "_journal", [])
+            object.__setattr__(self, "_branches", [])
+        self._branches.append(len(self._journal))  # type: ignore
+        return len(self._branches)  # type: ignore
+
+    def _close(self, branch: int, /) -> int | None:
+        """Close the branch with the branches nested in it, returns its journal position
+        (`None` if it is already closed by an outer branch).
+        """
+        branches = self._branches or []
+        if not 0 < branch <= len(branches):
+            return None
+
+        position = branches[branch - 1]
+        del branches[branch - 1 :]
+        return position
+
+    def _stop_journaling(self) -> None:
+        if not self._branches:
+            object.__setattr__(self, "_journal", None)
+            object.__setattr__(self, "_branches", None)
+
+    def commit(self, branch: int, /) -> None:
+        """Keep changes made since the branch point, they can still be undone by an outer branch."""
+        self._close(branch)
+        self._stop_journaling()
+
+    def rollback(self, branch: int, /) -> None:
+        """Undo changes made since the branch point."""
+        if (position := self._close(branch)) is None:
+            return
+
+        journal = self._journal or []
+        while len(journal) > position:
+            key, value = journal.pop()
+            if value is _MISSING:
+                dict.pop(self, key, None)
+            else:
+                dict.__setitem__(self, key, value)
+        self._stop_journaling()
+
+    def get_changes(self, branch: int, /) -> tuple[dict[str, AnyValue], tuple[str, ...]]:
+        """Keys set (with their values) and keys deleted since the branch point."""
+        branches = self._branches or []
+        if not 0 < branch <= len(branches):
+            return {}, ()
+
+        keys = dict.fromkeys(key for key, _ in (self._journal or [])[branches[branch - 1] :])
+        return (
+            {key: dict.__getitem__(self, key) for key in keys if dict.__contains__(self, key)},
+            tuple(key for key in keys if not dict.__contains__(self, key)),
+        )
 
     def set(self, key: Key, value: AnyValue) -> None:
         self[key] = value
@@ -82,7 +177,7 @@ class Context(dict[str, AnyValue]):
     def get(self, key: Key, default: None = None) -> AnyValue | None: ...
 
     def get[T](self, key: Key, default: T | None = None) -> T | AnyValue | None:
-        return dict.get(self, key, default)
+        return dict.get(self, self.key_to_str(key), default)
 
     def get_or_set[T](self, key: Key, default: T) -> T:
         if key not in self:
@@ -92,5 +187,35 @@ class Context(dict[str, AnyValue]):
     def delete(self, key: Key) -> None:
         del self[key]
 
+    def update(self, *args: typing.Any, **kwargs: AnyValue) -> None:  # type: ignore[override]
+        if self._journal is None:
+            dict.update(self, *args, **kwargs)
+            return
+
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def pop(self, key: Key, /, *default: AnyValue) -> AnyValue:  # type: ignore[override]
+        key = self.key_to_str(key)
+        if self._journal is not None and key in self:
+            self._journal.append((key, dict.__getitem__(self, key)))
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key: Key, default: AnyValue = None, /) -> AnyValue:  # type: ignore[override]
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def popitem(self) -> tuple[str, AnyValue]:
+        key, value = dict.popitem(self)
+        if self._journal is not None:
+            self._journal.append((key, value))
+        return key, value
+
+    def clear(self) -> None:
+        if self._journal is not None:
+            self._journal.extend(self.items())
+        dict.clear(self)
+
 
 __all__ = ("Context",)
@@ -13,6 +13,7 @@ from mubble.bot.dispatch.handler.func import ErrorHandlerT, Func, FuncHandler
 from mubble.bot.dispatch.middleware.abc import run_middleware
 from mubble.bot.dispatch.middleware.global_middleware import GlobalMiddleware
 from mubble.bot.dispatch.view.abc import ABCView
+from mubble.bot.dispatch.view.base import BaseView
 from mubble.bot.dispatch.view.box import (
     CallbackQueryView,
     ChatJoinRequestView,
@@ -26,6 +27,7 @@ from mubble.bot.dispatch.view.box import (
 from mubble.modules import logger
 from mubble.tools.error_handler.error_handler import ErrorHandler
 from mubble.tools.global_context import MubbleContext
+from mubble.tools.i18n.abc import ABCI18n
 from mubble.types.enums import UpdateType
 from mubble.types.objects import Update
 
@@ -256,6 +258,21 @@ class Dispatch(
             external.global_middleware.filters
         )
 
+    async def warm_up_translations(self, i18n: ABCI18n, /, locales: typing.Iterable[str] | None = None) -> None:
+        """Translate rules of all views to the locales (all locales of `i18n` by default) before
+        the first update, so translated rules and handler index tables are looked up in dictionaries.
+
+        ```python
+        loop_wrapper.lifespan.on_startup(dispatch.warm_up_translations(i18n))
+        ```
+        """
+        locales = i18n.get_locales() if locales is None else locales
+        translators = [i18n.get_translator_by_locale(locale) for locale in locales]
+        for view in self.get_views().values():
+            if isinstance(view, BaseView):
+                await view.warm_up_translations(translators)
+        logger.debug("Rules are translated to {} locales.", len(translators))
+
     def get_view(self, of_type: type[T]) -> Option[T]:
         for view in self.get_views().values():
             if isinstance(view, of_type):
@@ -38,15 +38,16 @@ class BaseReplyHandler(ABCHandler[MessageCute], abc.ABC):
 
     async def check(self, api: API, event: Update, ctx: Context | None = None) -> bool:
         ctx = Context(raw_update=event) if ctx is None else ctx
-        temp_ctx = ctx.copy()
-        temp_ctx |= self.preset_context
+        branch = ctx.branch()
 
         for rule in self.rules:
             if not await check_rule(api, rule, event, ctx):
                 logger.debug("Rule {!r} failed!", rule)
+                ctx.rollback(branch)
                 return False
 
-        ctx |= temp_ctx
+        ctx |= self.preset_context
+        ctx.commit(branch)
         return True
 
     @abc.abstractmethod
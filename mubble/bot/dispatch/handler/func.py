@@ -12,7 +12,7 @@ from mubble.node.composer import NodeCollection, compose_nodes
 from mubble.tools.adapter.abc import ABCAdapter
 from mubble.tools.adapter.dataclass import DataclassAdapter
 from mubble.tools.error_handler import ABCErrorHandler, ErrorHandler
-from mubble.tools.magic import get_annotations, magic_bundle
+from mubble.tools.magic import BindingPlan, get_binding_plan
 from mubble.types.enums import UpdateType
 from mubble.types.objects import Update
 
@@ -42,6 +42,7 @@ class FuncHandler(ABCHandler[Event], typing.Generic[Event, Function, ErrorHandle
     )
     preset_context: Context = dataclasses.field(default_factory=lambda: Context(), kw_only=True)
     update_type: UpdateType | None = dataclasses.field(default=None, kw_only=True)
+    binding_plan: BindingPlan = dataclasses.field(init=False)
 
     def __post_init__(self) -> None:
         self.dataclass = typing.get_origin(self.dataclass) or self.dataclass
@@ -49,6 +50,8 @@ class FuncHandler(ABCHandler[Event], typing.Generic[Event, Function, ErrorHandle
         if self.dataclass is not None and self.adapter is None:
             self.adapter = DataclassAdapter(self.dataclass, self.update_type)
 
+        self.binding_plan = get_binding_plan(self.function, start_idx=0)
+
     @property
     def __call__(self) -> Function:
         return self.function
@@ -68,12 +71,7 @@ class FuncHandler(ABCHandler[Event], typing.Generic[Event, Function, ErrorHandle
         return get_nodes(self.function)
 
     def get_name_event_param(self, event: Event) -> str | None:
-        event_class = self.dataclass or event.__class__
-        for k, v in get_annotations(self.function).items():
-            if isinstance(v := typing.get_origin(v) or v, type) and v is event_class:
-                self.func_event_param = k
-                return k
-        return None
+        return self.binding_plan.get_event_param(self.dataclass or event.__class__)
 
     async def check(self, api: API, event: Update, ctx: Context | None = None) -> bool:
         if self.update_type is not None and self.update_type != event.update_type:
@@ -81,13 +79,14 @@ class FuncHandler(ABCHandler[Event], typing.Generic[Event, Function, ErrorHandle
 
         logger.debug("Checking handler {!r}...", self)
         ctx = Context(raw_update=event) if ctx is None else ctx
-        temp_ctx = ctx.copy()
-        temp_ctx |= self.preset_context.copy()
+        branch = ctx.branch()
+        ctx |= self.preset_context
         update = event
 
         for rule in self.rules:
-            if not await check_rule(api, rule, update, temp_ctx):
+            if not await check_rule(api, rule, update, ctx):
                 logger.debug("Rule {!r} failed!", rule)
+                ctx.rollback(branch)
                 return False
 
         nodes = self.required_nodes
@@ -96,14 +95,15 @@ class FuncHandler(ABCHandler[Event], typing.Generic[Event, Function, ErrorHandle
             result = await compose_nodes(nodes, ctx, data={Update: update, API: api})
             if not result:
                 logger.debug(f"Cannot compose nodes for handler, error: {str(result.error)}")
+                ctx.rollback(branch)
                 return False
 
             node_col = result.value
-            temp_ctx |= node_col.values
+            ctx |= node_col.values
 
         logger.debug("All checks passed for handler.")
-        temp_ctx["node_col"] = node_col
-        ctx |= temp_ctx
+        ctx["node_col"] = node_col
+        ctx.commit(branch)
         return True
 
     async def run(
@@ -114,12 +114,16 @@ class FuncHandler(ABCHandler[Event], typing.Generic[Event, Function, ErrorHandle
         node_col: "NodeCollection | None" = None,
     ) -> typing.Any:
         logger.debug(f"Running handler {self!r}...")
+        event_param = self.get_name_event_param(event)
 
         try:
-            if event_param := self.get_name_event_param(event):
-                ctx = Context(**{event_param: event, **ctx})
-            return await self(**magic_bundle(self.function, ctx, start_idx=0))
+            kwargs = self.binding_plan.bind(ctx)
+            if event_param is not None and event_param not in ctx and event_param in self.binding_plan.names:
+                kwargs[event_param] = event
+            return await self(**kwargs)
         except BaseException as exception:
+            if event_param is not None:
+                ctx = Context(**{event_param: event, **ctx})
             return await self.error_handler.run(exception, event, api, ctx)
         finally:
             if node_col := ctx.node_col:
@@ -0,0 +1,284 @@
+import dataclasses
+import enum
+import inspect
+import operator
+import typing
+
+from mubble.bot.dispatch.context import Context
+from mubble.model import Model
+from mubble.node.cache import get_user_id
+from mubble.node.command import cut_mention, single_split
+from mubble.tools.callback_data_serilization.overflow import fetch_callback_data
+from mubble.tools.i18n.abc import ABCTranslator, I18nEnum
+from mubble.types.objects import CallbackQuery, Message, PreCheckoutQuery, Update
+
+if typing.TYPE_CHECKING:
+    from mubble.bot.dispatch.handler.abc import ABCHandler
+
+type TriggerKey = str | enum.Enum
+type TableKey = tuple[TriggerKind, bool, bool, typing.Any]
+
+
+class TriggerKind(enum.Enum):
+    TEXT = enum.auto()
+    """Text or caption of the message, see `Either[Text, Caption]` node."""
+
+    COMMAND = enum.auto()
+    """Prefixed command name of the message without mention, see `CommandInfo` node."""
+
+    PAYLOAD = enum.auto()
+    """Callback data or invoice payload, see `Payload` node."""
+
+    STATE = enum.auto()
+    """Key of the user state in the state storage (the trigger `source`), see `State` rule."""
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Trigger:
+    """Static keys of a rule: the rule can pass only if the subject of the update
+    (see `TriggerKind`) is equal to (or starts with, if `prefix` is set) one of the keys.
+    """
+
+    kind: TriggerKind
+    keys: frozenset[TriggerKey]
+    ignore_case: bool = dataclasses.field(default=False, kw_only=True)
+    prefix: bool = dataclasses.field(default=False, kw_only=True)
+    translatable: bool = dataclasses.field(default=False, kw_only=True)
+    """Keys are translated with `ABCTranslator.get` when a translator is set in the context, see `Text` rule."""
+
+    source: typing.Any = dataclasses.field(default=None, kw_only=True)
+    """Object the subject is taken from, the state storage for `TriggerKind.STATE`."""
+
+    def merge(self, other: "Trigger", /) -> "Trigger | None":
+        """Union of triggers (for `OrRule`), returns `None` if triggers are of different kinds."""
+        if (self.kind, self.ignore_case, self.prefix, self.translatable, self.source) != (
+            other.kind,
+            other.ignore_case,
+            other.prefix,
+            other.translatable,
+            other.source,
+        ):
+            return None
+        return dataclasses.replace(self, keys=self.keys | other.keys)
+
+    def translate(self, translator: ABCTranslator, /) -> "Trigger":
+        """Trigger with the keys translated to the locale of the translator."""
+        if not self.translatable:
+            return self
+        return dataclasses.replace(
+            self,
+            keys=frozenset(translator.get(key) if isinstance(key, str) else key for key in self.keys),
+            translatable=False,
+        )
+
+
+def get_message_text(event: Model) -> str | None:
+    if not isinstance(event, Message):
+        return None
+    if event.text:
+        return event.text.unwrap()
+    if event.caption:
+        return event.caption.unwrap()
+    return None
+
+
+def get_command_name(event: Model) -> str | None:
+    if (text := get_message_text(event)) is None:
+        return None
+    return cut_mention(single_split(text, " ")[0])[0]
+
+
+async def get_payload(event: Model) -> str | None:
+    match event:
+        case PreCheckoutQuery():
+            return event.invoice_payload
+        case CallbackQuery():
+            return await fetch_callback_data(event.data.unwrap()) if event.data else None
+        case Message():
+            return event.successful_payment.map(lambda payment: payment.invoice_payload).unwrap_or_none()
+        case _:
+            return None
+
+
+async def get_state_key(storage: typing.Any, update: Update, ctx: Context) -> TriggerKey | None:
+    """Key of the user state (`StateMeta.NO_STATE` if the user has no state), `None` if the update has no user."""
+    from mubble.bot.rules.state import StateMeta, get_user_state
+
+    if (user_id := get_user_id(update)) is None:
+        return None
+    state = await get_user_state(storage, user_id, ctx)
+    return state.unwrap().key if state else StateMeta.NO_STATE
+
+
+SUBJECT_GETTERS: typing.Final[
+    dict[TriggerKind, typing.Callable[[Model], str | None | typing.Awaitable[str | None]]]
+] = {
+    TriggerKind.TEXT: get_message_text,
+    TriggerKind.COMMAND: get_command_name,
+    TriggerKind.PAYLOAD: get_payload,
+}
+
+
+def get_handler_trigger(handler: "ABCHandler[typing.Any]") -> Trigger | None:
+    """Trigger of the first indexable rule of the handler, handler rules are checked with AND semantics."""
+    for rule in getattr(handler, "rules", ()):
+        if (trigger := rule.get_trigger()) is not None:
+            return trigger
+    return None
+
+
+@dataclasses.dataclass(slots=True)
+class _TriggerTable:
+    exact: dict[TriggerKey, list[int]] = dataclasses.field(default_factory=dict)
+    prefixes: dict[int, dict[str, list[int]]] = dataclasses.field(default_factory=dict)
+    positions: list[int] = dataclasses.field(default_factory=list)
+
+    def add(self, trigger: Trigger, position: int) -> None:
+        self.positions.append(position)
+        for key in trigger.keys:
+            if not isinstance(key, str):
+                self.exact.setdefault(key, []).append(position)
+                continue
+
+            key = key.lower() if trigger.ignore_case else key
+            table = self.prefixes.setdefault(len(key), {}) if trigger.prefix else self.exact
+            table.setdefault(key, []).append(position)
+
+    def lookup(self, subject: TriggerKey) -> typing.Iterator[int]:
+        yield from self.exact.get(subject, ())
+        if isinstance(subject, str):
+            for length, table in self.prefixes.items():
+                yield from table.get(subject[:length], ())
+
+
+class HandlerIndex[Event]:
+    """Index of view handlers by static trigger keys of their rules (see `ABCRule.get_trigger`).
+
+    Selects the handlers whose triggers match the update and handlers without triggers,
+    in the order of registration, so the rest of handlers are not checked at all.
+    Triggers of translatable rules are translated to the locale of the translator set in the context,
+    tables of translated triggers are built for the locales of `warm_up` only, so their number is bounded.
+    Handlers with translatable triggers are selected for other locales, their rules decide.
+    State triggers fetch the user state once per event (see `get_user_state`), the rest of handlers
+    is selected again when a handler changes states in their storages (see `get_state_versions`).
+    """
+
+    def __init__(self, handlers: typing.Sequence["ABCHandler[Event]"]) -> None:
+        self.handlers = tuple(handlers)
+        self._tables: dict[TableKey, _TriggerTable] = {}
+        self._unindexed: list[int] = []
+        self._translatable: dict[int, Trigger] = {}
+        self._locale_tables: dict[str, dict[TableKey, _TriggerTable]] = {}
+        self._default_tables: dict[TableKey, _TriggerTable] = {}
+        self._state_sources: list[typing.Any] = []
+
+        for position, handler in enumerate(self.handlers):
+            trigger = get_handler_trigger(handler)
+            if trigger is None:
+                self._unindexed.append(position)
+                continue
+
+            if trigger.translatable:
+                self._translatable[position] = trigger
+            if trigger.kind is TriggerKind.STATE and all(trigger.source is not s for s in self._state_sources):
+                self._state_sources.append(trigger.source)
+            self._tables.setdefault(
+                (trigger.kind, trigger.ignore_case, trigger.translatable, trigger.source),
+                _TriggerTable(),
+            ).add(trigger, position)
+
+        self._default_tables = {key: table for key, table in self._tables.items() if not key[2]}
+
+    def __repr__(self) -> str:
+        return "<{}: {} handlers, {} unindexed>".format(
+            self.__class__.__name__,
+            len(self.handlers),
+            len(self._unindexed),
+        )
+
+    def is_actual(self, handlers: typing.Sequence["ABCHandler[Event]"], /) -> bool:
+        """The index is built of the same handlers (compared by identity) in the same order."""
+        return len(handlers) == len(self.handlers) and all(map(operator.is_, handlers, self.handlers))
+
+    def get_tables(self, translator: ABCTranslator | None = None) -> dict[TableKey, _TriggerTable]:
+        """Trigger tables with translatable triggers translated to the locale of the translator,
+        tables without translatable triggers if the locale was not warmed up.
+        """
+        if translator is None or not self._translatable:
+            return self._tables
+        return self._locale_tables.get(translator.locale, self._default_tables)
+
+    def warm_up(self, translators: typing.Iterable[ABCTranslator], /) -> None:
+        """Build the trigger tables for the locales of the translators (see `ABCI18n.get_locales`)."""
+        if not self._translatable:
+            return
+
+        for translator in translators:
+            if translator.locale in self._locale_tables:
+                continue
+
+            tables = dict(self._default_tables)
+            for position, trigger in self._translatable.items():
+                trigger = trigger.translate(translator)
+                tables.setdefault(
+                    (trigger.kind, trigger.ignore_case, True, trigger.source),
+                    _TriggerTable(),
+                ).add(trigger, position)
+            self._locale_tables[translator.locale] = tables
+
+    def get_state_versions(self) -> tuple[int, ...]:
+        """Versions of the state storages the handlers are selected by, see `ABCStateStorage.version`."""
+        return tuple(source.version for source in self._state_sources)
+
+    async def select_after(
+        self,
+        handler: "ABCHandler[Event]",
+        update: Update,
+        ctx: Context,
+    ) -> list["ABCHandler[Event]"]:
+        """Handlers registered after the handler, selected again (e.g. after the handler changed the user state)."""
+        rest = {id(h) for h in self.handlers[self.handlers.index(handler) + 1 :]}
+        return [h for h in await self.select(update, ctx) if id(h) in rest]
+
+    async def select(self, update: Update, ctx: Context) -> list["ABCHandler[Event]"]:
+        if not self._tables:
+            return list(self.handlers)
+
+        tables = self.get_tables(ctx.get(I18nEnum.I18N))
+        positions = set(self._unindexed)
+        if tables is self._default_tables:
+            # Translatable triggers are not indexed for this locale, let the rules decide
+            positions.update(self._translatable)
+        event = update.incoming_update
+        subjects: dict[tuple[TriggerKind, typing.Any], TriggerKey | None] = {}
+        for (kind, ignore_case, _, source), table in tables.items():
+            if kind is TriggerKind.STATE:
+                if (subject := await get_state_key(source, update, ctx)) is None:
+                    # The user is unknown here, let the rules decide
+                    positions.update(table.positions)
+                    continue
+                positions.update(table.lookup(subject))
+                continue
+
+            if (kind, source) not in subjects:
+                subject = SUBJECT_GETTERS[kind](event)
+                subjects[kind, source] = await subject if inspect.isawaitable(subject) else subject
+            if (subject := subjects[kind, source]) is None:
+                continue
+            positions.update(
+                table.lookup(subject.lower() if ignore_case and isinstance(subject, str) else subject)
+            )
+
+        return [self.handlers[position] for position in sorted(positions)]
+
+
+__all__ = (
+    "HandlerIndex",
+    "Trigger",
+    "TriggerKind",
+    "get_command_name",
+    "get_handler_trigger",
+    "get_message_text",
+    "get_payload",
+    "get_state_key",
+)
@@ -10,6 +10,7 @@ from mubble.bot.rules.abc import ABCRule, check_rule
 from mubble.node import IsNode, compose_nodes
 from mubble.tools.adapter.abc import ABCAdapter
 from mubble.tools.adapter.raw_update import RawUpdateAdapter
+from mubble.tools.identity_set import IdentitySet
 from mubble.types import Update
 
 
@@ -46,6 +47,11 @@ class GlobalMiddleware(ABCMiddleware):
             if result in identifiers:
                 return await check_rule(event.api, identifiers[result], event, ctx)
 
+            # Identity sets are checked by membership
+            for identifier, rule in identifiers.items():
+                if isinstance(identifier, IdentitySet) and result in identifier:
+                    return await check_rule(event.api, rule, event, ctx)
+
         return True
 
     @contextmanager
@@ -1,3 +1,4 @@
+import collections
 import typing
 
 from fntypes.option import Nothing, Some
@@ -11,13 +12,18 @@ from mubble.model import Model
 from mubble.modules import logger
 from mubble.node.composer import CONTEXT_STORE_NODES_KEY, NodeScope, compose_nodes
 from mubble.tools.adapter.abc import run_adapter
-from mubble.tools.i18n.abc import I18nEnum
+from mubble.tools.i18n.abc import ABCTranslator, I18nEnum
+from mubble.tools.magic import get_cached_translation
 from mubble.types.objects import Update
 
 if typing.TYPE_CHECKING:
     from mubble.bot.dispatch.handler.abc import ABCHandler
+    from mubble.bot.dispatch.index import HandlerIndex
     from mubble.bot.rules.abc import ABCRule
 
+CONTEXT_STORE_RULES_KEY: typing.Final[str] = "_rule_ctx"
+CONTEXT_STORE_STATES_KEY: typing.Final[str] = "_state_ctx"
+
 
 async def process_inner[Event: Model](
     api: API,
@@ -27,9 +33,12 @@ async def process_inner[Event: Model](
     middlewares: list[ABCMiddleware[Event]],
     handlers: list["ABCHandler[Event]"],
     return_manager: ABCReturnManager[Event] | None = None,
+    handler_index: "HandlerIndex[Event] | None" = None,
 ) -> bool:
     logger.debug("Processing {!r}...", event.__class__.__name__)
     ctx[CONTEXT_STORE_NODES_KEY] = {}  # For per-event shared nodes
+    ctx[CONTEXT_STORE_RULES_KEY] = {}  # For per-event results of pure rules
+    ctx[CONTEXT_STORE_STATES_KEY] = {}  # For per-event states of the user in state storages
 
     logger.debug("Run pre middlewares...")
     for m in middlewares:
@@ -38,12 +47,20 @@ async def process_inner[Event: Model](
         if result is False:
             return False
 
+    state_versions = ()
+    if handler_index is not None:
+        handlers = await handler_index.select(raw_event, ctx)
+        state_versions = handler_index.get_state_versions()
+        logger.debug("Selected {} of {} handlers by index.", len(handlers), len(handler_index.handlers))
+
     found = False
     responses = []
-    ctx_copy = ctx.copy()
+    pending = collections.deque(handlers)
 
-    for handler in handlers:
+    while pending:
+        handler = pending.popleft()
         adapted_event = event
+        branch = ctx.branch()
 
         if await handler.check(api, raw_event, ctx):
             if handler.adapter is not None:
@@ -51,6 +68,7 @@ async def process_inner[Event: Model](
                     case Some(value):
                         adapted_event = value
                     case Nothing():
+                        ctx.rollback(branch)
                         continue
 
             found = True
@@ -62,9 +80,15 @@ async def process_inner[Event: Model](
             if return_manager is not None:
                 await return_manager.run(response, event, ctx)
             if handler.final:
+                ctx.commit(branch)
                 break
 
-        ctx = ctx_copy
+            if handler_index is not None and handler_index.get_state_versions() != state_versions:
+                # The handler changed states, the rest of handlers is selected by the new state
+                pending = collections.deque(await handler_index.select_after(handler, raw_event, ctx))
+                state_versions = handler_index.get_state_versions()
+
+        ctx.rollback(branch)
 
     logger.debug("Run post middlewares...")
     ctx.set("responses", responses)
@@ -90,6 +114,13 @@ async def process_inner[Event: Model](
     return found
 
 
+async def translate_rule(rule: "ABCRule", translator: ABCTranslator) -> "ABCRule":
+    """Translation of the rule, a dictionary lookup if it is cached (see `warm_up_translations`)."""
+    if (translation := get_cached_translation(rule, translator.locale)) is not None:
+        return translation
+    return await rule.translate(translator)
+
+
 async def check_rule(
     api: API,
     rule: "ABCRule",
@@ -98,7 +129,36 @@ async def check_rule(
 ) -> bool:
     """Checks requirements, adapts update.
     Returns check result.
+
+    Results of pure rules are memoized per event together with the changes they made to the context.
     """
+    memo: dict[typing.Hashable, tuple[bool, dict[str, typing.Any], tuple[str, ...]]] | None = (
+        ctx.get(CONTEXT_STORE_RULES_KEY) if rule.pure else None
+    )
+    if memo is None:
+        return await _check_rule(api, rule, update, ctx)
+
+    if (memoized := memo.get(rule.memo_key)) is not None:
+        result, changes, deleted = memoized
+        logger.debug("Rule {!r} result is memoized: {!r}", rule, result)
+        ctx |= changes
+        for key in deleted:
+            ctx.pop(key, None)
+        return result
+
+    branch = ctx.branch()
+    result = await _check_rule(api, rule, update, ctx)
+    memo[rule.memo_key] = (result, *ctx.get_changes(branch))
+    ctx.commit(branch)
+    return result
+
+
+async def _check_rule(
+    api: API,
+    rule: "ABCRule",
+    update: Update,
+    ctx: Context,
+) -> bool:
     update_cute = None if not isinstance(update, UpdateCute) else update
 
     # Running adapter
@@ -117,16 +177,16 @@ async def check_rule(
         update_cute = UpdateCute.from_update(update, bound_api=api)
 
     # Running subrules to fetch requirements
-    ctx_copy = ctx.copy()
+    branch = ctx.branch()
     for requirement in rule.requires:
-        if not await check_rule(api, requirement, update_cute, ctx_copy):
+        if not await check_rule(api, requirement, update_cute, ctx):
+            ctx.rollback(branch)
             return False
+    ctx.commit(branch)
 
     # Translating translatable rules
     if I18nEnum.I18N in ctx:
-        rule = await rule.translate(ctx[I18nEnum.I18N])
-
-    ctx |= ctx_copy
+        rule = await translate_rule(rule, ctx[I18nEnum.I18N])
 
     # Composing required nodes
     nodes = rule.required_nodes
@@ -148,4 +208,4 @@ async def check_rule(
     return result
 
 
-__all__ = ("check_rule", "process_inner")
+__all__ = ("CONTEXT_STORE_RULES_KEY", "CONTEXT_STORE_STATES_KEY", "check_rule", "process_inner", "translate_rule")
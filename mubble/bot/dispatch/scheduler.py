@@ -0,0 +1,223 @@
+import asyncio
+import dataclasses
+import time
+import typing
+from collections import deque
+
+from mubble.modules import logger
+from mubble.types.enums import UpdateType
+from mubble.types.objects import Update
+
+type Feed = typing.Callable[[Update], typing.Awaitable[typing.Any]]
+
+DEFAULT_LANE_NAME: typing.Final[str] = "default"
+LATENCY_SAMPLES: typing.Final[int] = 1024
+DEFAULT_MAX_CONCURRENCY: typing.Final[int] = 256
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Lane:
+    """Lane of updates with its own queue and concurrency share.
+
+    Lanes with a higher `priority` take free concurrency slots first,
+    `concurrency` is the maximum number of updates of the lane processed at the same time.
+    `reserved` slots of the scheduler are kept free for the lane from the lanes after it
+    (of lower priority), so the lane gets slots even when other lanes are flooded.
+    """
+
+    name: str
+    update_types: frozenset[UpdateType] = dataclasses.field(default_factory=frozenset)
+    priority: int = dataclasses.field(default=0, kw_only=True)
+    concurrency: int = dataclasses.field(default=64, kw_only=True)
+    reserved: int = dataclasses.field(default=0, kw_only=True)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class LaneStats:
+    name: str
+    pending: int
+    active: int
+    processed: int
+    p50: float | None
+    p95: float | None
+    p99: float | None
+
+
+@dataclasses.dataclass(slots=True, repr=False)
+class _LaneQueue:
+    lane: Lane
+    pending: deque[tuple[Update, Feed, float]] = dataclasses.field(default_factory=deque)
+    latencies: deque[float] = dataclasses.field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+    active: int = 0
+    processed: int = 0
+
+    def percentile(self, q: float, /) -> float | None:
+        if not self.latencies:
+            return None
+        samples = sorted(self.latencies)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+DEFAULT_LANES: typing.Final[tuple[Lane, ...]] = (
+    Lane(
+        "payments",
+        frozenset((UpdateType.PRE_CHECKOUT_QUERY, UpdateType.SHIPPING_QUERY)),
+        priority=2,
+        concurrency=32,
+        reserved=8,
+    ),
+    Lane(
+        "interactive",
+        frozenset((UpdateType.CALLBACK_QUERY, UpdateType.INLINE_QUERY, UpdateType.CHOSEN_INLINE_RESULT)),
+        priority=1,
+        concurrency=64,
+        reserved=16,
+    ),
+)
+"""Default lanes for `DEFAULT_MAX_CONCURRENCY`, see `get_default_lanes`."""
+
+
+def get_default_lanes(max_concurrency: int = DEFAULT_MAX_CONCURRENCY, /) -> tuple[Lane, ...]:
+    """Default lanes with concurrency and reserved slots scaled to the max concurrency of the scheduler."""
+    return tuple(
+        dataclasses.replace(
+            lane,
+            concurrency=max(1, lane.concurrency * max_concurrency // DEFAULT_MAX_CONCURRENCY),
+            reserved=lane.reserved * max_concurrency // DEFAULT_MAX_CONCURRENCY,
+        )
+        for lane in DEFAULT_LANES
+    )
+
+
+class LaneScheduler:
+    """Scheduler in front of `Dispatch.feed` which routes updates into lanes by their update type.
+
+    Each lane has its own queue, so a flood of one update type (e.g. group messages)
+    cannot starve latency-sensitive ones like `callback_query` or `pre_checkout_query`.
+    Latency (from submission to the end of feeding) is sampled per lane.
+
+    ```python
+    scheduler = LaneScheduler(max_concurrency=128)
+    bot = Mubble(api, lane_scheduler=scheduler)
+    ...
+    scheduler.stats()  # {"payments": LaneStats(...), "interactive": ..., "default": ...}
+    ```
+    """
+
+    def __init__(
+        self,
+        lanes: typing.Iterable[Lane] | None = None,
+        *,
+        default_lane: Lane | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        if lanes is None:
+            lanes = get_default_lanes(max_concurrency)
+
+        self.max_concurrency = max_concurrency
+        self.default_lane = default_lane or Lane(
+            DEFAULT_LANE_NAME,
+            priority=0,
+            concurrency=max(1, max_concurrency * 3 // 4),
+        )
+        self._queues: dict[str, _LaneQueue] = {}
+        self._routes: dict[UpdateType, _LaneQueue] = {}
+        self._tasks: set[asyncio.Task[typing.Any]] = set()
+        self._active = 0
+
+        for lane in (*lanes, self.default_lane):
+            if lane.name in self._queues:
+                raise ValueError(f"Lane {lane.name!r} is already defined.")
+            queue = _LaneQueue(lane)
+            self._queues[lane.name] = queue
+            for update_type in lane.update_types:
+                self._routes.setdefault(update_type, queue)
+
+        self._ordered = sorted(self._queues.values(), key=lambda q: q.lane.priority, reverse=True)
+        if sum(q.lane.reserved for q in self._ordered) >= max_concurrency:
+            raise ValueError(
+                f"Reserved slots of lanes should leave free slots of max concurrency ({max_concurrency}).",
+            )
+
+    def __repr__(self) -> str:
+        return "<{}: lanes={!r}, active={}, max_concurrency={}>".format(
+            self.__class__.__name__,
+            [q.lane.name for q in self._ordered],
+            self._active,
+            self.max_concurrency,
+        )
+
+    @property
+    def lanes(self) -> tuple[Lane, ...]:
+        return tuple(q.lane for q in self._ordered)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(q.pending) for q in self._ordered)
+
+    def get_lane(self, update_type: UpdateType, /) -> Lane:
+        return self._routes.get(update_type, self._queues[self.default_lane.name]).lane
+
+    def submit(self, update: Update, feed: Feed, /) -> None:
+        """Put the update into its lane and start feeding if there are free slots."""
+        queue = self._routes.get(update.update_type, self._queues[self.default_lane.name])
+        queue.pending.append((update, feed, time.perf_counter()))
+        self._pump()
+
+    def stats(self) -> dict[str, LaneStats]:
+        """Latency percentiles (in seconds) are calculated over the recent samples of each lane."""
+        return {
+            q.lane.name: LaneStats(
+                name=q.lane.name,
+                pending=len(q.pending),
+                active=q.active,
+                processed=q.processed,
+                p50=q.percentile(0.5),
+                p95=q.percentile(0.95),
+                p99=q.percentile(0.99),
+            )
+            for q in self._ordered
+        }
+
+    async def join(self) -> None:
+        """Wait until all submitted updates are fed."""
+        while self._tasks or self.pending:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _pump(self) -> None:
+        held = 0  # Free slots reserved for the lanes of higher priority
+        for queue in self._ordered:
+            while (
+                queue.pending
+                and queue.active < queue.lane.concurrency
+                and self._active + held < self.max_concurrency
+            ):
+                update, feed, submitted_at = queue.pending.popleft()
+                queue.active += 1
+                self._active += 1
+                task = asyncio.get_running_loop().create_task(self._run(queue, update, feed, submitted_at))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+            if self._active >= self.max_concurrency:
+                return
+            held += max(0, queue.lane.reserved - queue.active)
+
+    async def _run(self, queue: _LaneQueue, update: Update, feed: Feed, submitted_at: float) -> None:
+        try:
+            await feed(update)
+        except Exception:
+            logger.exception(
+                "Feeding update (update_id={}) in lane {!r} failed, traceback message below:",
+                update.update_id,
+                queue.lane.name,
+            )
+        finally:
+            queue.active -= 1
+            queue.processed += 1
+            queue.latencies.append(time.perf_counter() - submitted_at)
+            self._active -= 1
+            self._pump()
+
+
+__all__ = ("DEFAULT_LANES", "DEFAULT_MAX_CONCURRENCY", "Lane", "LaneScheduler", "LaneStats", "get_default_lanes")
@@ -9,14 +9,16 @@ from mubble.bot.cute_types.base import BaseCute
 from mubble.bot.dispatch.context import Context
 from mubble.bot.dispatch.handler.abc import ABCHandler
 from mubble.bot.dispatch.handler.func import Func, FuncHandler
+from mubble.bot.dispatch.index import HandlerIndex
 from mubble.bot.dispatch.middleware.abc import ABCMiddleware
 from mubble.bot.dispatch.process import process_inner
 from mubble.bot.dispatch.return_manager.abc import ABCReturnManager
 from mubble.bot.dispatch.view.abc import ABCStateView, ABCView
-from mubble.bot.rules.abc import ABCRule
+from mubble.bot.rules.abc import ABCRule, warm_up_translations
 from mubble.model import Model
 from mubble.msgspec_utils import Option
 from mubble.tools.error_handler.error_handler import ABCErrorHandler, ErrorHandler
+from mubble.tools.i18n.abc import ABCTranslator
 from mubble.types.objects import Update
 
 
@@ -47,6 +49,9 @@ class BaseView[Event: BaseCute](ABCView):
         self.middlewares: list[ABCMiddleware[Event]] = []
         self.return_manager: ABCReturnManager[Event] | None = None
         self._auto_rules: ABCRule | None = None
+        self.index_handlers = True
+        self._handler_index: HandlerIndex[Event] | None = None
+        self._index_translators: typing.Sequence[ABCTranslator] = ()
 
     @property
     def auto_rules(self) -> tuple[ABCRule] | tuple[()]:
@@ -70,6 +75,18 @@ class BaseView[Event: BaseCute](ABCView):
     def get_raw_event(update: Update) -> Option[Model]:
         return getattr(update, update.update_type.value)
 
+    @property
+    def handler_index(self) -> HandlerIndex[Event] | None:
+        """Index of handlers by static triggers of their rules, rebuilt when handlers are added.
+        Set `index_handlers` to `False` to check every handler of the view.
+        """
+        if not self.index_handlers:
+            return None
+        if self._handler_index is None or not self._handler_index.is_actual(self.handlers):
+            self._handler_index = HandlerIndex(self.handlers)
+            self._handler_index.warm_up(self._index_translators)
+        return self._handler_index
+
     @cached_property
     def event_model_class(self) -> Option[type[Event]]:
         return get_event_model_class(self)
@@ -214,12 +231,24 @@ class BaseView[Event: BaseCute](ABCView):
             self.middlewares,
             self.handlers,
             self.return_manager,
+            self.handler_index,
         )
 
     def load(self, external: typing.Self, /) -> None:
         self.handlers.extend(external.handlers)
         self.middlewares.extend(external.middlewares)
 
+    async def warm_up_translations(self, translators: typing.Sequence[ABCTranslator], /) -> None:
+        """Translate rules of the handlers and build the handler index for the locales of the translators."""
+        rules = [*self.auto_rules, *(rule for handler in self.handlers for rule in getattr(handler, "rules", ()))]
+        for translator in translators:
+            await warm_up_translations(rules, translator)
+
+        # Kept to warm up the index again when it is rebuilt
+        self._index_translators = translators
+        if (handler_index := self.handler_index) is not None:
+            handler_index.warm_up(translators)
+
 
 class BaseStateView[Event: BaseCute](ABCStateView[Event], BaseView[Event], ABC):
     @classmethod
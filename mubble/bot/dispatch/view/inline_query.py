@@ -1,16 +1,117 @@
+import asyncio
+import datetime
+import typing
+
+from mubble.api.api import API
 from mubble.bot.cute_types.inline_query import InlineQueryCute
+from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.middleware.abc import ABCMiddleware
+from mubble.bot.dispatch.process import process_inner
 from mubble.bot.dispatch.return_manager import InlineQueryReturnManager
 from mubble.bot.dispatch.view.base import BaseStateView
+from mubble.modules import logger
+from mubble.tools.inline_cache import InlineQueryCache, recording_answers
+from mubble.types.objects import InlineQuery, Update
+
+CONTEXT_CACHED_ANSWER_KEY: typing.Final[str] = "_inline_cached_answer"
+
+
+class InlineQueryCacheMiddleware(ABCMiddleware[InlineQueryCute]):
+    """Answers the query from the cache, it runs after the middlewares of the view,
+    so handlers are not run for a cached query but the other middlewares are.
+    """
+
+    def __init__(self, cache: InlineQueryCache) -> None:
+        self.cache = cache
+
+    async def pre(self, event: InlineQueryCute, ctx: Context) -> bool:
+        if (params := self.cache.get(event)) is None:
+            return True
+
+        logger.debug("Inline query (id={}) is answered from cache.", event.id)
+        await event.ctx_api.answer_inline_query(inline_query_id=event.id, **params)
+        ctx[CONTEXT_CACHED_ANSWER_KEY] = True
+        return False
 
 
 class InlineQueryView(BaseStateView[InlineQueryCute]):
-    def __init__(self) -> None:
+    """View for inline queries.
+
+    :param cancel_stale: Cancel in-flight handling of a query when a newer query from the same user arrives.
+    :param debounce: Delay handling to let the user finish typing, implies `cancel_stale`.
+    :param cache: Cache of answers, repeated queries are answered from cache without running handlers \
+    (middlewares of the view run first and can still reject the query).
+    """
+
+    def __init__(
+        self,
+        *,
+        cancel_stale: bool = False,
+        debounce: datetime.timedelta | float | None = None,
+        cache: InlineQueryCache | None = None,
+    ) -> None:
         super().__init__()
         self.return_manager = InlineQueryReturnManager()
+        self.debounce = debounce.total_seconds() if isinstance(debounce, datetime.timedelta) else debounce
+        self.cancel_stale = cancel_stale or self.debounce is not None
+        self.cache = cache
+        self._in_flight: dict[int, asyncio.Task[bool]] = {}
 
     @classmethod
     def get_state_key(cls, event: InlineQueryCute) -> int | None:
         return event.from_user.id
 
+    async def process(self, event: Update, api: API, context: Context) -> bool:
+        query = event.inline_query.unwrap()
+        if not self.cancel_stale:
+            return await self._process(query, event, api, context)
+
+        user_id = query.from_.id
+        if (stale_task := self._in_flight.get(user_id)) is not None and not stale_task.done():
+            logger.debug("Cancelling stale inline query handling for user (id={}).", user_id)
+            stale_task.cancel()
+
+        task = asyncio.create_task(self._process(query, event, api, context))
+        self._in_flight[user_id] = task
+
+        try:
+            return await task
+        except asyncio.CancelledError:
+            current_task = asyncio.current_task()
+            if current_task is not None and current_task.cancelling():
+                raise
+            # Superseded by a newer query of the user, which is handled instead
+            return True
+        finally:
+            if not task.done():
+                task.cancel()
+            if self._in_flight.get(user_id) is task:
+                del self._in_flight[user_id]
+
+    async def _process(self, query: InlineQuery, event: Update, api: API, context: Context) -> bool:
+        if self.debounce:
+            await asyncio.sleep(self.debounce)
+
+        if self.cache is None:
+            return await super().process(event, api, context)
+
+        with recording_answers() as answers:
+            result = await process_inner(
+                api,
+                self.event_model_class.unwrap().from_update(update=query, bound_api=api),
+                event,
+                context,
+                [*self.middlewares, InlineQueryCacheMiddleware(self.cache)],
+                self.handlers,
+                self.return_manager,
+                self.handler_index,
+            )
+
+        if context.get(CONTEXT_CACHED_ANSWER_KEY):
+            return True
+        if answers:
+            self.cache.set(query, answers[-1])
+        return result
+
 
-__all__ = ("InlineQueryView",)
+__all__ = ("CONTEXT_CACHED_ANSWER_KEY", "InlineQueryCacheMiddleware", "InlineQueryView")
@@ -110,6 +110,7 @@ class RawEventView(ABCEventRawView[UpdateCute], BaseView[UpdateCute]):
             self.middlewares,
             self.handlers,
             self.return_manager,
+            self.handler_index,
         )
 
 
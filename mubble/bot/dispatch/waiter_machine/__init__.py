@@ -1,3 +1,8 @@
+from mubble.bot.dispatch.waiter_machine.backend import (
+    ABCWaiterBackend,
+    RedisWaiterBackend,
+    SQLiteWaiterBackend,
+)
 from mubble.bot.dispatch.waiter_machine.hasher import (
     CALLBACK_QUERY_FOR_MESSAGE,
     CALLBACK_QUERY_FROM_CHAT,
@@ -13,6 +18,7 @@ from mubble.bot.dispatch.waiter_machine.middleware import WaiterMiddleware
 from mubble.bot.dispatch.waiter_machine.short_state import ShortState
 
 __all__ = (
+    "ABCWaiterBackend",
     "CALLBACK_QUERY_FOR_MESSAGE",
     "CALLBACK_QUERY_FROM_CHAT",
     "CALLBACK_QUERY_IN_CHAT_FOR_MESSAGE",
@@ -20,6 +26,8 @@ __all__ = (
     "MESSAGE_FROM_USER",
     "MESSAGE_FROM_USER_IN_CHAT",
     "MESSAGE_IN_CHAT",
+    "RedisWaiterBackend",
+    "SQLiteWaiterBackend",
     "ShortState",
     "StateViewHasher",
     "WaiterMachine",
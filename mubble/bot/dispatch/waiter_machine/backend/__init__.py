@@ -0,0 +1,11 @@
+from mubble.bot.dispatch.waiter_machine.backend.abc import ABCWaiterBackend
+from mubble.bot.dispatch.waiter_machine.backend.redis import RedisConnection, RedisError, RedisWaiterBackend
+from mubble.bot.dispatch.waiter_machine.backend.sqlite import SQLiteWaiterBackend
+
+__all__ = (
+    "ABCWaiterBackend",
+    "RedisConnection",
+    "RedisError",
+    "RedisWaiterBackend",
+    "SQLiteWaiterBackend",
+)
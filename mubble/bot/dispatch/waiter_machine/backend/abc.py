@@ -0,0 +1,40 @@
+import abc
+import typing
+
+
+class ABCWaiterBackend(abc.ABC):
+    """Shared registry of waiters for multi-process deployments.
+
+    A process which waits registers the waiter key (hasher name and waiter hash) as its own.
+    A process which receives an update for a waiter registered by another process
+    sends the update to the owner (see `notify`), the owner feeds it to its dispatch.
+    """
+
+    @abc.abstractmethod
+    async def register(self, hasher: str, waiter: str, owner: str, *, expires_at: float | None = None) -> None:
+        """Register the waiter as owned by the process, `expires_at` is a unix timestamp."""
+
+    @abc.abstractmethod
+    async def unregister(self, hasher: str, waiter: str, owner: str) -> None:
+        """Unregister the waiter if it is still owned by the process."""
+
+    @abc.abstractmethod
+    async def get_owner(self, hasher: str, waiter: str) -> str | None: ...
+
+    @abc.abstractmethod
+    async def notify(self, owner: str, update: bytes) -> None:
+        """Send the raw update (JSON) to the owner process."""
+
+    @abc.abstractmethod
+    def listen(self, owner: str) -> typing.AsyncIterator[bytes]:
+        """Raw updates sent to the owner process."""
+
+    @abc.abstractmethod
+    async def drop_owner(self, owner: str) -> None:
+        """Drop all waiters and pending updates of the owner, e.g. left after a restart of the process."""
+
+    async def close(self) -> None:
+        pass
+
+
+__all__ = ("ABCWaiterBackend",)
@@ -0,0 +1,156 @@
+import asyncio
+import typing
+
+from mubble.bot.dispatch.waiter_machine.backend.abc import ABCWaiterBackend
+
+type RESPValue = bytes | int | list[RESPValue] | None
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisConnection:
+    """Minimal client of the Redis protocol (RESP2), commands are executed one at a time."""
+
+    def __init__(self, host: str = "localhost", port: int = 6379, *, db: int = 0) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    def __repr__(self) -> str:
+        return "<{}: {}:{}/{}>".format(self.__class__.__name__, self.host, self.port, self.db)
+
+    @staticmethod
+    def pack(*args: str | bytes | int | float) -> bytes:
+        chunks = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            chunks.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(chunks)
+
+    async def _read(self, reader: asyncio.StreamReader) -> RESPValue:
+        line = (await reader.readuntil(b"\r\n"))[:-2]
+        prefix, payload = line[:1], line[1:]
+        match prefix:
+            case b"+":
+                return payload
+            case b"-":
+                raise RedisError(payload.decode())
+            case b":":
+                return int(payload)
+            case b"$":
+                if (length := int(payload)) == -1:
+                    return None
+                return (await reader.readexactly(length + 2))[:-2]
+            case b"*":
+                if (length := int(payload)) == -1:
+                    return None
+                return [await self._read(reader) for _ in range(length)]
+            case _:
+                raise RedisError(f"Unexpected reply: {line!r}")
+
+    async def execute(self, *args: str | bytes | int | float) -> RESPValue:
+        async with self._lock:
+            if self._writer is None or self._reader is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+                if self.db:
+                    self._writer.write(self.pack("SELECT", self.db))
+                    await self._read(self._reader)
+
+            writer = self._writer
+            try:
+                writer.write(self.pack(*args))
+                await writer.drain()
+                return await self._read(self._reader)
+            except BaseException:
+                # The reply can be left unread (e.g. `BLPOP` was cancelled), so it would be
+                # read as the reply of the next command, the connection is opened again
+                writer.close()
+                self._reader = self._writer = None
+                raise
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+class RedisWaiterBackend(ABCWaiterBackend):
+    """Waiter backend in Redis (or any server speaking the Redis protocol).
+
+    Waiters are stored as keys expiring with the waiter, updates for the owner
+    are pushed to its list and received with `BLPOP`.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        *,
+        db: int = 0,
+        prefix: str = "mubble:waiters",
+        block_timeout: int = 5,
+    ) -> None:
+        self.prefix = prefix
+        self.block_timeout = block_timeout
+        self.connection = RedisConnection(host, port, db=db)
+        self._listen_connection = RedisConnection(host, port, db=db)
+
+    def __repr__(self) -> str:
+        return "<{}: {!r}, prefix={!r}>".format(self.__class__.__name__, self.connection, self.prefix)
+
+    def _waiter_key(self, hasher: str, waiter: str) -> str:
+        return f"{self.prefix}:waiter:{hasher}:{waiter}"
+
+    def _owner_key(self, owner: str) -> str:
+        return f"{self.prefix}:owner:{owner}"
+
+    def _updates_key(self, owner: str) -> str:
+        return f"{self.prefix}:updates:{owner}"
+
+    async def register(self, hasher: str, waiter: str, owner: str, *, expires_at: float | None = None) -> None:
+        key = self._waiter_key(hasher, waiter)
+        if expires_at is None:
+            await self.connection.execute("SET", key, owner)
+        else:
+            await self.connection.execute("SET", key, owner, "PXAT", int(expires_at * 1000))
+        await self.connection.execute("SADD", self._owner_key(owner), key)
+
+    async def unregister(self, hasher: str, waiter: str, owner: str) -> None:
+        key = self._waiter_key(hasher, waiter)
+        if await self.connection.execute("GET", key) == owner.encode():
+            await self.connection.execute("DEL", key)
+        await self.connection.execute("SREM", self._owner_key(owner), key)
+
+    async def get_owner(self, hasher: str, waiter: str) -> str | None:
+        owner = await self.connection.execute("GET", self._waiter_key(hasher, waiter))
+        return owner.decode() if isinstance(owner, bytes) else None
+
+    async def notify(self, owner: str, update: bytes) -> None:
+        await self.connection.execute("RPUSH", self._updates_key(owner), update)
+
+    async def listen(self, owner: str) -> typing.AsyncIterator[bytes]:
+        while True:
+            reply = await self._listen_connection.execute("BLPOP", self._updates_key(owner), self.block_timeout)
+            if isinstance(reply, list) and isinstance(update := reply[1], bytes):
+                yield update
+
+    async def drop_owner(self, owner: str) -> None:
+        keys = await self.connection.execute("SMEMBERS", self._owner_key(owner))
+        for key in keys if isinstance(keys, list) else ():
+            if not isinstance(key, bytes):
+                continue
+            if await self.connection.execute("GET", key) == owner.encode():
+                await self.connection.execute("DEL", key)
+        await self.connection.execute("DEL", self._owner_key(owner), self._updates_key(owner))
+
+    async def close(self) -> None:
+        await self.connection.close()
+        await self._listen_connection.close()
+
+
+__all__ = ("RedisConnection", "RedisError", "RedisWaiterBackend")
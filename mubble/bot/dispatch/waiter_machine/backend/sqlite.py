@@ -0,0 +1,109 @@
+import asyncio
+import pathlib
+import sqlite3
+import threading
+import time
+import typing
+
+from mubble.bot.dispatch.waiter_machine.backend.abc import ABCWaiterBackend
+
+SCHEMA: typing.Final[str] = """
+CREATE TABLE IF NOT EXISTS waiters (
+    hasher TEXT NOT NULL,
+    waiter TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (hasher, waiter)
+);
+CREATE INDEX IF NOT EXISTS waiters_owner ON waiters (owner);
+CREATE TABLE IF NOT EXISTS waiter_updates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    update_json BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS waiter_updates_owner ON waiter_updates (owner, id);
+"""
+
+
+class SQLiteWaiterBackend(ABCWaiterBackend):
+    """Waiter backend in a SQLite file shared by the processes of one host.
+
+    Queries are run in a thread, updates for the owner are polled every `poll_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        *,
+        poll_interval: float = 0.05,
+        batch_size: int = 100,
+    ) -> None:
+        self.path = path
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def __repr__(self) -> str:
+        return "<{}: path={!r}>".format(self.__class__.__name__, str(self.path))
+
+    def _execute(self, query: str, *params: typing.Any) -> list[tuple[typing.Any, ...]]:
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+
+    async def _run(self, query: str, *params: typing.Any) -> list[tuple[typing.Any, ...]]:
+        return await asyncio.to_thread(self._execute, query, *params)
+
+    async def register(self, hasher: str, waiter: str, owner: str, *, expires_at: float | None = None) -> None:
+        await self._run(
+            "INSERT OR REPLACE INTO waiters (hasher, waiter, owner, expires_at) VALUES (?, ?, ?, ?)",
+            hasher,
+            waiter,
+            owner,
+            expires_at,
+        )
+
+    async def unregister(self, hasher: str, waiter: str, owner: str) -> None:
+        await self._run("DELETE FROM waiters WHERE hasher = ? AND waiter = ? AND owner = ?", hasher, waiter, owner)
+
+    async def get_owner(self, hasher: str, waiter: str) -> str | None:
+        rows = await self._run(
+            "SELECT owner FROM waiters WHERE hasher = ? AND waiter = ? AND (expires_at IS NULL OR expires_at > ?)",
+            hasher,
+            waiter,
+            time.time(),
+        )
+        return rows[0][0] if rows else None
+
+    async def notify(self, owner: str, update: bytes) -> None:
+        await self._run("INSERT INTO waiter_updates (owner, update_json) VALUES (?, ?)", owner, update)
+
+    def _pop_updates(self, owner: str) -> list[bytes]:
+        with self._lock:
+            rows = self._connection.execute(
+                "DELETE FROM waiter_updates WHERE id IN "
+                "(SELECT id FROM waiter_updates WHERE owner = ? ORDER BY id LIMIT ?) RETURNING id, update_json",
+                (owner, self.batch_size),
+            ).fetchall()
+        return [update for _, update in sorted(rows)]
+
+    async def listen(self, owner: str) -> typing.AsyncIterator[bytes]:
+        while True:
+            updates = await asyncio.to_thread(self._pop_updates, owner)
+            if not updates:
+                await asyncio.sleep(self.poll_interval)
+            for update in updates:
+                yield update
+
+    async def drop_owner(self, owner: str) -> None:
+        await self._run("DELETE FROM waiters WHERE owner = ?", owner)
+        await self._run("DELETE FROM waiter_updates WHERE owner = ?", owner)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+__all__ = ("SQLiteWaiterBackend",)
@@ -24,14 +24,24 @@ class Hasher(typing.Generic[Event, Data]):
         view_class: type[BaseView[Event]],
         get_hash_from_data: typing.Callable[[Data], typing.Hashable | None] | None = None,
         get_data_from_event: typing.Callable[[Event], Data | None] | None = None,
+        *,
+        name: str | None = None,
     ) -> None:
+        """:param name: Stable name of the hasher, required to share waiters between processes
+        (see `ABCWaiterBackend`), by default the name is unique to the hasher object.
+        """
         self.view_class = view_class
         self._get_hash_from_data = get_hash_from_data
         self._get_data_from_event = get_data_from_event
+        if name is not None:
+            self.name = name
 
     def __hash__(self) -> int:
         return hash(self.name)
 
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Hasher) and self.name == other.name
+
     def __repr__(self) -> str:
         return f"<Hasher {self.name}>"
 
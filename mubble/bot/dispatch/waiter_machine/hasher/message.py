@@ -31,18 +31,21 @@ MESSAGE_IN_CHAT = Hasher(
     view_class=MessageView,
     get_hash_from_data=from_chat_hash,
     get_data_from_event=get_chat_from_event,
+    name="MESSAGE_IN_CHAT",
 )
 
 MESSAGE_FROM_USER = Hasher(
     view_class=MessageView,
     get_hash_from_data=from_user_hash,
     get_data_from_event=get_user_from_event,
+    name="MESSAGE_FROM_USER",
 )
 
 MESSAGE_FROM_USER_IN_CHAT = Hasher(
     view_class=MessageView,
     get_hash_from_data=from_user_in_chat_hash,
     get_data_from_event=get_user_in_chat_from_event,
+    name="MESSAGE_FROM_USER_IN_CHAT",
 )
 
 
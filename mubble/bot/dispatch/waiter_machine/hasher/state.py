@@ -9,9 +9,16 @@ from mubble.tools.functional import from_optional
 class StateViewHasher[Event: BaseCute](Hasher[Event, int]):
     view: BaseStateView[Event]
 
-    def __init__(self, view: BaseStateView[Event]) -> None:
+    def __init__(self, view: BaseStateView[Event], *, name: str | None = None) -> None:
+        """:param name: Stable name of the hasher to share waiters of the view between processes,
+        by default the name is unique to the view object.
+        """
         self.view = view
-        super().__init__(view.__class__, get_hash_from_data=ECHO)
+        super().__init__(
+            view.__class__,
+            get_hash_from_data=ECHO,
+            name=name or f"{view.__class__.__name__}_state_{id(view)}",
+        )
 
     def get_data_from_event(self, event: Event) -> Option[int]:
         return from_optional(self.view.get_state_key(event))
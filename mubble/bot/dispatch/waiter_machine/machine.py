@@ -1,7 +1,12 @@
 import asyncio
 import datetime
+import heapq
+import itertools
+import time
 import typing
+import uuid
 
+from mubble.api.api import API
 from mubble.bot.cute_types.base import BaseCute
 from mubble.bot.dispatch.abc import ABCDispatch
 from mubble.bot.dispatch.context import Context
@@ -12,10 +17,14 @@ from mubble.bot.dispatch.waiter_machine.short_state import (
     ShortStateContext,
 )
 from mubble.bot.rules.abc import ABCRule
+from mubble.modules import logger
+from mubble.msgspec_utils import decoder, encoder
 from mubble.tools.lifespan import Lifespan
 from mubble.tools.limited_dict import LimitedDict
+from mubble.types.objects import Update
 
 from .actions import WaiterActions
+from .backend import ABCWaiterBackend
 from .hasher import Hasher, StateViewHasher
 
 type Storage[Event: BaseCute, HasherData] = dict[
@@ -23,6 +32,8 @@ type Storage[Event: BaseCute, HasherData] = dict[
     LimitedDict[typing.Hashable, ShortState[Event]],
 ]
 type HasherWithData[Event: BaseCute, Data] = tuple[Hasher[Event, Data], Data]
+type WaiterKey = tuple[Hasher[typing.Any, typing.Any], typing.Hashable]
+type Expiration = tuple[float, int, ShortState[typing.Any], tuple[WaiterKey, ...]]
 
 WEEK: typing.Final[datetime.timedelta] = datetime.timedelta(days=7)
 
@@ -42,17 +53,41 @@ def no_unpack(_: Context) -> tuple[()]:
 
 
 class WaiterMachine:
+    """Machine of waiters: coroutines waiting for an event matching the hasher.
+
+    With `backend` (see `ABCWaiterBackend`) waiters are registered in a shared store,
+    so an update received by another process (polling shard or webhook worker) is sent
+    to the process which waits for it, the process feeds it with `listen()`.
+    Hashers used across processes need stable names and should be added on startup
+    with `add_hasher()` in every process.
+    """
+
     def __init__(
         self,
         dispatch: ABCDispatch | None = None,
         *,
         max_storage_size: int = 1000,
         base_state_lifetime: datetime.timedelta = WEEK,
+        backend: ABCWaiterBackend | None = None,
+        owner: str | None = None,
     ) -> None:
+        """:param owner: Stable name of the process for `backend`, waiters left after a restart
+        of the process with the same name are dropped. By default the name is random.
+        """
         self.dispatch = dispatch
         self.max_storage_size = max_storage_size
         self.base_state_lifetime = base_state_lifetime
+        self.backend = backend
+        self.owner = owner or uuid.uuid4().hex
         self.storage: Storage = {}
+        self._backend_ready = False
+        self._received_updates: LimitedDict[int, bool] = LimitedDict(maxlimit=max_storage_size)
+        self._expirations: list[Expiration] = []
+        self._expirations_counter = itertools.count()
+        self._stale_expirations = 0
+        self._expiry_timer: asyncio.TimerHandle | None = None
+        self._expiry_due: float | None = None
+        self._expiry_task: asyncio.Task[int] | None = None
 
     def __repr__(self) -> str:
         return "<{}: with {} storage items and max_storage_size={}, base_state_lifetime={!r}>".format(
@@ -62,6 +97,18 @@ class WaiterMachine:
             self.base_state_lifetime,
         )
 
+    def add_hasher[Event: BaseCute](self, hasher: Hasher[Event, typing.Any], /) -> None:
+        """Add storage of the hasher and the waiter middleware to its view of the dispatch."""
+        if hasher in self.storage:
+            return
+
+        if self.dispatch:
+            view: BaseView[Event] = self.dispatch.get_view(hasher.view_class).expect(
+                RuntimeError(f"View {hasher.view_class.__name__!r} is not defined in dispatch."),
+            )
+            view.middlewares.insert(0, WaiterMiddleware(self, hasher))
+        self.storage[hasher] = LimitedDict(maxlimit=self.max_storage_size)
+
     def create_middleware[Event: BaseCute](self, view: BaseStateView[Event]) -> WaiterMiddleware[Event]:
         hasher = StateViewHasher(view)
         self.storage[hasher] = LimitedDict(maxlimit=self.max_storage_size)
@@ -78,6 +125,10 @@ class WaiterMachine:
 
             del self.storage[hasher]
 
+        self._expirations.clear()
+        self._stale_expirations = 0
+        self._set_expiry_timer()
+
     async def drop[Event: BaseCute, HasherData](
         self,
         hasher: Hasher[Event, HasherData],
@@ -90,17 +141,103 @@ class WaiterMachine:
         waiter_id: typing.Hashable = hasher.get_hash_from_data(data).expect(
             RuntimeError("Couldn't create hash from data"),
         )
-        short_state = self.storage[hasher].pop(waiter_id, None)
+        short_state = self._release(hasher, waiter_id)
         if short_state is None:
             raise LookupError(
                 "Waiter with identificator {} is not found for hasher {!r}.".format(waiter_id, hasher)
             )
 
+        await self._unregister((hasher, waiter_id))
+
+        await self._drop_short_state(short_state, **context)
+
+    async def _drop_short_state(self, short_state: ShortState[typing.Any], /, **context: typing.Any) -> None:
         if on_drop := short_state.actions.get("on_drop"):
             on_drop(short_state, **context)
 
         await short_state.cancel()
 
+    def _is_waiting(self, key: WaiterKey, short_state: ShortState[typing.Any], /) -> bool:
+        hasher, waiter_hash = key
+        return (storage := self.storage.get(hasher)) is not None and storage.data.get(waiter_hash) is short_state
+
+    def _release(
+        self,
+        hasher: Hasher[typing.Any, typing.Any],
+        waiter_hash: typing.Hashable,
+        /,
+    ) -> ShortState[typing.Any] | None:
+        """Remove the waiter from storage, its expiration entry becomes stale and is dropped lazily."""
+        if hasher not in self.storage or (short_state := self.storage[hasher].pop(waiter_hash, None)) is None:
+            return None
+
+        self._stale_expirations += 1
+        if self._stale_expirations > len(self._expirations) // 2:
+            self._expirations = [
+                expiration
+                for expiration in self._expirations
+                if any(self._is_waiting(key, expiration[2]) for key in expiration[3])
+            ]
+            heapq.heapify(self._expirations)
+            self._stale_expirations = 0
+        return short_state
+
+    def _schedule_expiry(self, short_state: ShortState[typing.Any], keys: tuple[WaiterKey, ...], /) -> None:
+        if short_state.expiration_date is None:
+            return
+
+        heapq.heappush(
+            self._expirations,
+            (short_state.expiration_date.timestamp(), next(self._expirations_counter), short_state, keys),
+        )
+        self._set_expiry_timer()
+
+    def _set_expiry_timer(self) -> None:
+        """Wake up only when the earliest waiter expires."""
+        due = self._expirations[0][0] if self._expirations else None
+        if self._expiry_timer is not None:
+            if due is not None and self._expiry_due is not None and self._expiry_due <= due:
+                return
+            self._expiry_timer.cancel()
+            self._expiry_timer = None
+
+        if due is not None:
+            self._expiry_due = due
+            self._expiry_timer = asyncio.get_running_loop().call_later(
+                max(0.0, due - time.time()),
+                self._on_expiry_timer,
+            )
+
+    def _on_expiry_timer(self) -> None:
+        self._expiry_timer = None
+        if self._expiry_task is None or self._expiry_task.done():
+            self._expiry_task = asyncio.create_task(self.drop_expired())
+
+    async def drop_expired(self) -> int:
+        """Drop waiters whose lifetime is over and run their `on_drop` actions.
+        Waiters are ordered by expiration date, so only due waiters are visited.
+
+        Returns the number of dropped waiters.
+        """
+        dropped = 0
+        now = time.time()
+
+        while self._expirations and self._expirations[0][0] <= now:
+            _, _, short_state, keys = heapq.heappop(self._expirations)
+            live_keys = [key for key in keys if self._is_waiting(key, short_state)]
+            if not live_keys:
+                self._stale_expirations = max(0, self._stale_expirations - 1)
+                continue
+
+            for hasher, waiter_hash in live_keys:
+                self.storage[hasher].pop(waiter_hash, None)
+            await self._unregister(*live_keys)
+            await self._drop_short_state(short_state)
+            dropped += 1
+
+        self._set_expiry_timer()
+        return dropped
+
     async def wait_from_event[Event: BaseCute](
         self,
         view: BaseStateView[Event],
@@ -150,21 +287,20 @@ class WaiterMachine:
         )
         waiter_hash = hasher.get_hash_from_data(data).expect(RuntimeError("Hasher couldn't create hash."))
 
-        if hasher not in self.storage:
-            if self.dispatch:
-                view: BaseView[Event] = self.dispatch.get_view(hasher.view_class).expect(
-                    RuntimeError(f"View {hasher.view_class.__name__!r} is not defined in dispatch."),
-                )
-                view.middlewares.insert(0, WaiterMiddleware(self, hasher))
-            self.storage[hasher] = LimitedDict(maxlimit=self.max_storage_size)
+        self.add_hasher(hasher)
 
         if (deleted_short_state := self.storage[hasher].set(waiter_hash, short_state)) is not None:
+            self._stale_expirations += 1
             await deleted_short_state.cancel()
 
+        self._schedule_expiry(short_state, ((hasher, waiter_hash),))
+        await self._register(short_state, (hasher, waiter_hash))
+
         async with lifespan:
             await event.wait()
 
-        self.storage[hasher].pop(waiter_hash, None)
+        self._release(hasher, waiter_hash)
+        await self._unregister((hasher, waiter_hash))
 
         if short_state.context is None:
             raise LookupError("No context in short_state.")
@@ -197,19 +333,17 @@ class WaiterMachine:
         for hasher, data in hashers:
             waiter_hash = hasher.get_hash_from_data(data).expect(RuntimeError("Hasher couldn't create hash."))
 
-            if hasher not in self.storage:
-                if self.dispatch:
-                    view = self.dispatch.get_view(hasher.view_class).expect(
-                        RuntimeError(f"View {hasher.view_class.__name__!r} is not defined in dispatch."),
-                    )
-                    view.middlewares.insert(0, WaiterMiddleware(self, hasher))
-                self.storage[hasher] = LimitedDict(maxlimit=self.max_storage_size)
+            self.add_hasher(hasher)
 
             if (deleted_short_state := self.storage[hasher].set(waiter_hash, short_state)) is not None:
+                self._stale_expirations += 1
                 await deleted_short_state.cancel()
 
             waiter_hashes[hasher] = waiter_hash
 
+        self._schedule_expiry(short_state, tuple(waiter_hashes.items()))
+        await self._register(short_state, *waiter_hashes.items())
+
         async with lifespan:
             await event.wait()
 
@@ -221,7 +355,8 @@ class WaiterMachine:
             raise LookupError("Initiator not found in short_state context.")
 
         for hasher, waiter_hash in waiter_hashes.items():
-            self.storage[hasher].pop(waiter_hash, None)
+            self._release(hasher, waiter_hash)
+        await self._unregister(*waiter_hashes.items())
 
         return (
             initiator,
@@ -229,14 +364,82 @@ class WaiterMachine:
             *unpack(short_state.context.context),
         )
 
-    async def clear_storage(self) -> None:
-        """Clears storage."""
-        now = datetime.datetime.now()
+    @staticmethod
+    def get_waiter_key(waiter_hash: typing.Hashable, /) -> str:
+        """Key of the waiter hash in the backend, hashes should have a stable `repr` (ints, strings, tuples)."""
+        return repr(waiter_hash)
+
+    async def _prepare_backend(self, backend: ABCWaiterBackend, /) -> None:
+        if not self._backend_ready:
+            self._backend_ready = True
+            await backend.drop_owner(self.owner)
+
+    async def _register(self, short_state: ShortState[typing.Any], /, *keys: WaiterKey) -> None:
+        if self.backend is None:
+            return
+
+        await self._prepare_backend(self.backend)
+        expires_at = short_state.expiration_date.timestamp() if short_state.expiration_date else None
+        for hasher, waiter_hash in keys:
+            await self.backend.register(
+                hasher.name,
+                self.get_waiter_key(waiter_hash),
+                self.owner,
+                expires_at=expires_at,
+            )
+
+    async def _unregister(self, *keys: WaiterKey) -> None:
+        if self.backend is None:
+            return
+
+        for hasher, waiter_hash in keys:
+            await self.backend.unregister(hasher.name, self.get_waiter_key(waiter_hash), self.owner)
 
-        for hasher in self.storage:
-            for ident, short_state in self.storage.get(hasher, {}).copy().items():
-                if short_state.expiration_date is not None and now > short_state.expiration_date:
-                    await self.drop(hasher, data=ident, force=True)
+    async def forward(
+        self,
+        hasher: Hasher[typing.Any, typing.Any],
+        waiter_hash: typing.Hashable,
+        update: Update,
+        /,
+    ) -> bool:
+        """Send the update to the process which waits for it (see `backend`).
+        Returns `True` if the update is sent and should not be handled by this process.
+        """
+        if self.backend is None or update.update_id in self._received_updates:
+            return False
+
+        waiter_key = self.get_waiter_key(waiter_hash)
+        owner = await self.backend.get_owner(hasher.name, waiter_key)
+        if owner is None:
+            return False
+        if owner == self.owner:
+            # Waiter is not in storage anymore, e.g. the process is restarted
+            await self.backend.unregister(hasher.name, waiter_key, owner)
+            return False
+
+        logger.debug("Forwarding update (id={}) to waiter owner {!r}.", update.update_id, owner)
+        await self.backend.notify(owner, encoder.encode(update, as_str=False))
+        return True
+
+    async def listen(self, api: API) -> typing.NoReturn:
+        """Feed the updates sent to waiters of this process by other processes, requires `backend` and `dispatch`."""
+        if self.backend is None or self.dispatch is None:
+            raise RuntimeError("Waiter machine has no backend or dispatch to listen.")
+
+        await self._prepare_backend(self.backend)
+        async for raw_update in self.backend.listen(self.owner):
+            update = decoder.decode(raw_update, type=Update)
+            self._received_updates[update.update_id] = True
+            try:
+                await self.dispatch.feed(update, api)
+            except Exception as exc:
+                logger.exception("Failed to feed forwarded update (id={}): {!r}", update.update_id, exc)
+
+        raise RuntimeError("Waiter backend stopped listening.")
+
+    async def clear_storage(self) -> None:
+        """Drops expired waiters, expired waiters are also dropped on time by the machine itself (see `drop_expired`)."""
+        await self.drop_expired()
 
 
 async def clear_wm_storage_worker(
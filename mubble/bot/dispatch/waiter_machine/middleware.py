@@ -41,7 +41,7 @@ class WaiterMiddleware[Event: BaseCute](ABCMiddleware[Event]):
             key.unwrap()
         )
         if not short_state:
-            return True
+            return not await self.machine.forward(self.hasher, key.unwrap(), ctx.raw_update)
 
         preset_context = Context(short_state=short_state)
         if short_state.context is not None:
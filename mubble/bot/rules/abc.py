@@ -1,3 +1,4 @@
+import dataclasses
 import inspect
 from abc import ABC, abstractmethod
 from functools import cached_property
@@ -6,14 +7,18 @@ import typing_extensions as typing
 
 from mubble.bot.cute_types import MessageCute, UpdateCute
 from mubble.bot.dispatch.context import Context
-from mubble.bot.dispatch.process import check_rule
+from mubble.bot.dispatch.process import check_rule, translate_rule
 from mubble.node.base import NodeType, get_nodes, is_node
 from mubble.tools.adapter import ABCAdapter
 from mubble.tools.adapter.node import Event
 from mubble.tools.adapter.raw_update import RawUpdateAdapter
 from mubble.tools.i18n.abc import ABCTranslator
 from mubble.tools.magic import (
+    TRANSLATIONS_KEY,
+    HashedKey,
+    cache_magic_value,
     cache_translation,
+    freeze_value,
     get_annotations,
     get_cached_translation,
     get_default_args,
@@ -21,6 +26,7 @@ from mubble.tools.magic import (
 from mubble.types.objects import Update as UpdateObject
 
 if typing.TYPE_CHECKING:
+    from mubble.bot.dispatch.index import Trigger
     from mubble.node.composer import NodeCollection
 
 AdaptTo = typing.TypeVar("AdaptTo", default=typing.Any, contravariant=True)
@@ -31,6 +37,23 @@ Message: typing.TypeAlias = MessageCute
 Update: typing.TypeAlias = UpdateCute
 
 
+@dataclasses.dataclass(frozen=True, slots=True)
+class CheckBinding:
+    name: str
+    annotation: typing.Any
+    is_type: bool
+    is_node: bool
+
+
+@cache_magic_value("__check_bindings__")
+def get_check_bindings(check: typing.Callable[..., typing.Any], /) -> tuple[CheckBinding, ...]:
+    """Binding plan of the rule check parameters, compiled once per check function."""
+    return tuple(
+        CheckBinding(k, v, is_type=isinstance(v, type), is_node=is_node(v))
+        for k, v in get_annotations(check).items()
+    )
+
+
 def with_caching_translations(func: typing.Callable[..., typing.Any]):
     """Should be used as decorator for .translate method. Caches rule translations."""
 
@@ -44,9 +67,19 @@ def with_caching_translations(func: typing.Callable[..., typing.Any]):
     return wrapper
 
 
+def freeze_attribute(value: typing.Any, /) -> typing.Hashable:
+    """Hashable equivalent of the rule attribute, mutable containers are frozen by their identity
+    (they can be changed after the key is built, and freezing a large container costs a copy of it).
+    """
+    if isinstance(value, list | set | dict | bytearray):
+        return (type(value), id(value))
+    return freeze_value(value)
+
+
 class ABCRule(ABC, typing.Generic[AdaptTo]):
     adapter: ABCAdapter[UpdateObject, AdaptTo]
     requires: list["ABCRule"] = []
+    pure: bool = False
 
     if typing.TYPE_CHECKING:
 
@@ -65,10 +98,17 @@ class ABCRule(ABC, typing.Generic[AdaptTo]):
         *,
         requires: list["ABCRule"] | None = None,
         adapter: ABCAdapter[UpdateObject, AdaptTo] | None = None,
+        pure: bool | None = None,
     ) -> None:
-        """Merges requirements from inherited classes and rule-specific requirements."""
+        """Merges requirements from inherited classes and rule-specific requirements.
+
+        Pure rules depend only on the update, their results (with changes of the context)
+        are memoized per event and reused by the other handlers, see `memo_key`.
+        """
         if adapter is not None:
             cls.adapter = adapter
+        if pure is not None:
+            cls.pure = pure
 
         requirements = []
         for base in inspect.getmro(cls):
@@ -118,6 +158,29 @@ class ABCRule(ABC, typing.Generic[AdaptTo]):
     def required_nodes(self) -> dict[str, type[NodeType]]:
         return get_nodes(self.check)
 
+    @cached_property
+    def memo_key(self) -> typing.Hashable:
+        """Key of the pure rule result in the per-event memo.
+        Rules of the same class with equal attributes share the result, mutable containers
+        (lists, sets, dicts) are compared by identity, so the rules share the result with the same container.
+
+        The key is built once, so attributes of a pure rule must not be reassigned after its first check.
+        """
+        if dataclasses.is_dataclass(self):
+            attributes = {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+        else:
+            attributes = {
+                k: v
+                for k, v in vars(self).items()
+                if k != TRANSLATIONS_KEY and not isinstance(getattr(self.__class__, k, None), cached_property)
+            }
+
+        key = (self.__class__, tuple((k, freeze_attribute(v)) for k, v in sorted(attributes.items())))
+        try:
+            return HashedKey(key)
+        except TypeError:
+            return id(self)
+
     def as_optional(self) -> "ABCRule":
         return self | Always()
 
@@ -134,18 +197,21 @@ class ABCRule(ABC, typing.Generic[AdaptTo]):
         bound_check_rule = self.check
         kw = {}
         node_col_values = node_col.values if node_col is not None else {}
-        temp_ctx = get_default_args(bound_check_rule) | ctx
+        defaults = get_default_args(bound_check_rule)
 
-        for i, (k, v) in enumerate(get_annotations(bound_check_rule).items()):
+        for i, binding in enumerate(get_check_bindings(bound_check_rule)):
+            k, v = binding.name, binding.annotation
             if (isinstance(adapted_value, Event) and i == 0) or (  # First arg is Event
-                isinstance(v, type) and isinstance(adapted_value, v)
+                binding.is_type and isinstance(adapted_value, v)
             ):
                 kw[k] = adapted_value if not isinstance(adapted_value, Event) else adapted_value.obj
-            elif is_node(v):
+            elif binding.is_node:
                 assert k in node_col_values, "Node is undefined, error while bounding."
                 kw[k] = node_col_values[k]
-            elif k in temp_ctx:
-                kw[k] = temp_ctx[k]
+            elif k in ctx:
+                kw[k] = ctx[k]
+            elif k in defaults:
+                kw[k] = defaults[k]
             elif v is Context:
                 kw[k] = ctx
             else:
@@ -162,48 +228,104 @@ class ABCRule(ABC, typing.Generic[AdaptTo]):
     async def translate(self, translator: ABCTranslator) -> typing.Self:
         return self
 
+    def get_trigger(self) -> "Trigger | None":
+        """Static trigger keys of the rule used to index handlers, `None` if the rule cannot be indexed."""
+        return None
+
 
 class AndRule(ABCRule):
     def __init__(self, *rules: ABCRule) -> None:
         self.rules = rules
+        self.pure = all(rule.pure for rule in rules)
+
+    def get_trigger(self) -> "Trigger | None":
+        for rule in self.rules:
+            if (trigger := rule.get_trigger()) is not None:
+                return trigger
+        return None
 
     async def check(self, event: Update, ctx: Context) -> bool:
-        ctx_copy = ctx.copy()
+        branch = ctx.branch()
         for rule in self.rules:
-            if not await check_rule(event.ctx_api, rule, event, ctx_copy):
+            if not await check_rule(event.ctx_api, rule, event, ctx):
+                ctx.rollback(branch)
                 return False
-        ctx |= ctx_copy
+        ctx.commit(branch)
         return True
 
 
 class OrRule(ABCRule):
     def __init__(self, *rules: ABCRule) -> None:
         self.rules = rules
+        self.pure = all(rule.pure for rule in rules)
+
+    def get_trigger(self) -> "Trigger | None":
+        if not self.rules:
+            return None
+
+        trigger = self.rules[0].get_trigger()
+        for rule in self.rules[1:]:
+            if trigger is None or (other := rule.get_trigger()) is None:
+                return None
+            trigger = trigger.merge(other)
+        return trigger
 
     async def check(self, event: Update, ctx: Context) -> bool:
         for rule in self.rules:
-            ctx_copy = ctx.copy()
-            if await check_rule(event.ctx_api, rule, event, ctx_copy):
-                ctx |= ctx_copy
+            branch = ctx.branch()
+            if await check_rule(event.ctx_api, rule, event, ctx):
+                ctx.commit(branch)
                 return True
+            ctx.rollback(branch)
         return False
 
 
 class NotRule(ABCRule):
     def __init__(self, rule: ABCRule) -> None:
         self.rule = rule
+        self.pure = rule.pure
 
     async def check(self, event: Update, ctx: Context) -> bool:
-        ctx_copy = ctx.copy()
-        return not await check_rule(event.ctx_api, self.rule, event, ctx_copy)
-
-
-class Never(ABCRule):
+        branch = ctx.branch()
+        result = await check_rule(event.ctx_api, self.rule, event, ctx)
+        ctx.rollback(branch)
+        return not result
+
+
+def get_subrules(rule: ABCRule, /) -> list[ABCRule]:
+    """Requirements of the rule and the rules it is composed of (attributes of `AndRule`, `OrRule` and so on)."""
+    subrules = list(rule.requires)
+    for key, value in vars(rule).items():
+        if key == TRANSLATIONS_KEY:
+            continue
+        if isinstance(value, ABCRule):
+            subrules.append(value)
+        elif isinstance(value, list | tuple):
+            subrules.extend(item for item in value if isinstance(item, ABCRule))  # type: ignore
+    return subrules
+
+
+async def warm_up_translations(rules: typing.Iterable[ABCRule], translator: ABCTranslator) -> None:
+    """Translate the rules with their subrules to the locale of the translator and cache the translations,
+    so rules are translated by a dictionary lookup while checking updates.
+    """
+    stack, seen = list(rules), set[int]()
+    while stack:
+        rule = stack.pop()
+        if id(rule) in seen:
+            continue
+
+        seen.add(id(rule))
+        cache_translation(rule, translator.locale, await translate_rule(rule, translator))
+        stack.extend(get_subrules(rule))
+
+
+class Never(ABCRule, pure=True):
     async def check(self) -> typing.Literal[False]:
         return False
 
 
-class Always(ABCRule):
+class Always(ABCRule, pure=True):
     async def check(self) -> typing.Literal[True]:
         return True
 
@@ -216,5 +338,8 @@ __all__ = (
     "Never",
     "NotRule",
     "OrRule",
+    "freeze_attribute",
+    "get_subrules",
+    "warm_up_translations",
     "with_caching_translations",
 )
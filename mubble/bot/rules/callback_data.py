@@ -12,7 +12,9 @@ from mubble.bot.rules.payload import (
     PayloadMarkupRule,
     PayloadModelRule,
 )
+from mubble.node.payload import PayloadData
 from mubble.tools.adapter.event import EventAdapter
+from mubble.tools.callback_data_serilization.json_ser import JSONSerializer
 from mubble.types.enums import UpdateType
 
 CallbackQuery: typing.TypeAlias = CallbackQueryCute
@@ -35,7 +37,7 @@ class CallbackQueryRule(
     def check(self, *args: typing.Any, **kwargs: typing.Any) -> CheckResult: ...
 
 
-class HasData(CallbackQueryRule):
+class HasData(CallbackQueryRule, pure=True):
     def check(self, event: CallbackQuery) -> bool:
         return bool(event.data)
 
@@ -44,7 +46,7 @@ class CallbackQueryDataRule(CallbackQueryRule, abc.ABC, requires=[HasData()]):
     pass
 
 
-class CallbackDataMap(CallbackQueryDataRule):
+class CallbackDataMap(CallbackQueryDataRule, pure=True):
     def __init__(self, mapping: MapDict, /) -> None:
         self.mapping = self.transform_to_callbacks(
             self.transform_to_map(mapping),
@@ -107,9 +109,9 @@ class CallbackDataMap(CallbackQueryDataRule):
 
         return True
 
-    async def check(self, event: CallbackQuery, ctx: Context) -> bool:
-        callback_data = event.decode_data().unwrap_or_none()
-        if callback_data is None:
+    async def check(self, callback_data: PayloadData[dict, JSONSerializer], ctx: Context) -> bool:
+        # Payload data node is composed once per event for all handlers
+        if not isinstance(callback_data, dict):
             return False
         if await self.match(callback_data, self.mapping):
             ctx.update(callback_data)
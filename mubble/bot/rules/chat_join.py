@@ -19,12 +19,12 @@ class ChatJoinRequestRule(
     def check(self, *args: typing.Any, **kwargs: typing.Any) -> CheckResult: ...
 
 
-class HasInviteLink(ChatJoinRequestRule):
+class HasInviteLink(ChatJoinRequestRule, pure=True):
     def check(self, event: ChatJoinRequest) -> bool:
         return bool(event.invite_link)
 
 
-class InviteLinkName(ChatJoinRequestRule, requires=[HasInviteLink()]):
+class InviteLinkName(ChatJoinRequestRule, requires=[HasInviteLink()], pure=True):
     def __init__(self, name: str, /) -> None:
         self.name = name
 
@@ -32,7 +32,7 @@ class InviteLinkName(ChatJoinRequestRule, requires=[HasInviteLink()]):
         return event.invite_link.unwrap().name.unwrap_or_none() == self.name
 
 
-class InviteLinkByCreator(ChatJoinRequestRule, requires=[HasInviteLink()]):
+class InviteLinkByCreator(ChatJoinRequestRule, requires=[HasInviteLink()], pure=True):
     def __init__(self, creator_id: int, /) -> None:
         self.creator_id = creator_id
 
@@ -1,7 +1,9 @@
 import dataclasses
+import itertools
 import typing
 
 from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import Trigger, TriggerKind
 from mubble.node.command import CommandInfo, single_split
 from mubble.node.me import Me
 from mubble.node.source import ChatSource
@@ -26,7 +28,54 @@ class Argument:
         return data
 
 
-class Command(ABCRule):
+class ArgumentsParser:
+    """Finds the first split of the tokens between the arguments in the order of `Command` splits
+    (the shortest value first, optional arguments are tried with a value, then without it).
+
+    Results are memoized by the argument and the token the rest of the string starts with,
+    so at most `arguments * tokens ** 2` values are checked instead of every combination of splits.
+    """
+
+    def __init__(self, arguments: typing.Sequence[Argument], s: str, tokens: list[str], separator: str) -> None:
+        self.arguments = arguments
+        self.s = s
+        self.count = len(tokens)
+        self.separator_length = len(separator)
+        self.starts = list(itertools.accumulate((len(token) + len(separator) for token in tokens), initial=0))
+        """Offsets of the tokens in the string, the last one is past the end of the string."""
+
+        self.results: dict[tuple[int, int], dict[str, typing.Any] | None] = {}
+
+    def parse(self, index: int = 0, position: int = 0) -> dict[str, typing.Any] | None:
+        """Values of the arguments from `index` parsed from the tokens from `position`."""
+        if index == len(self.arguments):
+            return {} if self.starts[position] >= len(self.s) else None
+
+        key = (index, position)
+        if key not in self.results:
+            self.results[key] = self._parse(index, position)
+        return self.results[key]
+
+    def _parse(self, index: int, position: int) -> dict[str, typing.Any] | None:
+        argument = self.arguments[index]
+        stops = range(position + 1, self.count + 1) if position < self.count else range(self.count, self.count + 1)
+        if index == len(self.arguments) - 1:
+            # The last argument can take only the rest of the string
+            stops = [stop for stop in stops[-2:] if self.starts[stop] >= len(self.s)]
+
+        for stop in stops:
+            data = argument.check(self.s[self.starts[position] : self.starts[stop] - self.separator_length])
+            if data is None and not argument.optional:
+                continue
+
+            if data is not None and (rest := self.parse(index + 1, stop)) is not None:
+                return {argument.name: data, **rest}
+            if argument.optional and (rest := self.parse(index + 1, position)) is not None:
+                return rest
+        return None
+
+
+class Command(ABCRule, pure=True):
     def __init__(
         self,
         names: str | typing.Iterable[str],
@@ -36,8 +85,9 @@ class Command(ABCRule):
         lazy: bool = False,
         validate_mention: bool = True,
         mention_needed_in_chat: bool = False,
+        max_tokens: int | None = None,
     ) -> None:
-        self.names = [names] if isinstance(names, str) else names
+        self.names = [names] if isinstance(names, str) else list(names)
         self.arguments = arguments
         self.prefixes = prefixes
         self.separator = separator
@@ -47,6 +97,15 @@ class Command(ABCRule):
         # if true then we'll check for mention when message is from a group
         self.mention_needed_in_chat = mention_needed_in_chat
 
+        # if set then arguments are split by the first `max_tokens - 1` separators, the rest is a single token
+        self.max_tokens = max_tokens
+
+    def get_trigger(self) -> Trigger:
+        return Trigger(
+            TriggerKind.COMMAND,
+            frozenset(prefix + name for prefix in self.prefixes for name in self.names),
+        )
+
     def remove_prefix(self, text: str) -> str | None:
         for prefix in self.prefixes:
             if text.startswith(prefix):
@@ -84,18 +143,8 @@ class Command(ABCRule):
         if self.lazy:
             return self.parse_argument(arguments, *single_split(s, self.separator), s)
 
-        all_split = s.split(self.separator)
-        for i in range(1, len(all_split) + 1):
-            ctx = self.parse_argument(
-                arguments,
-                self.separator.join(all_split[:i]),
-                self.separator.join(all_split[i:]),
-                s,
-            )
-            if ctx is not None:
-                return ctx
-
-        return None
+        tokens = s.split(self.separator, -1 if self.max_tokens is None else self.max_tokens - 1)
+        return ArgumentsParser(arguments, s, tokens, self.separator).parse()
 
     def check(self, command: CommandInfo, me: Me, chat: ChatSource, ctx: Context) -> bool:
         name = self.remove_prefix(command.name)
@@ -123,4 +172,4 @@ class Command(ABCRule):
         return True
 
 
-__all__ = ("Argument", "Command", "single_split")
+__all__ = ("Argument", "ArgumentsParser", "Command", "single_split")
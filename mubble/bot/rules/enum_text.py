@@ -6,7 +6,7 @@ from mubble.node.text import Text
 from .abc import ABCRule
 
 
-class EnumTextRule[T: enum.Enum](ABCRule):
+class EnumTextRule[T: enum.Enum](ABCRule, pure=True):
     def __init__(self, enum_t: type[T], *, lower_case: bool = True) -> None:
         self.enum_t = enum_t
         self.texts = list(
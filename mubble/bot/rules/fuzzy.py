@@ -1,23 +1,28 @@
-import difflib
+from functools import cached_property
 
 from mubble.bot.dispatch.context import Context
 from mubble.node.text import Text
+from mubble.tools.fuzzy_index import FuzzyIndex
 
 from .abc import ABCRule
 
 
-class FuzzyText(ABCRule):
+class FuzzyText(ABCRule, pure=True):
     def __init__(self, texts: str | list[str], /, min_ratio: float = 0.7) -> None:
         if isinstance(texts, str):
             texts = [texts]
         self.texts = texts
         self.min_ratio = min_ratio
 
+    @cached_property
+    def index(self) -> FuzzyIndex:
+        return FuzzyIndex(self.texts)
+
     def check(self, message_text: Text, ctx: Context) -> bool:
-        match = max(difflib.SequenceMatcher(a=message_text, b=text).ratio() for text in self.texts)
-        if match < self.min_ratio:
+        match = self.index.match(message_text, self.min_ratio)
+        if match is None:
             return False
-        ctx.fuzzy_ratio = match
+        ctx.fuzzy_ratio = match.ratio
         return True
 
 
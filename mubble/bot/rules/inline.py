@@ -21,12 +21,12 @@ class InlineQueryRule(
     def check(self, *args: typing.Any, **kwargs: typing.Any) -> CheckResult: ...
 
 
-class HasLocation(InlineQueryRule):
+class HasLocation(InlineQueryRule, pure=True):
     def check(self, query: InlineQuery) -> bool:
         return bool(query.location)
 
 
-class InlineQueryChatType(InlineQueryRule):
+class InlineQueryChatType(InlineQueryRule, pure=True):
     def __init__(self, chat_type: ChatType, /) -> None:
         self.chat_type = chat_type
 
@@ -34,7 +34,7 @@ class InlineQueryChatType(InlineQueryRule):
         return query.chat_type.map(lambda x: x == self.chat_type).unwrap_or(False)
 
 
-class InlineQueryText(InlineQueryRule):
+class InlineQueryText(InlineQueryRule, pure=True):
     def __init__(self, texts: str | list[str], *, lower_case: bool = False) -> None:
         self.texts = [
             text.lower() if lower_case else text for text in ([texts] if isinstance(texts, str) else texts)
@@ -45,7 +45,7 @@ class InlineQueryText(InlineQueryRule):
         return (query.query.lower() if self.lower_case else query.query) in self.texts
 
 
-class InlineQueryMarkup(InlineQueryRule):
+class InlineQueryMarkup(InlineQueryRule, pure=True):
     def __init__(self, patterns: PatternLike | list[PatternLike], /) -> None:
         self.patterns = Markup(patterns).patterns
 
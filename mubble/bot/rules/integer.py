@@ -5,12 +5,12 @@ from .abc import ABCRule
 from .node import NodeRule
 
 
-class IsInteger(NodeRule):
+class IsInteger(NodeRule, pure=True):
     def __init__(self) -> None:
         super().__init__(as_node(TextInteger))
 
 
-class IntegerInRange(ABCRule):
+class IntegerInRange(ABCRule, pure=True):
     def __init__(self, rng: range) -> None:
         self.rng = rng
 
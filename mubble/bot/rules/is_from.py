@@ -1,82 +1,99 @@
 import typing
 
 from mubble.node.source import ChatSource, UserSource
+from mubble.tools.identity_set import IdentitySet
 from mubble.types.enums import ChatType, DiceEmoji
 
 from .abc import ABCRule, Message
 from .message import MessageRule
 
 
-class IsBot(ABCRule):
+class IsBot(ABCRule, pure=True):
     def check(self, user: UserSource) -> bool:
         return user.is_bot
 
 
-class IsUser(ABCRule):
+class IsUser(ABCRule, pure=True):
     def check(self, user: UserSource) -> bool:
         return not user.is_bot
 
 
-class IsPremium(ABCRule):
+class IsPremium(ABCRule, pure=True):
     def check(self, user: UserSource) -> bool:
         return user.is_premium.unwrap_or(False)
 
 
-class IsLanguageCode(ABCRule):
-    def __init__(self, lang_codes: str | list[str], /) -> None:
-        self.lang_codes = [lang_codes] if isinstance(lang_codes, str) else lang_codes
+def to_identities[Identity: (int, str)](
+    identities: Identity | typing.Iterable[Identity] | IdentitySet[Identity],
+    /,
+) -> typing.Container[Identity]:
+    """Containers (lists, sets, identity sets) as is, so their changes at runtime are seen by the rule
+    (the rules are memoized by the identity of the container, see `ABCRule.memo_key`),
+    a single identity and other iterables as a hashed set. Lists are scanned, so use sets
+    or `IdentitySet` for many identities.
+    """
+    if isinstance(identities, int | str):
+        return frozenset((identities,))  # type: ignore
+    if isinstance(identities, typing.Container):
+        return identities
+    return frozenset(identities)
+
+
+class IsLanguageCode(ABCRule, pure=True):
+    def __init__(self, lang_codes: str | typing.Iterable[str] | IdentitySet[str], /) -> None:
+        self.lang_codes = to_identities(lang_codes)
 
     def check(self, user: UserSource) -> bool:
-        return user.language_code.unwrap_or_none() in self.lang_codes
+        return user.language_code.map(lambda code: code in self.lang_codes).unwrap_or(False)
 
 
-class IsUserId(ABCRule):
-    def __init__(self, user_ids: int | list[int], /) -> None:
-        self.user_ids = [user_ids] if isinstance(user_ids, int) else user_ids
+class IsUserId(ABCRule, pure=True):
+    def __init__(self, user_ids: int | typing.Iterable[int] | IdentitySet[int], /) -> None:
+        self.user_ids = to_identities(user_ids)
 
     def check(self, user: UserSource) -> bool:
         return user.id in self.user_ids
 
 
-class IsForum(ABCRule):
+class IsForum(ABCRule, pure=True):
     def check(self, chat: ChatSource) -> bool:
         return chat.is_forum.unwrap_or(False)
 
 
-class IsChatId(ABCRule):
-    def __init__(self, chat_ids: int | list[int], /) -> None:
-        self.chat_ids = [chat_ids] if isinstance(chat_ids, int) else chat_ids
+class IsChatId(ABCRule, pure=True):
+    def __init__(self, chat_ids: int | typing.Iterable[int] | IdentitySet[int], /) -> None:
+        self.chat_ids = to_identities(chat_ids)
 
     def check(self, chat: ChatSource) -> bool:
         return chat.id in self.chat_ids
 
 
-class IsPrivate(ABCRule):
+class IsPrivate(ABCRule, pure=True):
     def check(self, chat: ChatSource) -> bool:
         return chat.type == ChatType.PRIVATE
 
 
-class IsGroup(ABCRule):
+class IsGroup(ABCRule, pure=True):
     def check(self, chat: ChatSource) -> bool:
         return chat.type == ChatType.GROUP
 
 
-class IsSuperGroup(ABCRule):
+class IsSuperGroup(ABCRule, pure=True):
     def check(self, chat: ChatSource) -> bool:
         return chat.type == ChatType.SUPERGROUP
 
 
-class IsChat(ABCRule):
+class IsChat(ABCRule, pure=True):
     def check(self, chat: ChatSource) -> bool:
         return chat.type in (ChatType.GROUP, ChatType.SUPERGROUP)
 
 
-class IsDice(MessageRule):
+class IsDice(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.dice)
 
 
-class IsDiceEmoji(MessageRule, requires=[IsDice()]):
+class IsDiceEmoji(MessageRule, requires=[IsDice()], pure=True):
     def __init__(self, dice_emoji: DiceEmoji, /) -> None:
         self.dice_emoji = dice_emoji
 
@@ -84,12 +101,12 @@ class IsDiceEmoji(MessageRule, requires=[IsDice()]):
         return message.dice.unwrap().emoji == self.dice_emoji
 
 
-class IsForward(MessageRule):
+class IsForward(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.forward_origin)
 
 
-class IsForwardType(MessageRule, requires=[IsForward()]):
+class IsForwardType(MessageRule, requires=[IsForward()], pure=True):
     def __init__(self, fwd_type: typing.Literal["user", "hidden_user", "chat", "channel"], /) -> None:
         self.fwd_type = fwd_type
 
@@ -97,27 +114,27 @@ class IsForwardType(MessageRule, requires=[IsForward()]):
         return message.forward_origin.unwrap().v.type == self.fwd_type
 
 
-class IsReply(MessageRule):
+class IsReply(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.reply_to_message)
 
 
-class IsSticker(MessageRule):
+class IsSticker(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.sticker)
 
 
-class IsVideoNote(MessageRule):
+class IsVideoNote(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.video_note)
 
 
-class IsDocument(MessageRule):
+class IsDocument(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.document)
 
 
-class IsPhoto(MessageRule):
+class IsPhoto(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.photo)
 
@@ -143,4 +160,5 @@ __all__ = (
     "IsUser",
     "IsUserId",
     "IsVideoNote",
+    "to_identities",
 )
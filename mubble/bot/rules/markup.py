@@ -1,11 +1,15 @@
+import dataclasses
 import typing
 
 import vbml
 
 from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import Trigger, TriggerKind
 from mubble.node.either import Either
 from mubble.node.text import Caption, Text
 from mubble.tools.global_context.mubble_ctx import MubbleContext
+from mubble.tools.magic import cache_magic_value
+from mubble.tools.regex_set import get_literal_prefix, get_literal_suffix
 
 from .abc import ABCRule
 
@@ -13,8 +17,37 @@ type PatternLike = str | vbml.Pattern
 global_ctx: typing.Final[MubbleContext] = MubbleContext()
 
 
+@dataclasses.dataclass(frozen=True, slots=True)
+class PatternLiterals:
+    prefix: str
+    suffix: str
+
+    def fit(self, s: str, /) -> bool:
+        """The string has the literals, so it can match the pattern."""
+        return s.startswith(self.prefix) and (
+            s.endswith(self.suffix) or (s.endswith("\n") and s[:-1].endswith(self.suffix))
+        )
+
+
+@cache_magic_value("__pattern_literals__")
+def get_pattern_literals(pattern: vbml.Pattern, /) -> PatternLiterals:
+    """Static literals of the compiled pattern every matching string starts and ends with."""
+    return PatternLiterals(get_literal_prefix(pattern.compiler), get_literal_suffix(pattern.compiler))
+
+
+def get_patterns_trigger(kind: TriggerKind, patterns: list[vbml.Pattern]) -> Trigger | None:
+    """Prefix trigger of the patterns, `None` if some pattern has no literal prefix."""
+    prefixes = frozenset(get_pattern_literals(pattern).prefix for pattern in patterns)
+    if not prefixes or "" in prefixes:
+        return None
+    return Trigger(kind, prefixes, prefix=True)
+
+
 def check_string(patterns: list[vbml.Pattern], s: str, ctx: Context) -> bool:
     for pattern in patterns:
+        if not get_pattern_literals(pattern).fit(s):
+            continue
+
         match global_ctx.vbml_patcher.check(pattern, s):
             case None | False:
                 continue
@@ -24,7 +57,7 @@ def check_string(patterns: list[vbml.Pattern], s: str, ctx: Context) -> bool:
     return False
 
 
-class Markup(ABCRule):
+class Markup(ABCRule, pure=True):
     """Markup Language. See the [vbml documentation](https://github.com/tesseradecade/vbml/blob/master/docs/index.md)."""
 
     def __init__(self, patterns: PatternLike | list[PatternLike], /) -> None:
@@ -39,8 +72,11 @@ class Markup(ABCRule):
             for pattern in patterns
         ]
 
+    def get_trigger(self) -> Trigger | None:
+        return get_patterns_trigger(TriggerKind.TEXT, self.patterns)
+
     def check(self, text: Either[Text, Caption], ctx: Context) -> bool:
         return check_string(self.patterns, text, ctx)
 
 
-__all__ = ("Markup", "check_string")
+__all__ = ("Markup", "PatternLiterals", "check_string", "get_pattern_literals", "get_patterns_trigger")
@@ -4,7 +4,7 @@ from .message import Message, MessageRule
 from .text import HasText
 
 
-class HasMention(MessageRule, requires=[HasText()]):
+class HasMention(MessageRule, requires=[HasText()], pure=True):
     def check(self, message: Message) -> bool:
         if not message.entities.unwrap_or_none():
             return False
@@ -7,12 +7,12 @@ from .message import Message, MessageRule
 type Entity = str | MessageEntityType
 
 
-class HasEntities(MessageRule):
+class HasEntities(MessageRule, pure=True):
     def check(self, message: Message) -> bool:
         return bool(message.entities)
 
 
-class MessageEntities(MessageRule, requires=[HasEntities()]):
+class MessageEntities(MessageRule, requires=[HasEntities()], pure=True):
     def __init__(self, entities: Entity | list[Entity], /) -> None:
         self.entities = [entities] if not isinstance(entities, list) else entities
 
@@ -5,8 +5,9 @@ from functools import cached_property
 import msgspec
 
 from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import Trigger, TriggerKind
 from mubble.bot.rules.abc import ABCRule
-from mubble.bot.rules.markup import Markup, PatternLike, check_string
+from mubble.bot.rules.markup import Markup, PatternLike, check_string, get_patterns_trigger
 from mubble.msgspec_json import loads
 from mubble.node.base import Node
 from mubble.node.payload import Payload, PayloadData
@@ -14,7 +15,7 @@ from mubble.tools.callback_data_serilization.abc import ABCDataSerializer, Model
 from mubble.tools.callback_data_serilization.json_ser import JSONSerializer
 
 
-class PayloadRule[Data](ABCRule):
+class PayloadRule[Data](ABCRule, pure=True):
     def __init__(
         self,
         data_type: type[Data],
@@ -34,6 +35,11 @@ class PayloadRule[Data](ABCRule):
         context.set(self.alias, payload)
         return True
 
+    def get_trigger(self) -> Trigger | None:
+        if (prefix := self.serializer(self.data_type).get_prefix()) is None:
+            return None
+        return Trigger(TriggerKind.PAYLOAD, frozenset((prefix,)), prefix=True)
+
 
 class PayloadModelRule[Model: ModelType](PayloadRule[Model]):
     def __init__(
@@ -46,23 +52,29 @@ class PayloadModelRule[Model: ModelType](PayloadRule[Model]):
         super().__init__(model_t, serializer or JSONSerializer, alias=alias or "model")
 
 
-class PayloadEqRule(ABCRule):
+class PayloadEqRule(ABCRule, pure=True):
     def __init__(self, payloads: str | list[str], /) -> None:
         self.payloads = [payloads] if isinstance(payloads, str) else payloads
 
     def check(self, payload: Payload) -> bool:
         return any(p == payload for p in self.payloads)
 
+    def get_trigger(self) -> Trigger:
+        return Trigger(TriggerKind.PAYLOAD, frozenset(self.payloads))
+
 
-class PayloadMarkupRule(ABCRule):
+class PayloadMarkupRule(ABCRule, pure=True):
     def __init__(self, pattern: PatternLike | list[PatternLike], /) -> None:
         self.patterns = Markup(pattern).patterns
 
+    def get_trigger(self) -> Trigger | None:
+        return get_patterns_trigger(TriggerKind.PAYLOAD, self.patterns)
+
     def check(self, payload: Payload, context: Context) -> bool:
         return check_string(self.patterns, payload, context)
 
 
-class PayloadJsonEqRule(ABCRule):
+class PayloadJsonEqRule(ABCRule, pure=True):
     def __init__(self, payload: dict[str, typing.Any], /) -> None:
         self.payload = payload
 
@@ -18,7 +18,7 @@ class PaymentInvoiceRule(
     def check(self, *args: typing.Any, **kwargs: typing.Any) -> CheckResult: ...
 
 
-class PaymentInvoiceCurrency(PaymentInvoiceRule):
+class PaymentInvoiceCurrency(PaymentInvoiceRule, pure=True):
     def __init__(self, currency: str | Currency, /) -> None:
         self.currency = currency
 
@@ -1,17 +1,51 @@
 import re
 import typing
+from functools import cached_property
 
 from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import Trigger, TriggerKind
+from mubble.bot.dispatch.process import CONTEXT_STORE_RULES_KEY
 from mubble.node.either import Either
 from mubble.node.text import Caption, Text
+from mubble.tools.regex_set import RegexMatch, RegexSet, get_literal_prefix
 
 from .abc import ABCRule
 
 type PatternLike = str | typing.Pattern[str]
 
 
-class Regex(ABCRule):
-    def __init__(self, regexp: PatternLike | list[PatternLike]) -> None:
+def get_regex_match(regex_set: RegexSet, text: str, start: int, ctx: Context) -> RegexMatch | None:
+    """First match of the set patterns from `start`, shared per event by the rules of the set."""
+    memo = ctx.get(CONTEXT_STORE_RULES_KEY)
+    if memo is None:
+        return regex_set.match(text, start)
+
+    key = (regex_set, text)
+    if (memoized := memo.get(key)) is not None:
+        searched_from, match = memoized
+        # Patterns from `searched_from` to the match do not match
+        if searched_from <= start and (match is None or match.index >= start):
+            return match
+
+    match = regex_set.match(text, start)
+    memo[key] = (start, match)
+    return match
+
+
+class Regex(ABCRule, pure=True):
+    """Text matches one of the patterns (checked from the beginning of the text).
+
+    Patterns are combined into one regex. Pass the same `regex_set` to the `Regex`
+    rules of a view to combine all of them: the set is matched once per event and
+    each rule reads the result for its own patterns.
+    """
+
+    def __init__(
+        self,
+        regexp: PatternLike | list[PatternLike],
+        *,
+        regex_set: RegexSet | None = None,
+    ) -> None:
         self.regexp: list[re.Pattern[str]] = []
         match regexp:
             case re.Pattern() as pattern:
@@ -21,16 +55,28 @@ class Regex(ABCRule):
             case _:
                 self.regexp.extend(re.compile(regexp) if isinstance(regexp, str) else regexp for regexp in regexp)
 
+        self.regex_set = regex_set
+        self.indices = range(len(self.regexp)) if regex_set is None else regex_set.extend(self.regexp)
+
+    @cached_property
+    def combined(self) -> RegexSet:
+        return self.regex_set if self.regex_set is not None else RegexSet(self.regexp)
+
+    def get_trigger(self) -> Trigger | None:
+        prefixes = frozenset(map(get_literal_prefix, self.regexp))
+        if not prefixes or "" in prefixes:
+            return None
+        return Trigger(TriggerKind.TEXT, prefixes, prefix=True)
+
     def check(self, text: Either[Text, Caption], ctx: Context) -> bool:
-        for regexp in self.regexp:
-            response = re.match(regexp, text)
-            if response is not None:
-                if matches := response.groupdict():
-                    ctx |= matches
-                else:
-                    ctx |= {"matches": response.groups() or (response.group(),)}
-                return True
-        return False
-
-
-__all__ = ("Regex",)
+        response = get_regex_match(self.combined, text, self.indices.start, ctx)
+        if response is None or response.index >= self.indices.stop:
+            return False
+        if matches := response.groupdict():
+            ctx |= matches
+        else:
+            ctx |= {"matches": response.groups() or (response.group(),)}
+        return True
+
+
+__all__ = ("Regex", "get_regex_match")
@@ -60,11 +60,12 @@ class RuleEnum(ABCRule):
             return True
 
         for enum in self.__enum__:
-            ctx_copy = ctx.copy()
-            if await check_rule(event.ctx_api, enum.rule, event, ctx_copy):
-                ctx.update(ctx_copy)
+            branch = ctx.branch()
+            if await check_rule(event.ctx_api, enum.rule, event, ctx):
+                ctx.commit(branch)
                 self.save_state(ctx, enum)
                 return True
+            ctx.rollback(branch)
 
         return False
 
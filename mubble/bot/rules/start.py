@@ -16,6 +16,7 @@ class StartCommand(
         MessageEntities(MessageEntityType.BOT_COMMAND),
         Markup(["/start <param>", "/start"]),
     ],
+    pure=True,
 ):
     def __init__(
         self,
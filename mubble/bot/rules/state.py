@@ -2,12 +2,16 @@ import dataclasses
 import enum
 import typing
 
+from fntypes.option import Option
+
 from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import Trigger, TriggerKind
+from mubble.bot.dispatch.process import CONTEXT_STORE_STATES_KEY
 from mubble.bot.rules.abc import ABCRule
 from mubble.node.source import Source
 
 if typing.TYPE_CHECKING:
-    from mubble.tools.state_storage.abc import ABCStateStorage
+    from mubble.tools.state_storage.abc import ABCStateStorage, StateData
 
 
 class StateMeta(enum.Enum):
@@ -15,13 +19,38 @@ class StateMeta(enum.Enum):
     ANY = enum.auto()
 
 
+async def get_user_state[Payload](
+    storage: "ABCStateStorage[Payload]",
+    user_id: int,
+    ctx: Context,
+) -> "Option[StateData[Payload]]":
+    """State of the user, fetched from the storage once per event until the storage is written to."""
+    states = ctx.get(CONTEXT_STORE_STATES_KEY)
+    if states is None:
+        return await storage.get(user_id)
+
+    key = (storage, user_id)
+    if (cached := states.get(key)) is not None and cached[0] == storage.version:
+        return cached[1]
+
+    version = storage.version
+    state = await storage.get(user_id)
+    states[key] = (version, state)
+    return state
+
+
 @dataclasses.dataclass(frozen=True, slots=True, repr=False)
 class State[Payload](ABCRule):
     storage: "ABCStateStorage[Payload]"
     key: str | StateMeta | enum.Enum
 
+    def get_trigger(self) -> Trigger | None:
+        if self.key is StateMeta.ANY:
+            return None
+        return Trigger(TriggerKind.STATE, frozenset((self.key,)), source=self.storage)
+
     async def check(self, source: Source, ctx: Context) -> bool:
-        state = await self.storage.get(source.from_user.id)
+        state = await get_user_state(self.storage, source.from_user.id, ctx)
         if not state:
             return self.key == StateMeta.NO_STATE
 
@@ -32,4 +61,4 @@ class State[Payload](ABCRule):
         return True
 
 
-__all__ = ("State", "StateMeta")
+__all__ = ("State", "StateMeta", "get_user_state")
@@ -1,23 +1,24 @@
 import typing
 
 from mubble import node
+from mubble.bot.dispatch.index import Trigger, TriggerKind
 from mubble.tools.i18n.abc import ABCTranslator
 
 from .abc import ABCRule, with_caching_translations
 from .node import NodeRule
 
 
-class HasText(NodeRule):
+class HasText(NodeRule, pure=True):
     def __init__(self) -> None:
         super().__init__(node.as_node(node.text.Text))
 
 
-class HasCaption(NodeRule):
+class HasCaption(NodeRule, pure=True):
     def __init__(self) -> None:
         super().__init__(node.as_node(node.text.Caption))
 
 
-class Text(ABCRule):
+class Text(ABCRule, pure=True):
     def __init__(self, texts: str | list[str], /, *, ignore_case: bool = False) -> None:
         if not isinstance(texts, list):
             texts = [texts]
@@ -27,6 +28,9 @@ class Text(ABCRule):
     def check(self, text: node.either.Either[node.text.Text, node.text.Caption]) -> bool:
         return (text if not self.ignore_case else text.lower()) in self.texts
 
+    def get_trigger(self) -> Trigger:
+        return Trigger(TriggerKind.TEXT, frozenset(self.texts), ignore_case=self.ignore_case, translatable=True)
+
     @with_caching_translations
     async def translate(self, translator: ABCTranslator) -> typing.Self:
         return self.__class__(
@@ -4,7 +4,7 @@ from mubble.types.enums import UpdateType
 from .abc import ABCRule
 
 
-class IsUpdateType(ABCRule):
+class IsUpdateType(ABCRule, pure=True):
     def __init__(self, update_type: UpdateType, /) -> None:
         self.update_type = update_type
 
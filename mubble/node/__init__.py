@@ -27,6 +27,7 @@ from .base import (
     scalar_node,
     unwrap_node,
 )
+from .cache import NodeCache, NodeCacheStats, get_node_cache, invalidate_node
 from .callback_query import (
     CallbackQueryData,
     CallbackQueryDataJson,
@@ -45,11 +46,15 @@ from .rule import RuleChain
 from .scope import (
     GLOBAL,
     PER_CALL,
+    PER_CHAT,
     PER_EVENT,
+    PER_USER,
     NodeScope,
     global_node,
     per_call,
+    per_chat,
     per_event,
+    per_user,
 )
 from .source import ChatSource, Source, UserId, UserSource
 from .text import Text, TextInteger, TextLiteral
@@ -81,6 +86,8 @@ __all__ = (
     "Me",
     "Name",
     "Node",
+    "NodeCache",
+    "NodeCacheStats",
     "NodeCollection",
     "NodeComposeFunction",
     "NodeImpersonation",
@@ -90,7 +97,9 @@ __all__ = (
     "NodeType",
     "Optional",
     "PER_CALL",
+    "PER_CHAT",
     "PER_EVENT",
+    "PER_USER",
     "Payload",
     "PayloadData",
     "PayloadSerializer",
@@ -111,11 +120,15 @@ __all__ = (
     "compose_node",
     "compose_nodes",
     "generate_node",
+    "get_node_cache",
     "global_node",
     "impl",
+    "invalidate_node",
     "is_node",
     "per_call",
+    "per_chat",
     "per_event",
+    "per_user",
     "scalar_node",
     "unwrap_node",
 )
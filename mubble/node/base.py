@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import abc
 import inspect
+import weakref
 from collections import deque
 from types import AsyncGeneratorType, CodeType, resolve_bases
 
 import typing_extensions as typing
 
 from mubble.node.scope import NodeScope
-from mubble.tools.magic import cache_magic_value, get_annotations
+from mubble.tools.magic import cache_magic_value, freeze_value, get_annotations
 from mubble.tools.strings import to_pascal_case
 
 if typing.TYPE_CHECKING:
@@ -36,6 +37,8 @@ ComposeResult: typing.TypeAlias = (
 
 UNWRAPPED_NODE_KEY = "__unwrapped_node__"
 
+_FACTORY_NODES: weakref.WeakValueDictionary[typing.Hashable, type[typing.Any]] = weakref.WeakValueDictionary()
+
 
 @typing.overload
 def is_node(maybe_node: type[typing.Any], /) -> typing.TypeIs[type[NodeType]]: ...
@@ -108,26 +111,33 @@ def is_generator(
 
 
 def unwrap_node(node: type[NodeType], /) -> tuple[type[NodeType], ...]:
-    """Unwrap node as flattened tuple of node types in ordering required to calculate given node.
+    """Unwrap node as flattened tuple of node types in ordering required to calculate given node
+    (every node goes after all of its subnodes).
 
     Provides caching for passed node type.
     """
     if (unwrapped := getattr(node, UNWRAPPED_NODE_KEY, None)) is not None:
         return unwrapped
 
-    stack = deque([(node, node.get_subnodes().values())])
-    visited = list[type[NodeType]]()
+    visited = set[type[NodeType]]()
+    ordered = list[type[NodeType]]()
+    stack = deque([(node, False)])
 
     while stack:
-        parent, child_nodes = stack.pop()
-
-        if parent not in visited:
-            visited.insert(0, parent)
-
-        for child in child_nodes:
-            stack.append((child, child.get_subnodes().values()))
-
-    unwrapped = tuple(visited)
+        current, expanded = stack.pop()
+        if expanded:
+            ordered.append(current)
+            continue
+        if current in visited:
+            continue
+
+        visited.add(current)
+        stack.append((current, True))
+        for child in current.get_subnodes().values():
+            if child not in visited:
+                stack.append((child, False))
+
+    unwrapped = tuple(ordered)
     setattr(node, UNWRAPPED_NODE_KEY, unwrapped)
     return unwrapped
 
@@ -242,9 +252,22 @@ class FactoryNode(Node, abc.ABC):
         pass
 
     def __new__(cls, **context: typing.Any) -> type[typing.Self]:
+        """Specialization of the factory node, interned: equal parameters return the same node type,
+        so per event values are shared between all handlers and rules using it.
+        """
+        try:
+            key = (cls, freeze_value(context))
+            if (node := _FACTORY_NODES.get(key)) is not None:
+                return node
+        except TypeError:  # Unhashable parameters
+            key = None
+
         namespace = dict(**cls.__dict__)
         namespace.pop("__new__", None)
-        return type(cls.__name__, (cls,), namespace | context)  # type: ignore
+        node = type(cls.__name__, (cls,), namespace | context)
+        if key is not None:
+            _FACTORY_NODES[key] = node
+        return node  # type: ignore
 
 
 @typing.dataclass_transform()
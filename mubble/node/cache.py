@@ -0,0 +1,215 @@
+import asyncio
+import dataclasses
+import datetime
+import time
+import typing
+from collections import OrderedDict
+
+from fntypes.option import Nothing, Option, Some
+from fntypes.variative import Variative
+
+from mubble.modules import logger
+from mubble.node.base import ComposeError
+from mubble.node.scope import DEFAULT_CACHE_MAXSIZE, NodeScope
+from mubble.types.objects import Chat, Update, User
+
+if typing.TYPE_CHECKING:
+    from mubble.node.base import NodeType
+
+type CacheKey = int | NodeScope
+
+NODE_CACHE_KEY: typing.Final[str] = "__node_cache__"
+CACHED_SCOPES: typing.Final[frozenset[NodeScope]] = frozenset((NodeScope.PER_CHAT, NodeScope.PER_USER))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class NodeCacheStats:
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclasses.dataclass(slots=True)
+class CacheEntry:
+    value: typing.Any
+    expires_at: float | None
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= time.monotonic()
+
+
+class NodeCache:
+    """LRU cache of node values with expiration.
+
+    Values of per chat and per user nodes are keyed by the chat or user id,
+    the value of a global node is stored under the key `NodeScope.GLOBAL`.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: datetime.timedelta | float | None = None,
+        maxsize: int = DEFAULT_CACHE_MAXSIZE,
+    ) -> None:
+        self.ttl = ttl.total_seconds() if isinstance(ttl, datetime.timedelta) else ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._storage: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._refreshing: dict[CacheKey, asyncio.Task[typing.Any]] = {}
+
+    def __repr__(self) -> str:
+        return "<{}: {} values, ttl={}, maxsize={}, hits={}, misses={}>".format(
+            self.__class__.__name__,
+            len(self._storage),
+            self.ttl,
+            self.maxsize,
+            self.hits,
+            self.misses,
+        )
+
+    def __len__(self) -> int:
+        return len(self._storage)
+
+    def __contains__(self, key: object) -> bool:
+        return (entry := self._storage.get(key)) is not None and not entry.expired  # type: ignore
+
+    def lookup(self, key: CacheKey, /) -> CacheEntry | None:
+        """Entry of the key, expired entries are returned too but counted as misses."""
+        if (entry := self._storage.get(key)) is None or entry.expired:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        if entry is not None:
+            self._storage.move_to_end(key)
+        return entry
+
+    def get(self, key: CacheKey, /, default: typing.Any = None) -> typing.Any:
+        entry = self._storage.get(key)
+        return default if entry is None or entry.expired else entry.value
+
+    def set(self, key: CacheKey, value: typing.Any, /) -> None:
+        self._storage[key] = CacheEntry(value, None if self.ttl is None else time.monotonic() + self.ttl)
+        self._storage.move_to_end(key)
+
+        while len(self._storage) > self.maxsize:
+            self._storage.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *keys: CacheKey) -> None:
+        """Drop values of the keys or all values if keys are not specified."""
+        if not keys:
+            self._storage.clear()
+            return
+
+        for key in keys:
+            self._storage.pop(key, None)
+
+    def refresh(self, key: CacheKey, compose: typing.Callable[[], typing.Awaitable[typing.Any]], /) -> None:
+        """Compose a new value of the key in the background, the current value is served until then.
+        `compose` is called at once, only the awaitable it returns is awaited in the background.
+        """
+        if key in self._refreshing:
+            return
+
+        value = compose()
+
+        async def refresh() -> None:
+            try:
+                self.set(key, await value)
+            except (Exception, ComposeError) as exc:
+                logger.debug("Cannot refresh cached node value (key={!r}), error: {!r}", key, exc)
+            finally:
+                del self._refreshing[key]
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> NodeCacheStats:
+        return NodeCacheStats(
+            size=len(self._storage),
+            maxsize=self.maxsize,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+
+def _unwrap[T](value: Option[T] | T | None) -> T | None:
+    if isinstance(value, Nothing):
+        return None
+    return value.unwrap() if isinstance(value, Some) else value  # type: ignore
+
+
+def get_chat_id(update: Update, /) -> int | None:
+    event = update.incoming_update
+    chat = _unwrap(getattr(event, "chat", None))
+    if chat is None and (message := _unwrap(getattr(event, "message", None))) is not None:
+        chat = getattr(message.v if isinstance(message, Variative) else message, "chat", None)
+    return chat.id if isinstance(chat, Chat) else None
+
+
+def get_user_id(update: Update, /) -> int | None:
+    event = update.incoming_update
+    user = _unwrap(getattr(event, "from_", None)) or _unwrap(getattr(event, "user", None))
+    return user.id if isinstance(user, User) else None
+
+
+def get_node_cache(node: "type[NodeType]", /) -> NodeCache | None:
+    """Cache of the per chat, per user or global node with TTL (see `NodeScope`), created on first use."""
+    if (cache := node.__dict__.get(NODE_CACHE_KEY)) is not None:
+        return cache
+
+    scope = getattr(node, "scope", None)
+    ttl = getattr(node, "cache_ttl", None)
+    if scope not in CACHED_SCOPES and not (scope is NodeScope.GLOBAL and ttl is not None):
+        return None
+    if node.is_generator():
+        raise TypeError(f"Generator node {node.__name__!r} cannot be cached, its value outlives the generator.")
+
+    cache = NodeCache(
+        ttl=ttl,
+        maxsize=1 if scope is NodeScope.GLOBAL else getattr(node, "cache_maxsize", DEFAULT_CACHE_MAXSIZE),
+    )
+    setattr(node, NODE_CACHE_KEY, cache)
+    return cache
+
+
+def get_cache_key(node: "type[NodeType]", update: Update | None, /) -> CacheKey | None:
+    match getattr(node, "scope", None):
+        case NodeScope.GLOBAL:
+            return NodeScope.GLOBAL
+        case NodeScope.PER_CHAT if update is not None:
+            return get_chat_id(update)
+        case NodeScope.PER_USER if update is not None:
+            return get_user_id(update)
+        case _:
+            return None
+
+
+def invalidate_node(node: typing.Any, /, *keys: CacheKey) -> None:
+    """Drop cached values of the node for the chat or user ids, or all values if ids are not specified."""
+    if (cache := get_node_cache(node.as_node())) is not None:
+        cache.invalidate(*keys)
+
+
+__all__ = (
+    "CACHED_SCOPES",
+    "CacheEntry",
+    "NodeCache",
+    "NodeCacheStats",
+    "get_cache_key",
+    "get_chat_id",
+    "get_node_cache",
+    "get_user_id",
+    "invalidate_node",
+)
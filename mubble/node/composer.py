@@ -1,4 +1,6 @@
+import asyncio
 import dataclasses
+import functools
 import inspect
 import typing
 
@@ -14,11 +16,13 @@ from mubble.node.base import (
     NodeImpersonation,
     NodeScope,
     NodeType,
-    unwrap_node,
 )
+from mubble.node.cache import CACHED_SCOPES, get_cache_key, get_node_cache
 from mubble.tools.magic import join_dicts, magic_bundle
+from mubble.types.objects import Update
 
 type AsyncGenerator = typing.AsyncGenerator[typing.Any, None]
+type StepKey = tuple[type[NodeType], str | None]
 
 CONTEXT_STORE_NODES_KEY = "_node_ctx"
 GLOBAL_VALUE_KEY = "_value"
@@ -28,18 +32,27 @@ def get_scope(node: type[NodeType], /) -> NodeScope | None:
     return getattr(node, "scope", None)
 
 
-async def compose_node(
+def _bind_arguments(
     node: type[NodeType],
     linked: dict[type[typing.Any], typing.Any],
     data: dict[type[typing.Any], typing.Any] | None = None,
-) -> "NodeSession":
-    subnodes = node.get_subnodes()
-    kwargs = magic_bundle(node.compose, join_dicts(subnodes, linked))
+) -> dict[str, typing.Any]:
+    kwargs = magic_bundle(node.compose, join_dicts(node.get_subnodes(), linked))
 
     # Linking data via typebundle
     if data:
         kwargs.update(magic_bundle(node.compose, data, typebundle=True))
 
+    return kwargs
+
+
+async def compose_node(
+    node: type[NodeType],
+    linked: dict[type[typing.Any], typing.Any],
+    data: dict[type[typing.Any], typing.Any] | None = None,
+) -> "NodeSession":
+    kwargs = _bind_arguments(node, linked, data)
+
     if node.is_generator():
         generator = typing.cast(AsyncGenerator, node.compose(**kwargs))
         value = await generator.asend(None)
@@ -52,52 +65,227 @@ async def compose_node(
     return NodeSession(node, value, subnodes={}, generator=generator)
 
 
+@dataclasses.dataclass(frozen=True, slots=True)
+class ComposeStep:
+    node: type[NodeType]
+    key: StepKey
+    name: str
+    dependencies: tuple[tuple[type[NodeType], StepKey], ...]
+    is_async: bool
+    uses_name: bool
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ComposePlan:
+    """Nodes to compose grouped into levels, nodes of a level depend only on nodes of the previous levels.
+
+    Subnodes shared by several parameters are composed once, except per call nodes
+    which depend on the parameter `Name`, they are composed for every parameter.
+    """
+
+    levels: tuple[tuple[ComposeStep, ...], ...]
+    parameters: tuple[tuple[str, StepKey], ...]
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_compose_plan(nodes: tuple[tuple[str, type[NodeType]], ...], /) -> ComposePlan:
+    steps: dict[StepKey, ComposeStep] = {}
+    depths: dict[StepKey, int] = {}
+    uses_name: dict[type[NodeType], bool] = {}
+
+    def depends_on_name(node: type[NodeType]) -> bool:
+        if node not in uses_name:
+            uses_name[node] = node is Name or any(map(depends_on_name, node.get_subnodes().values()))
+        return uses_name[node]
+
+    def plan(node: type[NodeType], name: str) -> StepKey:
+        key = (node, name if get_scope(node) is NodeScope.PER_CALL and depends_on_name(node) else None)
+        if key in steps:
+            return key
+
+        subnodes = node.get_subnodes().values()
+        dependencies = tuple((subnode, plan(subnode, name)) for subnode in subnodes)
+        steps[key] = ComposeStep(
+            node=node,
+            key=key,
+            name=name,
+            dependencies=dependencies,
+            is_async=node.is_generator() or inspect.iscoroutinefunction(node.compose),
+            uses_name=Name in subnodes,
+        )
+        depths[key] = max((depths[dep_key] + 1 for _, dep_key in dependencies), default=0)
+        return key
+
+    parameters = tuple((name, plan(node, name)) for name, node in nodes)
+    levels = [list[ComposeStep]() for _ in range(max(depths.values(), default=-1) + 1)]
+    for key, step in steps.items():
+        levels[depths[key]].append(step)
+
+    return ComposePlan(levels=tuple(map(tuple, levels)), parameters=parameters)
+
+
+def get_compose_plan(nodes: typing.Mapping[str, IsNode | NodeImpersonation], /) -> ComposePlan:
+    return _get_compose_plan(tuple((name, node.as_node()) for name, node in nodes.items()))
+
+
+async def _compose_step(
+    step: ComposeStep,
+    sessions: dict[StepKey, "NodeSession"],
+    data: dict[type[typing.Any], typing.Any],
+) -> "NodeSession":
+    session = await compose_node(
+        step.node,
+        linked={node: sessions[key].value for node, key in step.dependencies},
+        data=data | {Name: step.name} if step.uses_name else data,
+    )
+    session.subnodes = {
+        str(i): sessions[key]
+        for i, (node, key) in enumerate(step.dependencies)
+        if get_scope(node) is NodeScope.PER_CALL
+    }
+    return session
+
+
+def get_cached_session(
+    node: type[NodeType],
+    event_nodes: dict[typing.Any, "NodeSession"],
+    update: Update | None,
+    /,
+    *,
+    refresh: typing.Callable[[], typing.Awaitable[typing.Any]] | None = None,
+) -> "NodeSession | None":
+    """Session of the node value cached for the event, chat, user or globally.
+    Expired global value is returned only if `refresh` is passed, it is called in the background.
+    """
+    scope = get_scope(node)
+    if (scope is NodeScope.PER_EVENT or scope in CACHED_SCOPES) and node in event_nodes:
+        return event_nodes[node]
+
+    if (cache := get_node_cache(node)) is not None:
+        key = get_cache_key(node, update)
+        if key is None or (entry := cache.lookup(key)) is None:
+            return None
+        if entry.expired:
+            if scope is not NodeScope.GLOBAL or refresh is None:
+                return None
+            cache.refresh(key, refresh)
+        return NodeSession(node, entry.value, {})
+
+    if scope is NodeScope.GLOBAL and hasattr(node, GLOBAL_VALUE_KEY):
+        return NodeSession(node, getattr(node, GLOBAL_VALUE_KEY), {})
+    return None
+
+
+def store_session(
+    node: type[NodeType],
+    session: "NodeSession",
+    event_nodes: dict[typing.Any, "NodeSession"],
+    update: Update | None,
+    /,
+) -> None:
+    scope = get_scope(node)
+    if scope is NodeScope.PER_EVENT or scope in CACHED_SCOPES:
+        event_nodes[node] = session
+
+    if (cache := get_node_cache(node)) is not None:
+        if (key := get_cache_key(node, update)) is not None:
+            cache.set(key, session.value)
+    elif scope is NodeScope.GLOBAL:
+        setattr(node, GLOBAL_VALUE_KEY, session.value)
+
+
+async def _compose_bound(node: type[NodeType], kwargs: dict[str, typing.Any], /) -> typing.Any:
+    value = node.compose(**kwargs)
+    return await value if inspect.isawaitable(value) else value
+
+
+def _refresh_value(
+    step: ComposeStep,
+    sessions: dict[StepKey, "NodeSession"],
+    data: dict[type[typing.Any], typing.Any],
+) -> typing.Awaitable[typing.Any]:
+    """Arguments are bound at once, so the background refresh keeps no references to the event sessions."""
+    kwargs = _bind_arguments(
+        step.node,
+        linked={node: sessions[key].value for node, key in step.dependencies},
+        data=data | {Name: step.name} if step.uses_name else data,
+    )
+    return _compose_bound(step.node, kwargs)
+
+
 async def compose_nodes(
     nodes: typing.Mapping[str, IsNode | NodeImpersonation],
     ctx: Context,
     data: dict[type[typing.Any], typing.Any] | None = None,
 ) -> Result["NodeCollection", ComposeError]:
+    """Compose nodes by the cached plan (see `ComposePlan`), independent
+    async nodes of the same level are composed concurrently.
+
+    Values of per chat, per user and global nodes with TTL are taken from their caches
+    (see `NodeCache`), expired global values are refreshed in the background.
+    """
     logger.debug("Composing nodes: ({})...", " ".join(f"{k}={v!r}" for k, v in nodes.items()))
 
     data = {Context: ctx} | (data or {})
-    parent_nodes = dict[IsNode, NodeSession]()
     event_nodes: dict[IsNode, NodeSession] = ctx.get_or_set(CONTEXT_STORE_NODES_KEY, {})
-    unwrapped_nodes = {(key, n := node.as_node()): unwrap_node(n) for key, node in nodes.items()}
-
-    for (parent_node_name, parent_node_t), linked_nodes in unwrapped_nodes.items():
-        local_nodes = dict[type[NodeType], NodeSession]()
-        subnodes = {}
-        data[Name] = parent_node_name
-
-        for node_t in linked_nodes:
-            scope = get_scope(node_t)
-
-            if scope is NodeScope.PER_EVENT and node_t in event_nodes:
-                local_nodes[node_t] = event_nodes[node_t]
-                continue
-            elif scope is NodeScope.GLOBAL and hasattr(node_t, GLOBAL_VALUE_KEY):
-                local_nodes[node_t] = NodeSession(node_t, getattr(node_t, GLOBAL_VALUE_KEY), {})
+    plan = get_compose_plan(nodes)
+    sessions = dict[StepKey, NodeSession]()
+
+    update: Update | None = data.get(Update) or ctx.get("raw_update")
+
+    for level in plan.levels:
+        pending = list[ComposeStep]()
+        for step in level:
+            session = get_cached_session(
+                step.node,
+                event_nodes,
+                update,
+                refresh=(
+                    functools.partial(_refresh_value, step, sessions, data)
+                    if get_scope(step.node) is NodeScope.GLOBAL
+                    else None
+                ),
+            )
+            if session is not None:
+                sessions[step.key] = session
+            else:
+                pending.append(step)
+
+        results: list["NodeSession | BaseException"] = []
+        if sum(step.is_async for step in pending) > 1:
+            results.extend(
+                await asyncio.gather(
+                    *(_compose_step(step, sessions, data) for step in pending),
+                    return_exceptions=True,
+                )
+            )
+        else:
+            for step in pending:
+                try:
+                    results.append(await _compose_step(step, sessions, data))
+                except (ComposeError, UnwrapError) as exc:
+                    results.append(exc)
+                    break
+
+        error: tuple[ComposeStep, BaseException] | None = None
+        for step, result in zip(pending, results):
+            if not isinstance(result, NodeSession):
+                error = error or (step, result)
                 continue
 
-            subnodes |= {
-                k: session.value for k, session in (local_nodes | event_nodes).items() if k not in subnodes
-            }
-            try:
-                local_nodes[node_t] = await compose_node(node_t, linked=subnodes, data=data)
-            except (ComposeError, UnwrapError) as exc:
-                for t, local_node in local_nodes.items():
-                    if get_scope(t) is NodeScope.PER_CALL:
-                        await local_node.close()
-                return Error(ComposeError(f"Cannot compose {node_t!r}, error: {str(exc)}"))
+            sessions[step.key] = result
+            store_session(step.node, result, event_nodes, update)
 
-            if scope is NodeScope.PER_EVENT:
-                event_nodes[node_t] = local_nodes[node_t]
-            elif scope is NodeScope.GLOBAL:
-                setattr(node_t, GLOBAL_VALUE_KEY, local_nodes[node_t].value)
+        if error is not None:
+            step, exc = error
+            for key, session in sessions.items():
+                if get_scope(key[0]) is NodeScope.PER_CALL:
+                    await session.close()
+            if not isinstance(exc, ComposeError | UnwrapError):
+                raise exc
+            return Error(ComposeError(f"Cannot compose {step.node!r}, error: {str(exc)}"))
 
-        parent_nodes[parent_node_t] = local_nodes[parent_node_t]
-
-    return Ok(NodeCollection({k: parent_nodes[t] for k, t in unwrapped_nodes}))
+    return Ok(NodeCollection({name: sessions[key] for name, key in plan.parameters}))
 
 
 @dataclasses.dataclass(slots=True, repr=False)
@@ -160,4 +348,14 @@ class NodeCollection:
             await session.close(with_value, scopes=scopes)
 
 
-__all__ = ("NodeCollection", "NodeSession", "compose_node", "compose_nodes")
+__all__ = (
+    "ComposePlan",
+    "ComposeStep",
+    "NodeCollection",
+    "NodeSession",
+    "compose_node",
+    "compose_nodes",
+    "get_cached_session",
+    "get_compose_plan",
+    "store_session",
+)
@@ -5,8 +5,14 @@ from fntypes.result import Ok
 from mubble.api.api import API
 from mubble.bot.dispatch.context import Context
 from mubble.node.base import ComposeError, FactoryNode, Node
-from mubble.node.composer import CONTEXT_STORE_NODES_KEY, GLOBAL_VALUE_KEY, compose_node, compose_nodes
-from mubble.node.scope import NodeScope, per_call
+from mubble.node.composer import (
+    CONTEXT_STORE_NODES_KEY,
+    compose_node,
+    compose_nodes,
+    get_cached_session,
+    store_session,
+)
+from mubble.node.scope import per_call
 from mubble.types.objects import Update
 
 
@@ -42,10 +48,8 @@ class _Either(FactoryNode):
             if node is None:
                 return None
 
-            if node.scope is NodeScope.PER_EVENT and node in node_ctx:
-                return node_ctx[node].value
-            elif node.scope is NodeScope.GLOBAL and hasattr(node, GLOBAL_VALUE_KEY):
-                return getattr(node, GLOBAL_VALUE_KEY)
+            if (cached := get_cached_session(node, node_ctx, update)) is not None:
+                return cached.value
 
             subnodes = node.as_node().get_subnodes()
             match await compose_nodes(subnodes, context, data):
@@ -61,11 +65,7 @@ class _Either(FactoryNode):
                     except ComposeError:
                         continue
 
-                    if node.scope is NodeScope.PER_EVENT:
-                        node_ctx[node] = session
-                    elif node.scope is NodeScope.GLOBAL:
-                        setattr(node, GLOBAL_VALUE_KEY, session.value)
-
+                    store_session(node, session, node_ctx, update)
                     return session.value
 
         raise ComposeError("Cannot compose either nodes: {}.".format(", ".join(repr(n) for n in cls.nodes)))
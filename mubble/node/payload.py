@@ -8,7 +8,7 @@ from mubble.bot.cute_types.message import MessageCute
 from mubble.bot.cute_types.pre_checkout_query import PreCheckoutQueryCute
 from mubble.node.base import ComposeError, DataNode, FactoryNode, GlobalNode, scalar_node
 from mubble.node.polymorphic import Polymorphic, impl
-from mubble.tools.callback_data_serilization import ABCDataSerializer, JSONSerializer
+from mubble.tools.callback_data_serilization import ABCDataSerializer, JSONSerializer, fetch_callback_data
 
 
 @scalar_node[str]
@@ -18,8 +18,11 @@ class Payload(Polymorphic):
         return event.invoice_payload
 
     @impl
-    def compose_callback_query(cls, event: CallbackQueryCute) -> str:
-        return event.data.expect("CallbackQuery has no data.")
+    async def compose_callback_query(cls, event: CallbackQueryCute) -> str:
+        data = await fetch_callback_data(event.data.expect("CallbackQuery has no data."))
+        if data is None:
+            raise ComposeError("CallbackQuery data is expired.")
+        return data
 
     @impl
     def compose_message(cls, event: MessageCute) -> str:
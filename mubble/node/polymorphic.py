@@ -4,20 +4,56 @@ import typing
 from fntypes.result import Error, Ok
 
 from mubble.api.api import API
+from mubble.bot.cute_types.base import BaseCute
 from mubble.bot.cute_types.update import UpdateCute
 from mubble.bot.dispatch.context import Context
+from mubble.model import Model
 from mubble.modules import logger
 from mubble.node.base import ComposeError, Node, get_nodes
 from mubble.node.composer import CONTEXT_STORE_NODES_KEY, NodeSession, compose_nodes
 from mubble.node.scope import NodeScope
-from mubble.tools.magic import get_polymorphic_implementations, impl, magic_bundle
+from mubble.tools.magic import get_annotations, get_polymorphic_implementations, impl, magic_bundle
 from mubble.types.objects import Update
 
+type Impl = typing.Callable[..., typing.Any]
+
+EVENT_IMPLEMENTATIONS_KEY: typing.Final[str] = "__event_implementations__"
+
+
+def get_impl_event_types(impl_: Impl, /) -> tuple[type[BaseCute[typing.Any]], ...]:
+    """Cute event types the implementation accepts (derived from its annotations)."""
+    return tuple(
+        hint
+        for hint in map(lambda hint: typing.get_origin(hint) or hint, get_annotations(impl_).values())
+        if isinstance(hint, type) and issubclass(hint, BaseCute) and not issubclass(hint, Update)
+    )
+
+
+def get_event_implementations(
+    cls: type["Polymorphic"],
+    event_type: type[Model],
+    /,
+) -> tuple[tuple[int, Impl], ...]:
+    """Implementations (with their positions) which can be composed for the incoming update of the type:
+    implementations accepting the event and implementations without event parameters, cached per event type.
+    """
+    if EVENT_IMPLEMENTATIONS_KEY not in cls.__dict__:
+        setattr(cls, EVENT_IMPLEMENTATIONS_KEY, {})
+
+    table: dict[type[Model], tuple[tuple[int, Impl], ...]] = cls.__dict__[EVENT_IMPLEMENTATIONS_KEY]
+    if event_type not in table:
+        table[event_type] = tuple(
+            (i, impl_)
+            for i, impl_ in enumerate(get_polymorphic_implementations(cls))
+            if all(issubclass(cute, event_type) for cute in get_impl_event_types(impl_))
+        )
+    return table[event_type]
+
 
 class Polymorphic(Node):
     @classmethod
     async def compose(cls, raw_update: Update, update: UpdateCute, context: Context) -> typing.Any:
-        logger.debug(f"Composing polymorphic node {cls.__name__!r}...")
+        logger.debug("Composing polymorphic node {!r}...", cls.__name__)
         scope = getattr(cls, "scope", None)
         node_ctx = context.get_or_set(CONTEXT_STORE_NODES_KEY, {})
         data = {
@@ -26,7 +62,7 @@ class Polymorphic(Node):
             Update: raw_update,
         }
 
-        for i, impl_ in enumerate(get_polymorphic_implementations(cls)):
+        for i, impl_ in get_event_implementations(cls, type(raw_update.incoming_update)):
             logger.debug("Checking impl {!r}...", impl_.__name__)
             node_collection = None
 
@@ -34,7 +70,7 @@ class Polymorphic(Node):
                 case Ok(col):
                     node_collection = col
                 case Error(err):
-                    logger.debug(f"Composition failed with error: {err!r}")
+                    logger.debug("Composition failed with error: {!r}", err)
 
             if node_collection is None:
                 logger.debug("Impl {!r} composition failed!", impl_.__name__)
@@ -1,42 +1,129 @@
+import datetime
 import enum
 import typing
 
 if typing.TYPE_CHECKING:
     from .base import IsNode
 
+type TTL = datetime.timedelta | float
+
+DEFAULT_CACHE_MAXSIZE: typing.Final[int] = 1024
+
 
 class NodeScope(enum.Enum):
     GLOBAL = enum.auto()
     PER_EVENT = enum.auto()
     PER_CALL = enum.auto()
+    PER_CHAT = enum.auto()
+    """Cached by the chat id of the event, see `NodeCache`."""
+
+    PER_USER = enum.auto()
+    """Cached by the user id of the event, see `NodeCache`."""
 
 
 PER_EVENT = NodeScope.PER_EVENT
 PER_CALL = NodeScope.PER_CALL
 GLOBAL = NodeScope.GLOBAL
+PER_CHAT = NodeScope.PER_CHAT
+PER_USER = NodeScope.PER_USER
+
+
+def _set_scope[T: IsNode](
+    scope: NodeScope,
+    node: type[T] | None,
+    **options: typing.Any,
+) -> typing.Any:
+    def inner(node: type[T], /) -> type[T]:
+        if (scope in (PER_CHAT, PER_USER) or options.get("ttl") is not None) and node.is_generator():
+            raise TypeError(
+                f"Generator node {node.__name__!r} cannot be cached, its value outlives the generator."
+            )
+        setattr(node, "scope", scope)
+        for name, value in options.items():
+            setattr(node, f"cache_{name}", value)
+        return node
+
+    return inner if node is None else inner(node)
 
 
 def per_call[T: IsNode](node: type[T]) -> type[T]:
-    setattr(node, "scope", PER_CALL)
-    return node
+    return _set_scope(PER_CALL, node)
 
 
 def per_event[T: IsNode](node: type[T]) -> type[T]:
-    setattr(node, "scope", PER_EVENT)
-    return node
+    return _set_scope(PER_EVENT, node)
+
+
+@typing.overload
+def global_node[T: IsNode](node: type[T], /) -> type[T]: ...
+
+
+@typing.overload
+def global_node[T: IsNode](*, ttl: TTL | None = None) -> typing.Callable[[type[T]], type[T]]: ...
+
+
+def global_node[T: IsNode](node: type[T] | None = None, /, *, ttl: TTL | None = None) -> typing.Any:
+    """Global node is composed once, with `ttl` its value is refreshed in the background once expired."""
+    return _set_scope(GLOBAL, node, ttl=ttl)
+
+
+@typing.overload
+def per_chat[T: IsNode](node: type[T], /) -> type[T]: ...
+
+
+@typing.overload
+def per_chat[T: IsNode](
+    *,
+    ttl: TTL | None = None,
+    maxsize: int = DEFAULT_CACHE_MAXSIZE,
+) -> typing.Callable[[type[T]], type[T]]: ...
+
+
+def per_chat[T: IsNode](
+    node: type[T] | None = None,
+    /,
+    *,
+    ttl: TTL | None = None,
+    maxsize: int = DEFAULT_CACHE_MAXSIZE,
+) -> typing.Any:
+    """Node value is cached by the chat id for `ttl` (forever by default), at most `maxsize` chats are kept."""
+    return _set_scope(PER_CHAT, node, ttl=ttl, maxsize=maxsize)
+
+
+@typing.overload
+def per_user[T: IsNode](node: type[T], /) -> type[T]: ...
+
+
+@typing.overload
+def per_user[T: IsNode](
+    *,
+    ttl: TTL | None = None,
+    maxsize: int = DEFAULT_CACHE_MAXSIZE,
+) -> typing.Callable[[type[T]], type[T]]: ...
 
 
-def global_node[T: IsNode](node: type[T]) -> type[T]:
-    setattr(node, "scope", GLOBAL)
-    return node
+def per_user[T: IsNode](
+    node: type[T] | None = None,
+    /,
+    *,
+    ttl: TTL | None = None,
+    maxsize: int = DEFAULT_CACHE_MAXSIZE,
+) -> typing.Any:
+    """Node value is cached by the user id for `ttl` (forever by default), at most `maxsize` users are kept."""
+    return _set_scope(PER_USER, node, ttl=ttl, maxsize=maxsize)
 
 
 __all__ = (
+    "DEFAULT_CACHE_MAXSIZE",
     "GLOBAL",
     "NodeScope",
     "PER_CALL",
+    "PER_CHAT",
     "PER_EVENT",
+    "PER_USER",
     "global_node",
     "per_call",
+    "per_chat",
     "per_event",
+    "per_user",
 )
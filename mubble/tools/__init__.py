@@ -9,8 +9,13 @@ from .adapter import (
 from .buttons import BaseButton
 from .callback_data_serilization import (
     ABCDataSerializer,
+    ABCOverflowStore,
+    CompactMsgPackSerializer,
     JSONSerializer,
+    MemoryOverflowStore,
     MsgPackSerializer,
+    SQLiteOverflowStore,
+    set_overflow_store,
 )
 from .error_handler import ABCErrorHandler, Catcher, CatcherError, ErrorHandler
 from .formatting import (
@@ -62,6 +67,7 @@ from .formatting import (
     underline,
 )
 from .functional import from_optional
+from .fuzzy_index import FuzzyIndex, FuzzyMatch
 from .global_context import (
     ABCGlobalContext,
     CtxVar,
@@ -78,6 +84,8 @@ from .i18n import (
     SimpleI18n,
     SimpleTranslator,
 )
+from .identity_set import IdentitySet, SortedIdentities, reload_identity_set_worker
+from .inline_cache import InlineQueryCache
 from .input_file_directory import InputFileDirectory
 from .keyboard import (
     AnyMarkup,
@@ -101,7 +109,15 @@ from .magic import (
     resolve_arg_names,
 )
 from .parse_mode import ParseMode
-from .state_storage import ABCStateStorage, MemoryStateStorage, StateData
+from .regex_set import RegexMatch, RegexSet
+from .state_storage import (
+    ABCStateStorage,
+    MemoryStateStorage,
+    MemoryStateStorageStats,
+    SQLiteStateStorage,
+    StateData,
+    clear_state_storage_worker,
+)
 
 __all__ = (
     "ABCAdapter",
@@ -110,6 +126,7 @@ __all__ = (
     "ABCGlobalContext",
     "ABCI18n",
     "ABCLoopWrapper",
+    "ABCOverflowStore",
     "ABCStateStorage",
     "ABCTranslator",
     "ABCTranslatorMiddleware",
@@ -120,18 +137,23 @@ __all__ = (
     "Button",
     "Catcher",
     "CatcherError",
+    "CompactMsgPackSerializer",
     "CtxVar",
     "DataclassAdapter",
     "DelayedTask",
     "ErrorHandler",
     "EventAdapter",
     "FormatString",
+    "FuzzyIndex",
+    "FuzzyMatch",
     "GlobalContext",
     "GlobalCtxVar",
     "HTMLFormatter",
     "I18nEnum",
+    "IdentitySet",
     "InlineButton",
     "InlineKeyboard",
+    "InlineQueryCache",
     "InputFileDirectory",
     "JSONSerializer",
     "Keyboard",
@@ -139,7 +161,9 @@ __all__ = (
     "LimitedDict",
     "Link",
     "LoopWrapper",
+    "MemoryOverflowStore",
     "MemoryStateStorage",
+    "MemoryStateStorageStats",
     "Mention",
     "MsgPackSerializer",
     "NodeAdapter",
@@ -147,9 +171,14 @@ __all__ = (
     "PreCode",
     "RawEventAdapter",
     "RawUpdateAdapter",
+    "RegexMatch",
+    "RegexSet",
     "RowButtons",
+    "SQLiteOverflowStore",
+    "SQLiteStateStorage",
     "SimpleI18n",
     "SimpleTranslator",
+    "SortedIdentities",
     "SpecialFormat",
     "StateData",
     "MubbleContext",
@@ -157,6 +186,7 @@ __all__ = (
     "block_quote",
     "bold",
     "cancel_future",
+    "clear_state_storage_worker",
     "code_inline",
     "ctx_var",
     "escape",
@@ -172,7 +202,9 @@ __all__ = (
     "magic_bundle",
     "mention",
     "pre_code",
+    "reload_identity_set_worker",
     "resolve_arg_names",
+    "set_overflow_store",
     "spoiler",
     "strike",
     "tg_bot_attach_open_any_chat",
@@ -15,7 +15,7 @@ from mubble.types.objects import (
     WebAppInfo,
 )
 
-from .callback_data_serilization import ABCDataSerializer, JSONSerializer
+from .callback_data_serilization import ABCDataSerializer, JSONSerializer, pack_callback_data
 
 if typing.TYPE_CHECKING:
     from _typeshed import DataclassInstance
@@ -94,6 +94,9 @@ class InlineButton(BaseButton):
         elif self.callback_data is not None and not isinstance(self.callback_data, str | bytes):
             self.callback_data = encoder.encode(self.callback_data)
 
+        if isinstance(self.callback_data, str):
+            self.callback_data = pack_callback_data(self.callback_data)
+
         if isinstance(self.copy_text, str):
             self.copy_text = CopyTextButton(text=self.copy_text)
 
@@ -1,5 +1,34 @@
 from .abc import ABCDataSerializer
 from .json_ser import JSONSerializer
-from .msgpack_ser import MsgPackSerializer
+from .msgpack_ser import CompactMsgPackSerializer, ModelCodec, MsgPackSerializer, get_model_codec
+from .overflow import (
+    MAX_CALLBACK_DATA_SIZE,
+    OVERFLOW_PREFIX,
+    ABCOverflowStore,
+    MemoryOverflowStore,
+    SQLiteOverflowStore,
+    fetch_callback_data,
+    get_overflow_store,
+    pack_callback_data,
+    set_overflow_store,
+    unpack_callback_data,
+)
 
-__all__ = ("ABCDataSerializer", "JSONSerializer", "MsgPackSerializer")
+__all__ = (
+    "ABCDataSerializer",
+    "ABCOverflowStore",
+    "CompactMsgPackSerializer",
+    "JSONSerializer",
+    "MAX_CALLBACK_DATA_SIZE",
+    "MemoryOverflowStore",
+    "ModelCodec",
+    "MsgPackSerializer",
+    "OVERFLOW_PREFIX",
+    "SQLiteOverflowStore",
+    "fetch_callback_data",
+    "get_model_codec",
+    "get_overflow_store",
+    "pack_callback_data",
+    "set_overflow_store",
+    "unpack_callback_data",
+)
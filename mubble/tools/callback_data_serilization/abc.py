@@ -39,6 +39,12 @@ class ABCDataSerializer[Data](abc.ABC):
     def key(self) -> str:
         return self.ident_key + "_" if self.ident_key else ""
 
+    def get_prefix(self) -> str | None:
+        """Static prefix of all data serialized by the serializer (derived from `ident_key`),
+        used to index handlers. `None` if the data has no such prefix.
+        """
+        return None
+
     @abc.abstractmethod
     def serialize(self, data: Data) -> str:
         pass
@@ -35,6 +35,9 @@ class JSONSerializer[JsonT: Json](ABCDataSerializer[JsonT]):
     def deserialize_to_json(cls, serialized_data: str, model_t: type[JsonT]) -> Result[JsonT, str]:
         return cls(model_t).deserialize(serialized_data)
 
+    def get_prefix(self) -> str | None:
+        return self.key or None
+
     def serialize(self, data: JsonT) -> str:
         return self.key + json.dumps(data)
 
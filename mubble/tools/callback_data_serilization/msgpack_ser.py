@@ -1,126 +1,225 @@
 import base64
 import binascii
 import dataclasses
+import enum
 import typing
-from collections import deque
 from contextlib import suppress
 from functools import cached_property
 
 import msgspec
 from fntypes.result import Error, Ok, Result
 
-from mubble.msgspec_utils import decoder, encoder, get_class_annotations
+from mubble.msgspec_utils import decoder, encoder
 
 from .abc import ABCDataSerializer, ModelType
 
+MODEL_CODEC_KEY: typing.Final[str] = "__model_codec__"
+SCALAR_TYPES: typing.Final[tuple[type[msgspec.inspect.Type], ...]] = (
+    msgspec.inspect.AnyType,
+    msgspec.inspect.BoolType,
+    msgspec.inspect.BytesType,
+    msgspec.inspect.DateTimeType,
+    msgspec.inspect.DateType,
+    msgspec.inspect.DecimalType,
+    msgspec.inspect.EnumType,
+    msgspec.inspect.FloatType,
+    msgspec.inspect.IntType,
+    msgspec.inspect.LiteralType,
+    msgspec.inspect.NoneType,
+    msgspec.inspect.StrType,
+    msgspec.inspect.TimeDeltaType,
+    msgspec.inspect.TimeType,
+    msgspec.inspect.UUIDType,
+)
+
+ENCODER: typing.Final[msgspec.msgpack.Encoder] = msgspec.msgpack.Encoder(enc_hook=encoder.enc_hook())
+DECODER: typing.Final[msgspec.msgpack.Decoder[list[typing.Any]]] = msgspec.msgpack.Decoder(
+    list[typing.Any],
+    dec_hook=decoder.dec_hook(),
+)
+
+
+class FieldKind(enum.Enum):
+    VALUE = enum.auto()
+    """Builtin value or a collection of builtin values, encoded as is."""
+
+    MODEL = enum.auto()
+    """Model (or optional model), encoded as an array of its fields."""
+
+    MODELS = enum.auto()
+    """Collection of models, encoded as an array of arrays."""
+
+    ANY = enum.auto()
+    """Any other value, models nested in it are found while encoding."""
+
+
+type Restore = typing.Callable[[typing.Any], typing.Any]
+
 
 @dataclasses.dataclass(frozen=True, slots=True)
-class ModelParser[Model: ModelType]:
-    model_type: type[Model]
-
-    def _is_model(self, obj: typing.Any, /) -> typing.TypeGuard[ModelType]:
-        return dataclasses.is_dataclass(obj) or isinstance(obj, msgspec.Struct)
-
-    def _model_to_dict(self, model: ModelType) -> dict[str, typing.Any]:
-        if dataclasses.is_dataclass(model):
-            return dataclasses.asdict(model)
-        return msgspec.structs.asdict(model)  # type: ignore
-
-    def _is_union(self, inspected_type: msgspec.inspect.Type, /) -> typing.TypeGuard[msgspec.inspect.UnionType]:
-        return isinstance(inspected_type, msgspec.inspect.UnionType)
-
-    def _is_model_type(
-        self,
-        inspected_type: msgspec.inspect.Type,
-        /,
-    ) -> typing.TypeGuard[msgspec.inspect.DataclassType | msgspec.inspect.StructType]:
-        return isinstance(inspected_type, msgspec.inspect.DataclassType | msgspec.inspect.StructType)
-
-    def _is_iter_of_model(
-        self, inspected_type: msgspec.inspect.Type, /
-    ) -> typing.TypeGuard[msgspec.inspect.ListType]:
-        return isinstance(
-            inspected_type,
-            msgspec.inspect.ListType | msgspec.inspect.SetType | msgspec.inspect.FrozenSetType,
-        ) and self._is_model_type(inspected_type.item_type)
-
-    def _validate_annotation(self, annotation: typing.Any, /) -> tuple[type[ModelType], bool] | None:
-        is_iter_of_model = False
-        type_args: tuple[msgspec.inspect.Type, ...] | None = None
-        inspected_type = msgspec.inspect.type_info(annotation)
-
-        if self._is_union(inspected_type):
-            type_args = inspected_type.types
-        elif self._is_iter_of_model(inspected_type):
-            type_args = (inspected_type.item_type,)
-            is_iter_of_model = True
-        elif self._is_model_type(inspected_type):
-            type_args = (inspected_type,)
-
-        if type_args is not None:
-            for arg in type_args:
-                if self._is_union(arg):
-                    type_args += arg.types
-                if self._is_model_type(arg):
-                    return (arg.cls, is_iter_of_model)
-                if self._is_iter_of_model(arg):
-                    return (arg.item_type.cls, True)  # type: ignore
-
-        return None
-
-    def parse(self, model: Model) -> list[typing.Any]:
-        """Returns a parsed model as linked list."""
-        linked: list[typing.Any] = []
-        stack: list[typing.Any] = [(list(self._model_to_dict(model).values()), linked)]
-
-        while stack:
-            current_obj, current = stack.pop()
-
-            for item in current_obj:
-                if self._is_model(item):
-                    item = self._model_to_dict(item)
-                if isinstance(item, dict):
-                    new_list = []
-                    current.append(new_list)
-                    stack.append((list(item.values()), new_list))
-                elif isinstance(item, list | tuple):
-                    new_list = []
-                    current.append(new_list)
-                    stack.append((item, new_list))
-                else:
-                    current.append(item)
-
-        return encoder.to_builtins(linked)
-
-    def compose(self, linked: list[typing.Any]) -> dict[str, typing.Any]:
-        """Compose linked list to dictionary based on the model class annotations `(without validation)`."""
-        root_converted_data: dict[str, typing.Any] = {}
-        stack: deque[typing.Any] = deque([(linked, self.model_type, root_converted_data)])
-
-        while stack:
-            current_data, current_model, converted_data = stack.pop()
-
-            for index, (field, annotation) in enumerate(get_class_annotations(current_model).items()):
-                obj, model_type, is_iter_of_model = current_data[index], None, False
-
-                if isinstance(obj, list) and (validated := self._validate_annotation(annotation)):
-                    model_type, is_iter_of_model = validated
-
-                if model_type is not None:
-                    if is_iter_of_model:
-                        converted_data[field] = []
-                        for item in obj:
-                            new_converted_data = {}
-                            converted_data[field].append(new_converted_data)
-                            stack.append((item, model_type, new_converted_data))
-                    else:
-                        new_converted_data = {}
-                        converted_data[field] = new_converted_data
-                        stack.append((obj, model_type, new_converted_data))
-                else:
-                    converted_data[field] = obj
-
-        return root_converted_data
+class CodecField:
+    name: str
+    kind: FieldKind
+    restore: Restore | None = None
+    """Restores nested models of the decoded value as dictionaries, `None` if the value has no models."""
+
+
+def is_model(obj: typing.Any, /) -> typing.TypeGuard[ModelType]:
+    return dataclasses.is_dataclass(obj) or isinstance(obj, msgspec.Struct)
+
+
+def _is_model_type(
+    inspected_type: msgspec.inspect.Type,
+    /,
+) -> typing.TypeGuard[msgspec.inspect.DataclassType | msgspec.inspect.StructType]:
+    return isinstance(inspected_type, msgspec.inspect.DataclassType | msgspec.inspect.StructType)
+
+
+def _is_collection(inspected_type: msgspec.inspect.Type, /) -> typing.TypeGuard[msgspec.inspect.ListType]:
+    return isinstance(
+        inspected_type,
+        msgspec.inspect.ListType
+        | msgspec.inspect.SetType
+        | msgspec.inspect.FrozenSetType
+        | msgspec.inspect.VarTupleType,
+    )
+
+
+def _is_value_type(inspected_type: msgspec.inspect.Type, /) -> bool:
+    if isinstance(inspected_type, SCALAR_TYPES):
+        return True
+    if _is_collection(inspected_type):
+        return _is_value_type(inspected_type.item_type)
+    if isinstance(inspected_type, msgspec.inspect.TupleType):
+        return all(_is_value_type(item_type) for item_type in inspected_type.item_types)
+    if isinstance(inspected_type, msgspec.inspect.UnionType):
+        return all(_is_value_type(arg) for arg in inspected_type.types)
+    return False
+
+
+def _restore_model(model_type: type[ModelType], /) -> Restore:
+    def restore(value: typing.Any) -> typing.Any:
+        return get_model_codec(model_type).from_array(value) if isinstance(value, list) else value
+
+    return restore
+
+
+def _restore_items(restore_item: Restore, /) -> Restore:
+    def restore(value: typing.Any) -> typing.Any:
+        return [restore_item(item) for item in value] if isinstance(value, list) else value
+
+    return restore
+
+
+def _restore_values(restore_value: Restore, /) -> Restore:
+    def restore(value: typing.Any) -> typing.Any:
+        if not isinstance(value, dict):
+            return value
+        return {key: restore_value(item) for key, item in value.items()}
+
+    return restore
+
+
+def _compile_restore(inspected_type: msgspec.inspect.Type, /) -> Restore | None:
+    if _is_model_type(inspected_type):
+        return _restore_model(inspected_type.cls)
+    if _is_collection(inspected_type):
+        restore_item = _compile_restore(inspected_type.item_type)
+        return _restore_items(restore_item) if restore_item is not None else None
+    if isinstance(inspected_type, msgspec.inspect.DictType):
+        restore_value = _compile_restore(inspected_type.value_type)
+        return _restore_values(restore_value) if restore_value is not None else None
+    if isinstance(inspected_type, msgspec.inspect.UnionType):
+        # The first union member with models is used
+        for arg in inspected_type.types:
+            if (restore := _compile_restore(arg)) is not None:
+                return restore
+    return None
+
+
+def _compile_field(field: msgspec.inspect.Field, /) -> CodecField:
+    field_type = field.type
+    if _is_value_type(field_type):
+        kind = FieldKind.VALUE
+    elif _is_model_type(field_type) or (
+        isinstance(field_type, msgspec.inspect.UnionType)
+        and all(_is_model_type(arg) or _is_value_type(arg) for arg in field_type.types)
+    ):
+        kind = FieldKind.MODEL
+    elif _is_collection(field_type) and _is_model_type(field_type.item_type):
+        kind = FieldKind.MODELS
+    else:
+        kind = FieldKind.ANY
+    return CodecField(field.name, kind, _compile_restore(field_type))
+
+
+def to_linked(obj: typing.Any, /) -> typing.Any:
+    """Models nested in the value as arrays of their fields."""
+    if is_model(obj):
+        return get_model_codec(type(obj)).to_array(obj)
+    if isinstance(obj, dict):
+        return {key: to_linked(value) for key, value in obj.items()}
+    if isinstance(obj, list | tuple):
+        return [to_linked(item) for item in obj]
+    return obj
+
+
+class ModelCodec[Model: ModelType]:
+    """Codec of the model compiled from its fields: a model is encoded as an array
+    of field values in the order of fields, nested models are encoded the same way.
+    """
+
+    def __init__(self, model_type: type[Model], /) -> None:
+        self.model_type = model_type
+        self.fields = tuple(
+            _compile_field(field)
+            for field in msgspec.inspect.type_info(model_type).fields  # type: ignore
+        )
+        self._nested = tuple(
+            (index, field.name, field.restore)
+            for index, field in enumerate(self.fields)
+            if field.restore is not None
+        )
+
+    def __repr__(self) -> str:
+        return "<{}: {}>".format(self.__class__.__name__, self.model_type.__name__)
+
+    def to_array(self, model: Model, /) -> list[typing.Any]:
+        array = []
+        for field in self.fields:
+            value = getattr(model, field.name)
+            match field.kind:
+                case FieldKind.VALUE:
+                    array.append(value)
+                case FieldKind.MODEL:
+                    array.append(get_model_codec(type(value)).to_array(value) if is_model(value) else value)
+                case FieldKind.MODELS:
+                    array.append([get_model_codec(type(item)).to_array(item) for item in value])
+                case FieldKind.ANY:
+                    array.append(to_linked(value))
+        return array
+
+    def from_array(self, array: list[typing.Any], /) -> dict[str, typing.Any]:
+        """Dictionary of the model fields (without validation)."""
+        data = {field.name: value for field, value in zip(self.fields, array)}
+        for index, name, restore in self._nested:
+            if index < len(array):
+                data[name] = restore(array[index])
+        return data
+
+    def encode(self, model: Model, /) -> bytes:
+        return ENCODER.encode(encoder.to_builtins(self.to_array(model)))
+
+    def decode(self, data: bytes, /) -> Model:
+        return decoder.convert(self.from_array(DECODER.decode(data)), type=self.model_type)
+
+
+def get_model_codec[Model: ModelType](model_type: type[Model], /) -> ModelCodec[Model]:
+    """Codec of the model type, compiled on first use."""
+    if (codec := model_type.__dict__.get(MODEL_CODEC_KEY)) is None:
+        codec = ModelCodec(model_type)
+        setattr(model_type, MODEL_CODEC_KEY, codec)
+    return codec
 
 
 class MsgPackSerializer[Model: ModelType](ABCDataSerializer[Model]):
@@ -133,7 +232,7 @@ class MsgPackSerializer[Model: ModelType](ABCDataSerializer[Model]):
     def __init__(self, model_t: type[Model], /, *, ident_key: str | None = None) -> None:
         self.model_t = model_t
         self.ident_key: str | None = ident_key or getattr(model_t, "__key__", None)
-        self._model_parser = ModelParser(model_t)
+        self._codec = get_model_codec(model_t)
 
     @classmethod
     def serialize_from_model(cls, model: Model, *, ident_key: str | None = None) -> str:
@@ -149,10 +248,12 @@ class MsgPackSerializer[Model: ModelType](ABCDataSerializer[Model]):
             return msgspec.msgpack.encode(super().key)
         return b""
 
+    def get_prefix(self) -> str | None:
+        # Only whole 3-byte groups of the key are encoded into the same base64 characters
+        return base64.urlsafe_b64encode(self.key[: len(self.key) // 3 * 3]).decode() or None
+
     def serialize(self, data: Model) -> str:
-        return base64.urlsafe_b64encode(
-            self.key + msgspec.msgpack.encode(self._model_parser.parse(data), enc_hook=encoder.enc_hook),
-        ).decode()
+        return base64.urlsafe_b64encode(self.key + self._codec.encode(data)).decode()
 
     def deserialize(self, serialized_data: str) -> Result[Model, str]:
         with suppress(msgspec.DecodeError, msgspec.ValidationError, binascii.Error):
@@ -160,13 +261,35 @@ class MsgPackSerializer[Model: ModelType](ABCDataSerializer[Model]):
             if self.ident_key and not ser_data.startswith(self.key):
                 return Error("Data is not corresponding to key.")
 
-            data: list[typing.Any] = msgspec.msgpack.decode(
-                ser_data.removeprefix(self.key),
-                dec_hook=decoder.dec_hook(),
-            )
-            return Ok(decoder.convert(self._model_parser.compose(data), type=self.model_t))
+            return Ok(self._codec.decode(ser_data.removeprefix(self.key)))
+
+        return Error("Incorrect data.")
+
+
+class CompactMsgPackSerializer[Model: ModelType](MsgPackSerializer[Model]):
+    """MsgPack serializer for short callback data: the ident key is kept as plain text
+    (`key_...`, so it can be matched by prefix) and the data is encoded with base85,
+    which is 1.25 characters per byte instead of 1.33 with base64.
+    """
+
+    @cached_property
+    def key(self) -> str:  # type: ignore[override]
+        return self.ident_key + "_" if self.ident_key else ""
+
+    def get_prefix(self) -> str | None:
+        return self.key or None
+
+    def serialize(self, data: Model) -> str:
+        return self.key + base64.b85encode(self._codec.encode(data)).decode()
+
+    def deserialize(self, serialized_data: str) -> Result[Model, str]:
+        if self.ident_key and not serialized_data.startswith(self.key):
+            return Error("Data is not corresponding to key.")
+
+        with suppress(msgspec.DecodeError, msgspec.ValidationError, ValueError):
+            return Ok(self._codec.decode(base64.b85decode(serialized_data.removeprefix(self.key))))
 
         return Error("Incorrect data.")
 
 
-__all__ = ("MsgPackSerializer",)
+__all__ = ("CompactMsgPackSerializer", "ModelCodec", "MsgPackSerializer", "get_model_codec")
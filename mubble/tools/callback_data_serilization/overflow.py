@@ -0,0 +1,299 @@
+import abc
+import asyncio
+import base64
+import datetime
+import hashlib
+import pathlib
+import sqlite3
+import threading
+import time
+import typing
+
+from mubble.modules import logger
+from mubble.tools.limited_dict import LimitedDict
+
+MAX_CALLBACK_DATA_SIZE: typing.Final[int] = 64
+OVERFLOW_PREFIX: typing.Final[str] = "~:"
+"""Prefix of the overflow key, it is not produced by base64, base85 or JSON serializers."""
+
+DEFAULT_TTL: typing.Final[datetime.timedelta] = datetime.timedelta(days=7)
+
+
+class ABCOverflowStore(abc.ABC):
+    """Store of callback data which does not fit into the callback data limit (64 bytes).
+
+    Such data is saved under a short key derived from the data (so the same keyboard
+    is stored once) and the button gets `OVERFLOW_PREFIX + key` as its callback data.
+    """
+
+    @abc.abstractmethod
+    def save(self, key: str, data: str) -> None: ...
+
+    @abc.abstractmethod
+    def load(self, key: str) -> str | None: ...
+
+    async def fetch(self, key: str) -> str | None:
+        """Like `load`, but a store reading from disk does it without blocking the event loop."""
+        return self.load(key)
+
+    @staticmethod
+    def make_key(data: str) -> str:
+        return base64.urlsafe_b64encode(hashlib.blake2b(data.encode(), digest_size=12).digest()).decode()
+
+    def pack(self, data: str) -> str:
+        """Callback data as is if it fits into the limit, otherwise the overflow key of saved data."""
+        if len(data.encode()) <= MAX_CALLBACK_DATA_SIZE and not data.startswith(OVERFLOW_PREFIX):
+            return data
+
+        key = self.make_key(data)
+        self.save(key, data)
+        return OVERFLOW_PREFIX + key
+
+    def unpack(self, data: str) -> str | None:
+        """Callback data saved under the overflow key (`None` if it expired), other data as is."""
+        if not data.startswith(OVERFLOW_PREFIX):
+            return data
+        return self.load(data.removeprefix(OVERFLOW_PREFIX))
+
+    async def unpack_async(self, data: str) -> str | None:
+        """Like `unpack`, but the data is read with `fetch`."""
+        if not data.startswith(OVERFLOW_PREFIX):
+            return data
+        return await self.fetch(data.removeprefix(OVERFLOW_PREFIX))
+
+
+class MemoryOverflowStore(ABCOverflowStore):
+    def __init__(
+        self,
+        *,
+        maxsize: int = 10_000,
+        ttl: datetime.timedelta | float | None = DEFAULT_TTL,
+    ) -> None:
+        self.storage: LimitedDict[str, str] = LimitedDict(maxlimit=maxsize, ttl=ttl)
+
+    def __repr__(self) -> str:
+        return "<{}: {!r}>".format(self.__class__.__name__, self.storage)
+
+    def save(self, key: str, data: str) -> None:
+        self.storage[key] = data
+
+    def load(self, key: str) -> str | None:
+        return self.storage.get(key)
+
+
+class SQLiteOverflowStore(ABCOverflowStore):
+    """Overflow store in a SQLite file, so buttons sent before a restart keep working.
+    When `maxsize` is exceeded, the data expiring first is deleted.
+
+    Saved data is written behind, like in `SQLiteStateStorage`: it is buffered and written
+    in a thread every `flush_interval` seconds or when `flush_size` keys are buffered
+    (at once if there is no running event loop). Buffered data is served by `load`.
+    Call `close()` on shutdown to write it.
+
+    Reads are served from an LRU cache of `cache_size` keys, misses are read with a separate
+    connection (in WAL mode reads are not blocked by the writes), `fetch` reads them in a thread.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        *,
+        maxsize: int = 1_000_000,
+        ttl: datetime.timedelta | float | None = DEFAULT_TTL,
+        flush_interval: datetime.timedelta | float = 1.0,
+        flush_size: int = 1000,
+        cache_size: int = 10_000,
+    ) -> None:
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl.total_seconds() if isinstance(ttl, datetime.timedelta) else ttl
+        self.flush_interval = (
+            flush_interval.total_seconds() if isinstance(flush_interval, datetime.timedelta) else flush_interval
+        )
+        self.flush_size = flush_size
+        self.cache: LimitedDict[str, tuple[str, float]] = LimitedDict(maxlimit=cache_size)
+        self._saved = 0
+        self._pending: dict[str, tuple[str, float]] = {}
+        self._flushing: dict[str, tuple[str, float]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS callback_data "
+            "(key TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)",
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS callback_data_expires_at ON callback_data (expires_at)",
+        )
+        self._read_lock = threading.Lock()
+        self._read_connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+
+    def __repr__(self) -> str:
+        return "<{}: path={!r}, {} pending keys>".format(
+            self.__class__.__name__,
+            str(self.path),
+            len(self._pending),
+        )
+
+    def save(self, key: str, data: str) -> None:
+        self._pending[key] = self.cache[key] = (
+            data,
+            time.time() + self.ttl if self.ttl is not None else float("inf"),
+        )
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Keyboards built outside of the event loop, e.g. on import
+            self._write(self._pending)
+            self._pending = {}
+            return
+
+        if len(self._pending) >= self.flush_size:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._schedule_flush)
+
+    def _write(self, saved: dict[str, tuple[str, float]]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO callback_data (key, data, expires_at) VALUES (?, ?, ?)",
+                    [(key, data, expires_at) for key, (data, expires_at) in saved.items()],
+                )
+                if (self._saved + len(saved)) // 1000 > self._saved // 1000:
+                    self._prune()
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            self._saved += len(saved)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_in_background())
+
+    async def _flush_in_background(self) -> None:
+        try:
+            await self.flush()
+        except Exception as exc:
+            logger.exception("Failed to write callback data to {!r}: {!r}", str(self.path), exc)
+
+        # Data saved while writing or not written because of an error
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._schedule_flush)
+
+    async def flush(self) -> None:
+        """Write the buffered data."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            saved = self._flushing = self._pending
+            self._pending = {}
+            try:
+                await asyncio.to_thread(self._write, saved)
+            except BaseException:
+                self._pending = saved | self._pending
+                raise
+            finally:
+                self._flushing = {}
+
+    def _prune(self) -> None:
+        self._connection.execute("DELETE FROM callback_data WHERE expires_at <= ?", (time.time(),))
+        self._connection.execute(
+            "DELETE FROM callback_data WHERE key IN "
+            "(SELECT key FROM callback_data ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+    def _lookup(self, key: str) -> tuple[str, float] | None:
+        return self._pending.get(key) or self._flushing.get(key) or self.cache.get(key)
+
+    def _select(self, key: str) -> tuple[str, float] | None:
+        with self._read_lock:
+            return self._read_connection.execute(
+                "SELECT data, expires_at FROM callback_data WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+    def _cache_row(self, key: str, row: tuple[str, float] | None) -> str | None:
+        if row is None:
+            return None
+        # The key could be saved again while reading, the saved data expires later
+        cached = self.cache.setdefault(key, row)
+        return cached[0] if cached[1] > time.time() else None
+
+    def load(self, key: str) -> str | None:
+        if (saved := self._lookup(key)) is not None:
+            return saved[0] if saved[1] > time.time() else None
+        return self._cache_row(key, self._select(key))
+
+    async def fetch(self, key: str) -> str | None:
+        if (saved := self._lookup(key)) is not None:
+            return saved[0] if saved[1] > time.time() else None
+        return self._cache_row(key, await asyncio.to_thread(self._select, key))
+
+    async def close(self) -> None:
+        """Write the buffered data and close the database."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await self.flush()
+        with self._lock:
+            self._connection.close()
+        with self._read_lock:
+            self._read_connection.close()
+
+
+_overflow_store: ABCOverflowStore | None = None
+
+
+def set_overflow_store(store: ABCOverflowStore | None, /) -> None:
+    """Set the store used by buttons to save callback data over 64 bytes,
+    and by `Payload` node and `CallbackQuery.decode_data` to resolve it.
+    """
+    global _overflow_store
+    _overflow_store = store
+
+
+def get_overflow_store() -> ABCOverflowStore | None:
+    return _overflow_store
+
+
+def pack_callback_data(data: str, /) -> str:
+    return data if _overflow_store is None else _overflow_store.pack(data)
+
+
+def unpack_callback_data(data: str, /) -> str | None:
+    """Callback data resolved from the overflow store, `None` if the saved data expired."""
+    if _overflow_store is None or not data.startswith(OVERFLOW_PREFIX):
+        return data
+    return _overflow_store.unpack(data)
+
+
+async def fetch_callback_data(data: str, /) -> str | None:
+    """Like `unpack_callback_data`, but the saved data is read without blocking the event loop."""
+    if _overflow_store is None or not data.startswith(OVERFLOW_PREFIX):
+        return data
+    return await _overflow_store.unpack_async(data)
+
+
+__all__ = (
+    "ABCOverflowStore",
+    "MAX_CALLBACK_DATA_SIZE",
+    "MemoryOverflowStore",
+    "OVERFLOW_PREFIX",
+    "SQLiteOverflowStore",
+    "fetch_callback_data",
+    "get_overflow_store",
+    "pack_callback_data",
+    "set_overflow_store",
+    "unpack_callback_data",
+)
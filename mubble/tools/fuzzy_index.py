@@ -0,0 +1,104 @@
+import collections
+import dataclasses
+import difflib
+import math
+import typing
+
+type Token = tuple[str, int]
+"""Character with the number of its occurrence, so sets of tokens are multisets of characters."""
+
+
+def get_tokens(text: str, /) -> frozenset[Token]:
+    seen: collections.Counter[str] = collections.Counter()
+    tokens = []
+    for char in text:
+        seen[char] += 1
+        tokens.append((char, seen[char]))
+    return frozenset(tokens)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class FuzzyMatch:
+    text: str
+    ratio: float
+
+
+@dataclasses.dataclass(slots=True)
+class _Entry:
+    text: str
+    matcher: difflib.SequenceMatcher[str]
+
+
+class FuzzyIndex:
+    """Index of texts for the best `SequenceMatcher(a=text, b=indexed_text).ratio()`.
+
+    Texts are bucketed by length and their characters are kept as bitmasks of tokens,
+    so `quick_ratio` (an upper bound of the ratio by the number of shared characters)
+    is one `&` of integers. Buckets whose length does not allow the minimal ratio are skipped,
+    candidates are scored in the order of the upper bound until it cannot beat the best ratio.
+    """
+
+    def __init__(self, texts: typing.Iterable[str], /) -> None:
+        self.entries: list[_Entry] = []
+        self.bits: dict[Token, int] = {}
+        self.buckets: dict[int, list[tuple[int, int]]] = {}
+        """Positions of texts with their token masks by the text length."""
+
+        for position, text in enumerate(dict.fromkeys(texts)):
+            self.entries.append(_Entry(text, difflib.SequenceMatcher(b=text)))
+            self.buckets.setdefault(len(text), []).append((position, self.get_mask(text, extend=True)))
+
+    def __repr__(self) -> str:
+        return "<{}: {} texts>".format(self.__class__.__name__, len(self.entries))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_mask(self, text: str, /, *, extend: bool = False) -> int:
+        """Bitmask of the text tokens, unknown tokens are skipped (or added if `extend` is set)."""
+        mask = 0
+        for token in get_tokens(text):
+            if (bit := self.bits.get(token)) is None:
+                if not extend:
+                    continue
+                bit = self.bits[token] = len(self.bits)
+            mask |= 1 << bit
+        return mask
+
+    def _get_bounds(self, text: str, min_ratio: float) -> list[tuple[float, int]]:
+        mask, length = self.get_mask(text), len(text)
+        bounds: list[tuple[float, int]] = []
+        for size, bucket in self.buckets.items():
+            if not length + size:
+                bounds.extend((1.0, position) for position, _ in bucket)
+                continue
+
+            # Shared characters needed for the ratio, minus one to be safe from rounding
+            min_matches = math.ceil(min_ratio * (length + size) / 2.0) - 1
+            if min_matches > min(length, size):
+                continue
+
+            # Computed as `SequenceMatcher.ratio()`, so an equal ratio is not rounded below the bound
+            bounds.extend(
+                (2.0 * shared / (length + size), position)
+                for position, text_mask in bucket
+                if (shared := (text_mask & mask).bit_count()) >= min_matches
+            )
+        return bounds
+
+    def match(self, text: str, /, min_ratio: float = 0.0) -> FuzzyMatch | None:
+        """Indexed text with the best ratio to the text, `None` if no ratio reaches `min_ratio`."""
+        best: FuzzyMatch | None = None
+        for bound, position in sorted(self._get_bounds(text, min_ratio), reverse=True):
+            if bound < min_ratio or (best is not None and bound <= best.ratio):
+                break
+
+            entry = self.entries[position]
+            entry.matcher.set_seq1(text)
+            ratio = entry.matcher.ratio()
+            if ratio >= min_ratio and (best is None or ratio > best.ratio):
+                best = FuzzyMatch(entry.text, ratio)
+        return best
+
+
+__all__ = ("FuzzyIndex", "FuzzyMatch", "get_tokens")
@@ -8,6 +8,10 @@ class ABCI18n(ABC):
     def get_translator_by_locale(self, locale: str) -> "ABCTranslator":
         pass
 
+    def get_locales(self) -> tuple[str, ...]:
+        """Locales with translations, see `Dispatch.warm_up_translations`."""
+        return ()
+
 
 class ABCTranslator(ABC):
     def __init__(self, locale: str, **kwargs: typing.Any) -> None:
@@ -36,6 +36,9 @@ class SimpleI18n(ABCI18n):
                 raise FileNotFoundError(".po files should be compiled first")
         return result
 
+    def get_locales(self) -> tuple[str, ...]:
+        return tuple(self.translators)
+
     def get_translator_by_locale(self, locale: str) -> "SimpleTranslator":
         return SimpleTranslator(locale, self.translators.get(locale, self.translators[self.default_locale]))
 
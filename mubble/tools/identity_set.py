@@ -0,0 +1,161 @@
+import array
+import asyncio
+import bisect
+import heapq
+import os
+import pathlib
+import typing
+
+from mubble.modules import logger
+
+type Members[Identity] = frozenset[Identity] | SortedIdentities
+type FileVersion = tuple[int, int, int]
+
+ARRAY_THRESHOLD: typing.Final[int] = 65_536
+"""Sets of integer identities of this size and larger are stored as sorted arrays."""
+SORT_CHUNK_SIZE: typing.Final[int] = 65_536
+
+
+class SortedIdentities:
+    """Sorted array of 64-bit integers (8 bytes per identity), membership is tested by binary search."""
+
+    __slots__ = ("array",)
+
+    def __init__(self, identities: typing.Iterable[int], /) -> None:
+        # Sorted by chunks and merged by a generator, so building the array in a thread
+        # does not hold the GIL (and block the event loop) for the whole sort
+        identities = list(identities)
+        chunks = [
+            sorted(identities[start : start + SORT_CHUNK_SIZE])
+            for start in range(0, len(identities), SORT_CHUNK_SIZE)
+        ]
+        self.array = array.array("q", heapq.merge(*chunks))
+
+    def __repr__(self) -> str:
+        return "<{}: {} identities>".format(self.__class__.__name__, len(self.array))
+
+    def __len__(self) -> int:
+        return len(self.array)
+
+    def __iter__(self) -> typing.Iterator[int]:
+        return iter(self.array)
+
+    def __contains__(self, identity: object, /) -> bool:
+        if not isinstance(identity, int):
+            return False
+        index = bisect.bisect_left(self.array, identity)
+        return index < len(self.array) and self.array[index] == identity
+
+
+def build_members[Identity](
+    identities: typing.Iterable[Identity],
+    /,
+    array_threshold: int = ARRAY_THRESHOLD,
+) -> Members[Identity]:
+    identities = list(identities)
+    if len(identities) >= array_threshold:
+        try:
+            return SortedIdentities(identities)  # type: ignore
+        except (TypeError, OverflowError):
+            # Not 64-bit integers
+            pass
+    return frozenset(identities)
+
+
+class IdentitySet[Identity: (int, str)]:
+    """Set of identities (user ids, chat ids, language codes) for allow and deny lists.
+
+    Small sets are hashed, large sets of integers are stored as sorted arrays.
+    The set can be loaded from a file with an identity per line (empty lines and lines
+    starting with `#` are skipped) and reloaded when the file changes: the new set is built
+    in a thread and swapped in with one assignment, so checks always see a whole set.
+    """
+
+    def __init__(
+        self,
+        identities: typing.Iterable[Identity] = (),
+        /,
+        *,
+        path: str | pathlib.Path | None = None,
+        parser: typing.Callable[[str], Identity] = int,
+        array_threshold: int = ARRAY_THRESHOLD,
+    ) -> None:
+        self.path = path
+        self.parser = parser
+        self.array_threshold = array_threshold
+        self.members: Members[Identity] = build_members(identities, array_threshold)
+        self._version: FileVersion | None = None
+
+    def __repr__(self) -> str:
+        return "<{}: {} identities{}>".format(
+            self.__class__.__name__,
+            len(self),
+            "" if self.path is None else f", path={str(self.path)!r}",
+        )
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def __iter__(self) -> typing.Iterator[Identity]:
+        return iter(self.members)  # type: ignore
+
+    def __contains__(self, identity: object, /) -> bool:
+        return identity in self.members
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str | pathlib.Path,
+        /,
+        *,
+        parser: typing.Callable[[str], Identity] = int,
+        array_threshold: int = ARRAY_THRESHOLD,
+    ) -> typing.Self:
+        identity_set = cls(path=path, parser=parser, array_threshold=array_threshold)
+        identity_set._version, identity_set.members = identity_set._load()
+        return identity_set
+
+    def swap(self, identities: typing.Iterable[Identity], /) -> None:
+        """Replace the identities, the set is built in the current thread."""
+        self.members = build_members(identities, self.array_threshold)
+
+    def _get_version(self) -> FileVersion:
+        assert self.path is not None, "Identity set has no file."
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _load(self) -> tuple[FileVersion, Members[Identity]]:
+        assert self.path is not None, "Identity set has no file."
+        version = self._get_version()
+        with open(self.path, encoding="UTF-8") as file:
+            identities = [self.parser(line) for line in map(str.strip, file) if line and not line.startswith("#")]
+        return version, build_members(identities, self.array_threshold)
+
+    async def reload(self, *, force: bool = False) -> bool:
+        """Reload the identities from the file if it was changed, returns whether the set was reloaded."""
+        if not force and await asyncio.to_thread(self._get_version) == self._version:
+            return False
+        self._version, self.members = await asyncio.to_thread(self._load)
+        return True
+
+
+async def reload_identity_set_worker(
+    identity_set: IdentitySet[typing.Any],
+    interval_seconds: int = 60,
+) -> typing.NoReturn:
+    while True:
+        try:
+            if await identity_set.reload():
+                logger.debug("Identity set {!r} is reloaded.", identity_set)
+        except Exception as exc:
+            logger.exception("Failed to reload identity set {!r}: {!r}", identity_set, exc)
+        await asyncio.sleep(interval_seconds)
+
+
+__all__ = (
+    "ARRAY_THRESHOLD",
+    "IdentitySet",
+    "SortedIdentities",
+    "build_members",
+    "reload_identity_set_worker",
+)
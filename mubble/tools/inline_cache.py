@@ -0,0 +1,114 @@
+import contextlib
+import contextvars
+import datetime
+import time
+import typing
+from collections import OrderedDict
+
+from mubble.types.objects import InlineQuery
+
+type InlineCacheKey = tuple[str, str, str | None, int | None]
+type AnswerParams = dict[str, typing.Any]
+
+_ANSWER_RECORDER: typing.Final[contextvars.ContextVar[list[AnswerParams] | None]] = contextvars.ContextVar(
+    "inline_query_answer_recorder",
+    default=None,
+)
+
+
+def record_answer(params: AnswerParams, /) -> None:
+    """Record `answer_inline_query` params if the answer is made while recording (see `recording_answers`)."""
+    if (recorder := _ANSWER_RECORDER.get()) is not None:
+        recorder.append({k: v for k, v in params.items() if k != "inline_query_id"})
+
+
+@contextlib.contextmanager
+def recording_answers() -> typing.Iterator[list[AnswerParams]]:
+    recorder: list[AnswerParams] = []
+    token = _ANSWER_RECORDER.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _ANSWER_RECORDER.reset(token)
+
+
+class InlineQueryCache:
+    """LRU cache of inline query answers with expiration.
+
+    Answers are keyed by `(query, offset, locale)`, answers marked as `is_personal`
+    are additionally keyed by the user id, so they are reused only for the same user.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: datetime.timedelta | float = 60.0,
+        maxsize: int = 1024,
+    ) -> None:
+        self.ttl = ttl.total_seconds() if isinstance(ttl, datetime.timedelta) else ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._storage: OrderedDict[InlineCacheKey, tuple[float, AnswerParams]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return "<{}: {} answers, ttl={}, maxsize={}, hits={}, misses={}>".format(
+            self.__class__.__name__,
+            len(self._storage),
+            self.ttl,
+            self.maxsize,
+            self.hits,
+            self.misses,
+        )
+
+    def __len__(self) -> int:
+        return len(self._storage)
+
+    @staticmethod
+    def get_key(query: InlineQuery, *, personal: bool = False) -> InlineCacheKey:
+        return (
+            query.query,
+            query.offset,
+            query.from_.language_code.unwrap_or_none(),
+            query.from_.id if personal else None,
+        )
+
+    def _get(self, key: InlineCacheKey) -> AnswerParams | None:
+        if (item := self._storage.get(key)) is None:
+            return None
+
+        expires_at, params = item
+        if expires_at <= time.monotonic():
+            del self._storage[key]
+            return None
+
+        self._storage.move_to_end(key)
+        return params
+
+    def get(self, query: InlineQuery, /) -> AnswerParams | None:
+        params = self._get(self.get_key(query, personal=True)) or self._get(self.get_key(query))
+        if params is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return params
+
+    def set(self, query: InlineQuery, params: AnswerParams, /) -> None:
+        key = self.get_key(query, personal=bool(params.get("is_personal")))
+        self._storage[key] = (time.monotonic() + self.ttl, params)
+        self._storage.move_to_end(key)
+
+        while len(self._storage) > self.maxsize:
+            self._storage.popitem(last=False)
+
+    def invalidate(self, query: str | None = None, /) -> None:
+        """Drop cached answers for the query text or all answers if query is not specified."""
+        if query is None:
+            self._storage.clear()
+            return
+
+        for key in [key for key in self._storage if key[0] == query]:
+            del self._storage[key]
+
+
+__all__ = ("InlineQueryCache", "record_answer", "recording_answers")
@@ -1,32 +1,140 @@
-from collections import UserDict, deque
+import datetime
+import heapq
+import itertools
+import time
+import typing
+from collections import OrderedDict, UserDict
 
 
 class LimitedDict[Key, Value](UserDict[Key, Value]):
-    def __init__(self, *, maxlimit: int = 1000) -> None:
+    """Dictionary limited by the number of items, the least recently used item is
+    evicted when the limit is reached. Items can expire after `ttl` seconds (for all
+    items or for an item set with `set(..., ttl=...)`), expired items are treated as missing
+    and are evicted before any live item.
+
+    All operations on a single item are O(1), except that expiring items are also
+    kept in a heap of expiration times (O(log n)).
+    """
+
+    data: OrderedDict[Key, Value]  # type: ignore
+
+    def __init__(
+        self,
+        *,
+        maxlimit: int = 1000,
+        ttl: datetime.timedelta | float | None = None,
+    ) -> None:
         super().__init__()
+        self.data = OrderedDict()
         self.maxlimit = maxlimit
-        self.queue: deque[Key] = deque(maxlen=maxlimit)
+        self.ttl = ttl.total_seconds() if isinstance(ttl, datetime.timedelta) else ttl
+        self._expires: dict[Key, float] = {}
+        self._expiry_heap: list[tuple[float, int, Key]] = []
+        self._counter = itertools.count()
+
+    def __repr__(self) -> str:
+        return "<{}: {} items, maxlimit={}, ttl={}>".format(
+            self.__class__.__name__,
+            len(self.data),
+            self.maxlimit,
+            self.ttl,
+        )
 
-    def set(self, key: Key, value: Value, /) -> Value | None:
+    def __len__(self) -> int:
+        self._purge()
+        return len(self.data)
+
+    def _purge(self) -> int:
+        """Delete expired items in the order of their expiration, returns the number of deleted items."""
+        deleted = 0
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            if self._expires.get(key) == expires_at:
+                del self.data[key], self._expires[key]
+                deleted += 1
+        return deleted
+
+    def _is_expired(self, key: Key, /) -> bool:
+        if (expires_at := self._expires.get(key)) is None or expires_at > time.monotonic():
+            return False
+        del self.data[key], self._expires[key]
+        return True
+
+    def set(
+        self,
+        key: Key,
+        value: Value,
+        /,
+        *,
+        ttl: datetime.timedelta | float | None = None,
+    ) -> Value | None:
         """Set item in the dictionary.
         Returns a value that was deleted when the limit in the dictionary
         was reached, otherwise None.
         """
         deleted_item = None
-        if len(self.queue) >= self.maxlimit:
-            deleted_item = self.pop(self.queue.popleft(), None)
-        if key not in self.queue:
-            self.queue.append(key)
-        super().__setitem__(key, value)
+        if key in self.data:
+            self.data.move_to_end(key)
+        elif len(self.data) >= self.maxlimit and (not self._expires or not self._purge()):
+            deleted_key, deleted_item = self.data.popitem(last=False)
+            self._expires.pop(deleted_key, None)
+
+        self.data[key] = value
+        if ttl is None:
+            ttl = self.ttl
+        elif isinstance(ttl, datetime.timedelta):
+            ttl = ttl.total_seconds()
+
+        if ttl is not None:
+            expires_at = self._expires[key] = time.monotonic() + ttl
+            heapq.heappush(self._expiry_heap, (expires_at, next(self._counter), key))
+            if len(self._expiry_heap) > 2 * len(self._expires) + 64:
+                # Drop heap entries of deleted and re-set items
+                self._expiry_heap = [
+                    entry for entry in self._expiry_heap if self._expires.get(entry[2]) == entry[0]
+                ]
+                heapq.heapify(self._expiry_heap)
+        else:
+            self._expires.pop(key, None)
         return deleted_item
 
     def __setitem__(self, key: Key, value: Value, /) -> None:
         self.set(key, value)
 
-    def __delitem__(self, key: Key) -> None:
-        if key in self.queue:
-            self.queue.remove(key)
-        return super().__delitem__(key)
+    def __getitem__(self, key: Key, /) -> Value:
+        if key not in self.data or self._is_expired(key):
+            raise KeyError(key)
+        self.data.move_to_end(key)
+        return self.data[key]
+
+    def __delitem__(self, key: Key, /) -> None:
+        del self.data[key]
+        self._expires.pop(key, None)
+
+    def __contains__(self, key: object, /) -> bool:
+        return key in self.data and not self._is_expired(key)  # type: ignore
+
+    def __iter__(self) -> typing.Iterator[Key]:
+        # Iterate over a snapshot, so items can be accessed or deleted while iterating
+        return iter([key for key in list(self.data) if key not in self._expires or not self._is_expired(key)])
+
+    def copy(self) -> typing.Self:
+        limited_dict = self.__class__(maxlimit=self.maxlimit, ttl=self.ttl)
+        limited_dict.data = self.data.copy()
+        limited_dict._expires = self._expires.copy()
+        limited_dict._expiry_heap = self._expiry_heap.copy()
+        return limited_dict
+
+    def clear(self) -> None:
+        self.data.clear()
+        self._expires.clear()
+        self._expiry_heap.clear()
+
+    def purge_expired(self) -> int:
+        """Delete expired items, returns the number of deleted items."""
+        return self._purge()
 
 
 __all__ = ("LimitedDict",)
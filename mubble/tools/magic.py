@@ -104,6 +104,40 @@ def get_annotations(func: Function, *, return_type: bool = False) -> dict[str, t
     return annotations
 
 
+def freeze_value(value: typing.Any) -> typing.Hashable:
+    """Hashable equivalent of the value, containers are converted to tuples and frozensets.
+
+    Every value is paired with its type, so equal values of different types (`1`, `1.0` and `True`)
+    are frozen differently.
+    """
+    if isinstance(value, list | tuple):
+        return (type(value), tuple(map(freeze_value, value)))
+    if isinstance(value, set | frozenset):
+        return (type(value), frozenset(map(freeze_value, value)))
+    if isinstance(value, dict):
+        return (type(value), frozenset((freeze_value(k), freeze_value(v)) for k, v in value.items()))
+    return (type(value), value)
+
+
+class HashedKey:
+    """Hashable key with the hash computed once, so a large key is not hashed again on every lookup."""
+
+    __slots__ = ("hash", "value")
+
+    def __init__(self, value: typing.Hashable, /) -> None:
+        self.value = value
+        self.hash = hash(value)
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(self.__class__.__name__, self.value)
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, HashedKey) and self.hash == other.hash and self.value == other.value
+
+
 def to_str(s: str | enum.Enum) -> str:
     if isinstance(s, enum.Enum):
         return str(s.value)
@@ -195,6 +229,51 @@ def magic_bundle(
     return args
 
 
+@dataclasses.dataclass(slots=True, frozen=True)
+class BindingPlan:
+    """Precompiled argument binding of a function, binds the same arguments as `magic_bundle`
+    but looks up only the parameter names instead of walking all the values.
+    """
+
+    names: tuple[str, ...]
+    defaults: dict[str, typing.Any]
+    annotations: dict[str, typing.Any]
+    var_kwargs_only: bool
+    event_params: dict[type[typing.Any], str | None] = dataclasses.field(default_factory=dict)
+
+    def get_event_param(self, event_class: type[typing.Any], /) -> str | None:
+        """Name of the first parameter annotated with the event class."""
+        if event_class not in self.event_params:
+            self.event_params[event_class] = next(
+                (k for k, v in self.annotations.items() if (typing.get_origin(v) or v) is event_class),
+                None,
+            )
+        return self.event_params[event_class]
+
+    def bind(self, kw: typing.Mapping[str, typing.Any], /) -> dict[str, typing.Any]:
+        if self.var_kwargs_only:
+            return {to_str(k): v for k, v in kw.items()}
+
+        args = self.defaults.copy()
+        for name in self.names:
+            if name in kw:
+                args[name] = kw[name]
+        return args
+
+
+def get_binding_plan(function: Function, /, *, start_idx: int = 1) -> BindingPlan:
+    plans: dict[int, BindingPlan] = function.__dict__.setdefault("__binding_plans__", {})
+    if start_idx not in plans:
+        names = resolve_arg_names(function, start_idx=start_idx)
+        plans[start_idx] = BindingPlan(
+            names=names,
+            defaults=get_default_args(function),
+            annotations=get_annotations(function),
+            var_kwargs_only="var_kwargs" in get_func_parameters(function) and not names,
+        )
+    return plans[start_idx]
+
+
 def join_dicts[Key: typing.Hashable, Value](
     left_dict: dict[Key, typing.Any],
     right_dict: dict[typing.Any, Value],
@@ -324,12 +403,16 @@ async def cancel_future(fut: asyncio.Future[typing.Any], /) -> None:
 
 
 __all__ = (
+    "BindingPlan",
+    "HashedKey",
     "Shortcut",
     "TRANSLATIONS_KEY",
     "cache_magic_value",
     "cache_translation",
     "cancel_future",
+    "freeze_value",
     "get_annotations",
+    "get_binding_plan",
     "get_cached_translation",
     "get_default_args",
     "get_default_args",
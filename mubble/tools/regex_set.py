@@ -0,0 +1,271 @@
+import dataclasses
+import re
+import typing
+
+type PatternLike = str | typing.Pattern[str]
+
+SPECIAL_CHARS: typing.Final[frozenset[str]] = frozenset(".^$*+?{}[]\\|()")
+QUANTIFIERS: typing.Final[frozenset[str]] = frozenset("*+?{")
+GLOBAL_FLAGS_REGEX: typing.Final[re.Pattern[str]] = re.compile(r"\(\?[aiLmsux]+\)")
+"""Leading inline flags of a pattern, they apply to the whole pattern and are kept in `Pattern.flags`."""
+NUMBERED_REFERENCE_REGEX: typing.Final[re.Pattern[str]] = re.compile(r"\\[1-9]|\(\?\(\d")
+
+
+def strip_global_flags(source: str, /) -> str:
+    return source[match.end() :] if (match := GLOBAL_FLAGS_REGEX.match(source)) else source
+
+
+def has_top_level_alternation(source: str, /) -> bool:
+    depth, index, in_class = 0, 0, False
+    while index < len(source):
+        char = source[index]
+        if char == "\\":
+            index += 2
+            continue
+
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            index += 1 + source.startswith("^", index + 1)
+            index += source.startswith("]", index)
+            continue
+        elif source.startswith("(?#", index):
+            index = source.find(")", index) + 1 or len(source)
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        index += 1
+    return False
+
+
+def get_literal_prefix(pattern: re.Pattern[str], /) -> str:
+    """Literal text every match of the pattern starts with (may be empty)."""
+    source = strip_global_flags(pattern.pattern)
+    if pattern.flags & (re.IGNORECASE | re.VERBOSE) or has_top_level_alternation(source):
+        return ""
+
+    prefix: list[str] = []
+    index = 1 if source.startswith("^") else 0
+    while index < len(source):
+        char = source[index]
+        if char == "\\" and index + 1 < len(source) and not source[index + 1].isalnum():
+            literal, size = source[index + 1], 2
+        elif char in SPECIAL_CHARS:
+            break
+        else:
+            literal, size = char, 1
+
+        if source[index + size : index + size + 1] in QUANTIFIERS:
+            # The literal is optional or repeated
+            break
+        prefix.append(literal)
+        index += size
+    return "".join(prefix)
+
+
+def is_escaped(source: str, index: int, /) -> bool:
+    """The character at the index is preceded by an odd number of backslashes."""
+    slashes = 0
+    while slashes < index and source[index - slashes - 1] == "\\":
+        slashes += 1
+    return slashes % 2 == 1
+
+
+def get_literal_suffix(pattern: re.Pattern[str], /) -> str:
+    """Literal text every match of the pattern anchored by the final `$` ends with (may be empty).
+    The match can be followed by the newline ending the string, `$` matches before it.
+    """
+    source = strip_global_flags(pattern.pattern)
+    if (
+        pattern.flags & (re.IGNORECASE | re.VERBOSE | re.MULTILINE)
+        or not source.endswith("$")
+        or is_escaped(source, len(source) - 1)
+        or has_top_level_alternation(source)
+    ):
+        return ""
+
+    suffix: list[str] = []
+    index = len(source) - 2
+    while index >= 0:
+        char = source[index]
+        if is_escaped(source, index):
+            if char.isalnum():
+                break
+            suffix.append(char)
+            index -= 2
+        elif char in SPECIAL_CHARS:
+            break
+        else:
+            suffix.append(char)
+            index -= 1
+    return "".join(reversed(suffix))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RegexMatch:
+    index: int
+    """Index of the matched pattern in the set."""
+
+    pattern: re.Pattern[str]
+    match: re.Match[str]
+    offset: int
+    """Number of the group enclosing the pattern in the combined match."""
+
+    def group(self) -> str:
+        return self.match.group(self.offset)
+
+    def groups(self) -> tuple[str | typing.Any, ...]:
+        return self.match.groups()[self.offset : self.offset + self.pattern.groups]
+
+    def groupdict(self) -> dict[str, str | typing.Any]:
+        return {name: self.match.group(self.offset + number) for name, number in self.pattern.groupindex.items()}
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Batch:
+    regex: re.Pattern[str]
+    start: int
+    stop: int
+    branches: dict[int, int]
+    """Group enclosing the pattern to the pattern index, empty if the batch is a single uncombined pattern."""
+
+    prefixes: tuple[str, ...] | None
+    """Literal prefixes of the patterns, `None` if some pattern has no literal prefix."""
+
+
+def _can_combine(pattern: re.Pattern[str], /) -> bool:
+    # Numbered groups of the pattern are shifted in the alternation
+    return NUMBERED_REFERENCE_REGEX.search(pattern.pattern) is None
+
+
+def _compile_batch(patterns: typing.Sequence[re.Pattern[str]], start: int) -> list[_Batch]:
+    prefixes = tuple(map(get_literal_prefix, patterns))
+    batch_prefixes = None if not all(prefixes) else prefixes
+    if len(patterns) == 1:
+        return [_Batch(patterns[0], start, start + 1, {}, batch_prefixes)]
+
+    branches: dict[int, int] = {}
+    sources: list[str] = []
+    group = 1
+    for index, pattern in enumerate(patterns, start=start):
+        # Global flags are passed to the combined pattern, they cannot be set in the middle of it
+        source = strip_global_flags(pattern.pattern)
+        if pattern.flags & re.VERBOSE:
+            source += "\n"
+        sources.append(f"(?P<_mubble_{index}>{source})")
+        branches[group] = index
+        group += 1 + pattern.groups
+
+    try:
+        regex = re.compile("|".join(sources), patterns[0].flags)
+    except re.error:
+        return [
+            _Batch(pattern, index, index + 1, {}, None if not prefix else (prefix,))
+            for index, (pattern, prefix) in enumerate(zip(patterns, prefixes), start=start)
+        ]
+    return [_Batch(regex, start, start + len(patterns), branches, batch_prefixes)]
+
+
+def compile_batches(patterns: typing.Sequence[re.Pattern[str]], start: int = 0) -> tuple[_Batch, ...]:
+    """Split the patterns into consecutive batches combined into one alternation each.
+    A batch is closed by a pattern with other flags or with a group name already used in the batch.
+    """
+    batches: list[_Batch] = []
+    batch: list[re.Pattern[str]] = []
+    names: set[str] = set()
+    batch_start = start
+
+    for index, pattern in enumerate(patterns, start=start):
+        if batch and (
+            pattern.flags != batch[0].flags
+            or not _can_combine(pattern)
+            or not _can_combine(batch[0])
+            or not names.isdisjoint(pattern.groupindex)
+        ):
+            batches.extend(_compile_batch(batch, batch_start))
+            batch, batch_start = [], index
+            names.clear()
+        batch.append(pattern)
+        names.update(pattern.groupindex)
+
+    if batch:
+        batches.extend(_compile_batch(batch, batch_start))
+    return tuple(batches)
+
+
+class RegexSet:
+    """Ordered patterns combined into alternations of named branches, so the first pattern
+    matching the beginning of a text is found in a single `re` pass together with its groups.
+
+    Batches whose patterns all start with literal text are skipped without running the regex
+    if the text does not start with any of these literals. Patterns are compiled on the first match.
+    """
+
+    def __init__(self, patterns: typing.Iterable[PatternLike] = (), /) -> None:
+        self.patterns: list[re.Pattern[str]] = []
+        self._batches: dict[int, tuple[_Batch, ...]] = {}
+        self.extend(patterns)
+
+    def __repr__(self) -> str:
+        return "<{}: {} patterns>".format(self.__class__.__name__, len(self.patterns))
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def extend(self, patterns: typing.Iterable[PatternLike], /) -> range:
+        """Add the patterns, returns their indices in the set."""
+        start = len(self.patterns)
+        self.patterns.extend(re.compile(pattern) if isinstance(pattern, str) else pattern for pattern in patterns)
+        self._batches.clear()
+        return range(start, len(self.patterns))
+
+    def get_batches(self, start: int = 0) -> tuple[_Batch, ...]:
+        """Batches of the patterns from `start`, compiled once per `start`."""
+        if start in self._batches:
+            return self._batches[start]
+
+        batches = self._batches.get(0) or self._batches.setdefault(0, compile_batches(self.patterns))
+        for position, batch in enumerate(batches):
+            if batch.start <= start < batch.stop:
+                if batch.start != start:
+                    suffix = compile_batches(self.patterns[start : batch.stop], start)
+                    batches = (*suffix, *batches[position + 1 :])
+                else:
+                    batches = batches[position:]
+                break
+        else:
+            batches = ()
+
+        self._batches[start] = batches
+        return batches
+
+    def match(self, text: str, /, start: int = 0) -> RegexMatch | None:
+        """First pattern with index from `start` matching the beginning of the text."""
+        for batch in self.get_batches(start):
+            if batch.prefixes is not None and not text.startswith(batch.prefixes):
+                continue
+            if (match := batch.regex.match(text)) is None:
+                continue
+            if not batch.branches:
+                return RegexMatch(batch.start, batch.regex, match, 0)
+
+            index = batch.branches[match.lastindex]  # type: ignore
+            return RegexMatch(index, self.patterns[index], match, match.lastindex)  # type: ignore
+        return None
+
+
+__all__ = (
+    "RegexMatch",
+    "RegexSet",
+    "compile_batches",
+    "get_literal_prefix",
+    "get_literal_suffix",
+    "has_top_level_alternation",
+    "is_escaped",
+    "strip_global_flags",
+)
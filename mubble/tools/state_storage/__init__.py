@@ -1,4 +1,16 @@
 from mubble.tools.state_storage.abc import ABCStateStorage, StateData
-from mubble.tools.state_storage.memory import MemoryStateStorage
+from mubble.tools.state_storage.memory import (
+    MemoryStateStorage,
+    MemoryStateStorageStats,
+    clear_state_storage_worker,
+)
+from mubble.tools.state_storage.sqlite import SQLiteStateStorage
 
-__all__ = ("ABCStateStorage", "MemoryStateStorage", "StateData")
+__all__ = (
+    "ABCStateStorage",
+    "MemoryStateStorage",
+    "MemoryStateStorageStats",
+    "SQLiteStateStorage",
+    "StateData",
+    "clear_state_storage_worker",
+)
@@ -1,11 +1,16 @@
 import abc
 import dataclasses
 import enum
+import functools
+import typing
 
-from fntypes.option import Option
+from fntypes.option import Nothing, Option
 
 from mubble.bot.rules.state import State, StateMeta
 
+# Creating `Nothing` captures a traceback, most users have no state so storages return the same object
+NO_STATE: typing.Final[Option[typing.Any]] = Nothing()
+
 
 @dataclasses.dataclass(frozen=True, slots=True)
 class StateData[Payload]:
@@ -13,7 +18,30 @@ class StateData[Payload]:
     payload: Payload
 
 
+def counting_writes[**P, R](
+    method: typing.Callable[typing.Concatenate["ABCStateStorage[typing.Any]", P], typing.Awaitable[R]],
+    /,
+) -> typing.Callable[typing.Concatenate["ABCStateStorage[typing.Any]", P], typing.Awaitable[R]]:
+    @functools.wraps(method)
+    async def wrapper(self: "ABCStateStorage[typing.Any]", *args: P.args, **kwargs: P.kwargs) -> R:
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            self.version += 1
+
+    return wrapper
+
+
 class ABCStateStorage[Payload](abc.ABC):
+    version: int = 0
+    """Number of writes (`set` and `delete` calls), states cached per event are fetched again when it changes."""
+
+    def __init_subclass__(cls, **kwargs: typing.Any) -> None:
+        super().__init_subclass__(**kwargs)
+        for name in ("set", "delete"):
+            if name in cls.__dict__ and not getattr(cls.__dict__[name], "__isabstractmethod__", False):
+                setattr(cls, name, counting_writes(cls.__dict__[name]))
+
     @abc.abstractmethod
     async def get(self, user_id: int) -> Option[StateData[Payload]]: ...
 
@@ -23,9 +51,17 @@ class ABCStateStorage[Payload](abc.ABC):
     @abc.abstractmethod
     async def set(self, user_id: int, key: str | enum.Enum, payload: Payload) -> None: ...
 
+    async def get_many(self, user_ids: typing.Iterable[int], /) -> dict[int, StateData[Payload]]:
+        """States of the users, users without a state are omitted."""
+        states = {}
+        for user_id in user_ids:
+            if state := await self.get(user_id):
+                states[user_id] = state.unwrap()
+        return states
+
     def State(self, key: str | StateMeta | enum.Enum = StateMeta.ANY, /) -> State[Payload]:  # noqa: N802
         """Can be used as a shortcut to get a state rule dependant on current storage."""
         return State(storage=self, key=key)
 
 
-__all__ = ("ABCStateStorage", "StateData")
+__all__ = ("ABCStateStorage", "NO_STATE", "StateData")
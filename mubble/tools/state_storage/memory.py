@@ -1,25 +1,139 @@
+import asyncio
+import dataclasses
+import datetime
+import sys
+import threading
 import typing
 
-from fntypes.option import Option
+from fntypes.option import Option, Some
 
-from mubble.tools.functional import from_optional
-from mubble.tools.state_storage.abc import ABCStateStorage, StateData
+from mubble.tools.limited_dict import LimitedDict
+from mubble.tools.state_storage.abc import NO_STATE, ABCStateStorage, StateData
 
 type Payload = dict[str, typing.Any]
 
+DEFAULT_SHARDS: typing.Final[int] = 16
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MemoryStateStorageStats:
+    size: int
+    maxsize: int | None
+    shards: int
+    evictions: int
+    expirations: int
+    memory: int
+    """Approximate size of the stored states in bytes."""
+
+
+@dataclasses.dataclass(slots=True)
+class Shard:
+    states: LimitedDict[int, StateData[Payload]]
+    lock: threading.Lock = dataclasses.field(default_factory=threading.Lock)
+
 
 class MemoryStateStorage(ABCStateStorage[Payload]):
-    def __init__(self) -> None:
-        self.storage: dict[int, StateData[Payload]] = {}
+    """State storage in memory, unbounded by default. With `maxsize` the least recently used
+    state is evicted when the limit is reached. States can expire after `ttl`, expired states
+    are dropped on access or by `purge_expired()` (see `clear_state_storage_worker`).
+
+    States are split between shards by the user id, each shard has its own lock,
+    so the storage can be used from several threads. The former `storage` dict
+    is replaced by the shards, use `get`, `set` and `delete` instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int | None = None,
+        ttl: datetime.timedelta | float | None = None,
+        shards: int = DEFAULT_SHARDS,
+    ) -> None:
+        if shards < 1:
+            raise ValueError("Number of shards must be positive.")
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("Maxsize of the storage must be positive.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        shard_maxsize = sys.maxsize if maxsize is None else max(1, -(-maxsize // shards))
+        self.shards = tuple(Shard(LimitedDict(maxlimit=shard_maxsize, ttl=ttl)) for _ in range(shards))
+
+    def __repr__(self) -> str:
+        return "<{}: {} states, maxsize={}, ttl={}, shards={}>".format(
+            self.__class__.__name__,
+            len(self),
+            self.maxsize,
+            self.ttl,
+            len(self.shards),
+        )
+
+    def __len__(self) -> int:
+        """Number of states which are not expired."""
+        self.purge_expired()
+        return sum(len(shard.states.data) for shard in self.shards)
+
+    def _get_shard(self, user_id: int) -> Shard:
+        return self.shards[hash(user_id) % len(self.shards)]
 
     async def get(self, user_id: int) -> Option[StateData[Payload]]:
-        return from_optional(self.storage.get(user_id))
+        shard = self._get_shard(user_id)
+        with shard.lock:
+            if user_id not in shard.states.data:
+                return NO_STATE
+            if user_id not in shard.states:
+                self.expirations += 1
+                return NO_STATE
+            return Some(shard.states[user_id])
 
     async def set(self, user_id: int, key: str, payload: Payload) -> None:
-        self.storage[user_id] = StateData(key, payload)
+        shard = self._get_shard(user_id)
+        with shard.lock:
+            if shard.states.set(user_id, StateData(key, payload)) is not None:
+                self.evictions += 1
 
     async def delete(self, user_id: int) -> None:
-        self.storage.pop(user_id)
+        shard = self._get_shard(user_id)
+        with shard.lock:
+            shard.states.pop(user_id, None)
+
+    def purge_expired(self) -> int:
+        """Delete expired states, returns the number of deleted states."""
+        expired = 0
+        for shard in self.shards:
+            with shard.lock:
+                expired += shard.states.purge_expired()
+        self.expirations += expired
+        return expired
+
+    def stats(self) -> MemoryStateStorageStats:
+        """Stats of the storage, the memory is computed by walking all states."""
+        memory = 0
+        for shard in self.shards:
+            with shard.lock:
+                memory += sys.getsizeof(shard.states.data) + sys.getsizeof(shard.states._expires)
+                for state in shard.states.data.values():
+                    memory += sys.getsizeof(state) + sys.getsizeof(state.payload)
+
+        return MemoryStateStorageStats(
+            size=len(self),
+            maxsize=self.maxsize,
+            shards=len(self.shards),
+            evictions=self.evictions,
+            expirations=self.expirations,
+            memory=memory,
+        )
+
+
+async def clear_state_storage_worker(
+    storage: MemoryStateStorage,
+    interval_seconds: int = 60,
+) -> typing.NoReturn:
+    while True:
+        storage.purge_expired()
+        await asyncio.sleep(interval_seconds)
 
 
-__all__ = ("MemoryStateStorage",)
+__all__ = ("MemoryStateStorage", "MemoryStateStorageStats", "clear_state_storage_worker")
@@ -0,0 +1,217 @@
+import asyncio
+import datetime
+import enum
+import pathlib
+import sqlite3
+import threading
+import typing
+
+import msgspec
+from fntypes.option import Option, Some
+
+from mubble.modules import logger
+from mubble.tools.limited_dict import LimitedDict
+from mubble.tools.state_storage.abc import NO_STATE, ABCStateStorage, StateData
+
+type Payload = dict[str, typing.Any]
+
+SCHEMA: typing.Final[str] = """
+CREATE TABLE IF NOT EXISTS states (
+    user_id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+"""
+MAX_QUERY_PARAMS: typing.Final[int] = 500
+NOT_CACHED: typing.Final[typing.Any] = object()
+
+
+class SQLiteStateStorage(ABCStateStorage[Payload]):
+    """State storage in a SQLite file, queries are run in a thread.
+
+    Changes are written behind: `set` and `delete` are buffered and written in one
+    transaction every `flush_interval` seconds or when `flush_size` changes are buffered.
+    Buffered changes are lost if the process is killed, call `close()` on shutdown.
+    Reads are served from an LRU cache of `cache_size` states (users without a state are cached too).
+
+    Payloads are stored as JSON, enum keys are stored and read back as their values,
+    so use `StrEnum` for keys.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        *,
+        flush_interval: datetime.timedelta | float = 1.0,
+        flush_size: int = 1000,
+        cache_size: int = 10_000,
+    ) -> None:
+        self.path = path
+        self.flush_interval = (
+            flush_interval.total_seconds() if isinstance(flush_interval, datetime.timedelta) else flush_interval
+        )
+        self.flush_size = flush_size
+        self.cache: LimitedDict[int, StateData[Payload] | None] = LimitedDict(maxlimit=cache_size)
+        self._pending: dict[int, StateData[Payload] | None] = {}
+        self._flushing: dict[int, StateData[Payload] | None] = {}
+        self._generation = 0
+        """Number of changes made, fetched states are cached only if nothing was changed while reading."""
+        self._flush_lock = asyncio.Lock()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def __repr__(self) -> str:
+        return "<{}: path={!r}, {} pending changes>".format(
+            self.__class__.__name__,
+            str(self.path),
+            len(self._pending),
+        )
+
+    @staticmethod
+    def _load(row: tuple[str, bytes]) -> StateData[Payload]:
+        return StateData(row[0], msgspec.json.decode(row[1]))
+
+    @staticmethod
+    def _dump(user_id: int, state: StateData[Payload]) -> tuple[int, str, bytes]:
+        key = state.key.value if isinstance(state.key, enum.Enum) else state.key
+        return (user_id, str(key), msgspec.json.encode(state.payload))
+
+    def _select(self, user_ids: list[int]) -> list[tuple[int, str, bytes]]:
+        rows = []
+        with self._lock:
+            for i in range(0, len(user_ids), MAX_QUERY_PARAMS):
+                chunk = user_ids[i : i + MAX_QUERY_PARAMS]
+                rows += self._connection.execute(
+                    "SELECT user_id, key, payload FROM states WHERE user_id IN ({})".format(
+                        ", ".join("?" * len(chunk))
+                    ),
+                    chunk,
+                ).fetchall()
+        return rows
+
+    def _write(self, changes: dict[int, StateData[Payload] | None]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO states (user_id, key, payload) VALUES (?, ?, ?)",
+                    [self._dump(user_id, state) for user_id, state in changes.items() if state is not None],
+                )
+                self._connection.executemany(
+                    "DELETE FROM states WHERE user_id = ?",
+                    [(user_id,) for user_id, state in changes.items() if state is None],
+                )
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    async def _fetch(self, user_ids: list[int]) -> dict[int, StateData[Payload] | None]:
+        generation = self._generation
+        states: dict[int, StateData[Payload] | None] = dict.fromkeys(user_ids)
+        for user_id, *row in await asyncio.to_thread(self._select, user_ids):
+            states[user_id] = self._load(row)  # type: ignore
+
+        if generation == self._generation:
+            self.cache.update(states)
+            return states
+
+        # Changes were made (and could be written) while reading, so the rows can be older
+        # than the changes, which are cached by `_change`
+        for user_id in states:
+            if (state := self._lookup(user_id)) is not NOT_CACHED:
+                states[user_id] = state
+        return states
+
+    def _lookup(self, user_id: int) -> StateData[Payload] | None:
+        if user_id in self._pending:
+            return self._pending[user_id]
+        if user_id in self._flushing:
+            return self._flushing[user_id]
+        return self.cache.get(user_id, NOT_CACHED)
+
+    async def get(self, user_id: int) -> Option[StateData[Payload]]:
+        state = self._lookup(user_id)
+        if state is NOT_CACHED:
+            state = (await self._fetch([user_id]))[user_id]
+        return NO_STATE if state is None else Some(state)
+
+    async def get_many(self, user_ids: typing.Iterable[int], /) -> dict[int, StateData[Payload]]:
+        states: dict[int, StateData[Payload] | None] = {}
+        missing = []
+        for user_id in user_ids:
+            state = self._lookup(user_id)
+            if state is NOT_CACHED:
+                missing.append(user_id)
+            else:
+                states[user_id] = state
+
+        if missing:
+            states |= await self._fetch(missing)
+        return {user_id: state for user_id, state in states.items() if state is not None}
+
+    async def set(self, user_id: int, key: str | enum.Enum, payload: Payload) -> None:
+        self._change(user_id, StateData(key, payload))
+
+    async def delete(self, user_id: int) -> None:
+        self._change(user_id, None)
+
+    def _change(self, user_id: int, state: StateData[Payload] | None) -> None:
+        self._generation += 1
+        self._pending[user_id] = state
+        self.cache[user_id] = state
+        if len(self._pending) >= self.flush_size:
+            self._schedule_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_in_background())
+
+    async def _flush_in_background(self) -> None:
+        try:
+            await self.flush()
+        except Exception as exc:
+            logger.exception("Failed to write states to {!r}: {!r}", str(self.path), exc)
+
+        # Changes made while writing or not written because of an error
+        if self._pending and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._schedule_flush)
+
+    async def flush(self) -> None:
+        """Write the buffered changes."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+
+            changes = self._flushing = self._pending
+            self._pending = {}
+            try:
+                await asyncio.to_thread(self._write, changes)
+            except BaseException:
+                # Keep the changes made since, they are newer
+                self._pending = changes | self._pending
+                raise
+            finally:
+                self._flushing = {}
+
+    async def close(self) -> None:
+        """Write the buffered changes and close the database."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await self.flush()
+        with self._lock:
+            self._connection.close()
+
+
+__all__ = ("SQLiteStateStorage",)
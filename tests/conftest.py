@@ -0,0 +1,4 @@
+from fntypes.result.log_factory import RESULT_ERROR_LOGGER
+
+# Tracebacks of errors are formatted for every empty option of decoded models, which is slow
+RESULT_ERROR_LOGGER.set_traceback_formatter(lambda: "")
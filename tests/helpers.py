@@ -0,0 +1,95 @@
+import typing
+
+from fntypes.result import Ok
+
+from mubble.api.api import API, Token
+from mubble.msgspec_utils import decoder
+from mubble.types.objects import Update
+
+USER: typing.Final[dict[str, typing.Any]] = {"is_bot": False, "first_name": "User"}
+
+
+class RecordingAPI(API):
+    """API which records calls of the methods instead of sending requests."""
+
+    def __init__(self) -> None:
+        super().__init__(Token("123:ABC"))
+        self.calls: list[tuple[str, dict[str, typing.Any]]] = []
+
+    async def answer_inline_query(self, **params: typing.Any) -> Ok[bool]:  # type: ignore[override]
+        self.calls.append(("answer_inline_query", params))
+        return Ok(True)
+
+
+def make_message_update(
+    text: str,
+    *,
+    user_id: int = 1,
+    chat_id: int | None = None,
+    chat_type: str = "private",
+    update_id: int = 1,
+) -> Update:
+    return decoder.convert(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": 1,
+                "date": 0,
+                "text": text,
+                "chat": {"id": user_id if chat_id is None else chat_id, "type": chat_type},
+                "from": {"id": user_id, **USER},
+            },
+        },
+        type=Update,
+    )
+
+
+def make_callback_query_update(data: str, *, user_id: int = 1, update_id: int = 1) -> Update:
+    return decoder.convert(
+        {
+            "update_id": update_id,
+            "callback_query": {
+                "id": "1",
+                "chat_instance": "1",
+                "data": data,
+                "from": {"id": user_id, **USER},
+                "message": {"message_id": 1, "date": 0, "chat": {"id": user_id, "type": "private"}},
+            },
+        },
+        type=Update,
+    )
+
+
+def make_inline_query_update(query: str, *, user_id: int = 1, update_id: int = 1) -> Update:
+    return decoder.convert(
+        {
+            "update_id": update_id,
+            "inline_query": {"id": str(update_id), "from": {"id": user_id, **USER}, "query": query, "offset": ""},
+        },
+        type=Update,
+    )
+
+
+def make_pre_checkout_query_update(payload: str, *, user_id: int = 1, update_id: int = 1) -> Update:
+    return decoder.convert(
+        {
+            "update_id": update_id,
+            "pre_checkout_query": {
+                "id": "1",
+                "from": {"id": user_id, **USER},
+                "currency": "XTR",
+                "total_amount": 1,
+                "invoice_payload": payload,
+            },
+        },
+        type=Update,
+    )
+
+
+__all__ = (
+    "RecordingAPI",
+    "make_callback_query_update",
+    "make_inline_query_update",
+    "make_message_update",
+    "make_pre_checkout_query_update",
+)
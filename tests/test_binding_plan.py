@@ -0,0 +1,46 @@
+import typing
+
+from mubble.bot.dispatch.context import Context
+from mubble.tools.magic import get_binding_plan, magic_bundle
+
+
+class Event:
+    pass
+
+
+async def handler(event: Event, user_id: int, name: str = "anonymous", *, limit: int = 10) -> None:
+    pass
+
+
+async def var_kwargs_handler(event: Event, **kwargs: typing.Any) -> None:
+    pass
+
+
+CONTEXT = Context(user_id=1, unused=2, limit=3)
+
+
+def test_binds_same_arguments_as_magic_bundle() -> None:
+    for function in (handler, var_kwargs_handler):
+        assert get_binding_plan(function).bind(CONTEXT) == magic_bundle(function, CONTEXT)
+
+
+def test_binds_parameters_and_defaults() -> None:
+    assert get_binding_plan(handler).bind(CONTEXT) == {"user_id": 1, "name": "anonymous", "limit": 10}
+    assert get_binding_plan(handler, start_idx=0).bind({"event": None}) == {
+        "event": None,
+        "name": "anonymous",
+        "limit": 10,
+    }
+
+
+def test_plan_is_compiled_once_per_function() -> None:
+    assert get_binding_plan(handler) is get_binding_plan(handler)
+    assert get_binding_plan(handler) is not get_binding_plan(handler, start_idx=0)
+
+
+def test_event_param_is_found_by_annotation() -> None:
+    plan = get_binding_plan(handler)
+
+    assert plan.get_event_param(Event) == "event"
+    assert plan.get_event_param(int) == "user_id"
+    assert plan.get_event_param(bytes) is None
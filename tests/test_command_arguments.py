@@ -0,0 +1,81 @@
+import itertools
+import time
+import typing
+
+from mubble.bot.rules.command import Argument, Command
+
+
+def to_int(s: str) -> int | None:
+    return int(s) if s.isdigit() else None
+
+
+def word(s: str) -> str | None:
+    return s if " " not in s else None
+
+
+class RecursiveCommand(Command):
+    """Non-lazy parsing by the recursive search over every split, as `Command` parsed before `ArgumentsParser`."""
+
+    def parse_arguments(self, arguments: list[Argument], s: str) -> dict[str, typing.Any] | None:
+        if not arguments:
+            return {} if not s else None
+
+        all_split = s.split(self.separator)
+        for i in range(1, len(all_split) + 1):
+            result = self.parse_argument(
+                arguments,
+                self.separator.join(all_split[:i]),
+                self.separator.join(all_split[i:]),
+                s,
+            )
+            if result is not None:
+                return result
+        return None
+
+
+ARGUMENT_LISTS = [
+    [Argument("a")],
+    [Argument("a", [word]), Argument("b")],
+    [Argument("n", [to_int]), Argument("rest")],
+    [Argument("a"), Argument("n", [to_int], optional=True)],
+    [Argument("a", [word], optional=True), Argument("n", [to_int]), Argument("b", [word], optional=True)],
+    [Argument("a"), Argument("b", optional=True), Argument("c", optional=True), Argument("n", [to_int])],
+]
+STRINGS = ["", "x", "1", "x 1", "1 x", "x y 1", "1 2 3", "x  y", " 1", "1 ", "a b c d 7", "7 a b", "x y z"]
+
+
+def test_results_match_the_recursive_search() -> None:
+    for arguments, s in itertools.product(ARGUMENT_LISTS, STRINGS):
+        assert Command("cmd").parse_arguments(arguments, s) == RecursiveCommand("cmd").parse_arguments(
+            arguments, s
+        ), ([argument.name for argument in arguments], s)
+
+
+def test_long_arguments_are_split_completely_by_default() -> None:
+    arguments = [Argument("words", [word], optional=True), Argument("text")]
+    s = " ".join(["w"] * 100)
+
+    assert Command("cmd").parse_arguments(arguments, s) == {"words": "w", "text": " ".join(["w"] * 99)}
+    assert Command("cmd").parse_arguments([Argument("text"), Argument("n", [to_int])], s + " 5") == {
+        "text": s,
+        "n": 5,
+    }
+
+
+def test_max_tokens_keeps_the_rest_as_one_token() -> None:
+    arguments = [Argument("text"), Argument("n", [to_int])]
+    s = " ".join(["w"] * 100) + " 5"
+
+    assert Command("cmd", max_tokens=10).parse_arguments(arguments, s) is None
+    assert Command("cmd", max_tokens=10).parse_arguments([Argument("a", [word]), Argument("rest")], s) == {
+        "a": "w",
+        "rest": s[2:],
+    }
+
+
+def test_unsatisfiable_arguments_are_rejected_quickly() -> None:
+    arguments = [Argument("a"), *(Argument(f"o{i}", optional=True) for i in range(4)), Argument("n", [to_int])]
+
+    start = time.perf_counter()
+    assert Command("cmd").parse_arguments(arguments, " ".join(["w"] * 100)) is None
+    assert time.perf_counter() - start < 1.0
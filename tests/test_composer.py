@@ -0,0 +1,95 @@
+import asyncio
+import time
+import typing
+
+from fntypes.result import Error, Ok
+
+from mubble.bot.dispatch.context import Context
+from mubble.node.base import ComposeError, Node
+from mubble.node.composer import compose_nodes, get_compose_plan
+from mubble.node.scope import per_call
+
+COMPOSED: list[str] = []
+CLOSED: list[str] = []
+
+
+class Root(Node):
+    @classmethod
+    def compose(cls) -> int:
+        COMPOSED.append("root")
+        return 1
+
+
+class Left(Node):
+    @classmethod
+    async def compose(cls, root: Root) -> int:
+        await asyncio.sleep(0.1)
+        return root + 1
+
+
+class Right(Node):
+    @classmethod
+    async def compose(cls, root: Root) -> int:
+        await asyncio.sleep(0.1)
+        return root + 2
+
+
+class Sum(Node):
+    @classmethod
+    def compose(cls, left: Left, right: Right) -> int:
+        return left + right
+
+
+@per_call
+class Resource(Node):
+    @classmethod
+    async def compose(cls) -> typing.AsyncGenerator[str, None]:
+        yield "resource"
+        CLOSED.append("resource")
+
+
+class Failing(Node):
+    @classmethod
+    def compose(cls, resource: Resource) -> int:
+        raise ComposeError("failed")
+
+
+def test_plan_is_cached_and_levelled() -> None:
+    plan = get_compose_plan({"total": Sum})
+
+    assert plan is get_compose_plan({"total": Sum})
+    assert [{step.node for step in level} for level in plan.levels] == [{Root}, {Left, Right}, {Sum}]
+
+
+async def test_diamond_shares_subnode_and_composes_async_nodes_concurrently() -> None:
+    COMPOSED.clear()
+    ctx = Context()
+
+    started = time.perf_counter()
+    result = await compose_nodes({"total": Sum, "left": Left}, ctx)
+    elapsed = time.perf_counter() - started
+
+    assert isinstance(result, Ok)
+    assert result.value.values == {"total": 5, "left": 2}
+    assert COMPOSED == ["root"]
+    assert elapsed < 0.18
+
+
+async def test_per_event_values_are_reused_within_the_event() -> None:
+    COMPOSED.clear()
+    ctx = Context()
+
+    await compose_nodes({"root": Root}, ctx)
+    await compose_nodes({"root": Root}, ctx)
+    await compose_nodes({"root": Root}, Context())
+
+    assert COMPOSED == ["root", "root"]
+
+
+async def test_failure_closes_per_call_sessions() -> None:
+    CLOSED.clear()
+
+    result = await compose_nodes({"value": Failing}, Context())
+
+    assert isinstance(result, Error)
+    assert CLOSED == ["resource"]
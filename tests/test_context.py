@@ -0,0 +1,139 @@
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.rules.abc import ABCRule
+from mubble.bot.rules.markup import Markup
+from mubble.bot.rules.text import HasText, Text
+from mubble.tools.magic import HashedKey
+from tests.helpers import RecordingAPI, make_message_update
+
+
+def test_rollback_undoes_changes_since_branch() -> None:
+    ctx = Context(kept=1)
+    branch = ctx.branch()
+    ctx["kept"] = 2
+    ctx["added"] = 3
+    del ctx["kept"]
+
+    ctx.rollback(branch)
+    assert (ctx["kept"], "added" in ctx) == (1, False)
+
+
+def test_outer_rollback_undoes_committed_nested_branches() -> None:
+    ctx = Context()
+    outer = ctx.branch()
+    inner = ctx.branch()
+    ctx["name"] = "bob"
+    ctx.commit(inner)
+    assert ctx["name"] == "bob"
+
+    ctx.rollback(outer)
+    assert "name" not in ctx
+
+
+def test_nested_branches_without_changes_between_them() -> None:
+    ctx = Context()
+    outer = ctx.branch()
+    inner = ctx.branch()
+    innermost = ctx.branch()
+    ctx.update(name="bob")
+    assert ctx.get_changes(inner) == ({"name": "bob"}, ())
+
+    ctx.commit(innermost)
+    ctx.commit(inner)
+    ctx.rollback(outer)
+    assert "name" not in ctx
+
+
+def test_closing_outer_branch_closes_nested_branches() -> None:
+    ctx = Context()
+    outer = ctx.branch()
+    inner = ctx.branch()
+    ctx["name"] = "bob"
+
+    ctx.commit(outer)
+    ctx.rollback(inner)
+    assert ctx["name"] == "bob"
+
+    branch = ctx.branch()
+    ctx.pop("name")
+    ctx.rollback(branch)
+    assert ctx["name"] == "bob"
+
+
+async def test_context_of_non_final_handler_does_not_leak() -> None:
+    view, received = Dispatch().message, []
+
+    @view(Markup("hi <name>"), final=False)
+    async def greeting(name: str) -> None:
+        received.append(("greeting", name))
+
+    @view(HasText())
+    async def fallback(name: str = "<none>") -> None:
+        received.append(("fallback", name))
+
+    update = make_message_update("hi bob")
+    await view.process(update, RecordingAPI(), Context(raw_update=update))
+    assert received == [("greeting", "bob"), ("fallback", "<none>")]
+
+
+class Greeting(ABCRule, pure=True):
+    checks = 0
+
+    def check(self, ctx: Context) -> bool:
+        Greeting.checks += 1
+        ctx["greeting"] = "hello"
+        return True
+
+
+async def test_memoized_pure_rule_replays_context_changes() -> None:
+    view, received = Dispatch().message, []
+
+    @view(Greeting() & HasText(), final=False)
+    async def first(greeting: str) -> None:
+        received.append(greeting)
+
+    @view(Greeting())
+    async def second(greeting: str) -> None:
+        received.append(greeting)
+
+    update = make_message_update("text")
+    await view.process(update, RecordingAPI(), Context(raw_update=update))
+    assert received == ["hello", "hello"]
+    assert Greeting.checks == 1
+
+
+class Word(ABCRule, pure=True):
+    def __init__(self, words: list[str] | tuple[str, ...], mode: str = "any") -> None:
+        self.words = words
+        self.mode = mode
+
+    def check(self) -> bool:
+        return True
+
+
+def test_memo_key_freezes_immutable_attributes_by_value() -> None:
+    assert Word(("a", "b")).memo_key == Word(("a", "b")).memo_key
+    assert Word(("a", "b")).memo_key != Word(("a", "b"), "all").memo_key
+    assert Word(("a", "b")).memo_key != Word(("a", "c")).memo_key
+    assert isinstance(Word(("a",)).memo_key, HashedKey)
+
+
+def test_memo_key_keys_mutable_containers_by_identity() -> None:
+    words = ["a", "b"]
+    rule = Word(words)
+    key = rule.memo_key
+
+    assert key == Word(words).memo_key
+    assert key != Word(["a", "b"]).memo_key
+
+    words.append("c")
+    assert rule.memo_key == key
+    assert key != Word(["a", "b", "c"]).memo_key
+
+
+def test_memo_key_of_large_attributes_is_hashed_once() -> None:
+    rule = Text([str(i) for i in range(100_000)])
+    key = rule.memo_key
+
+    assert key.value[1] == (("ignore_case", (bool, False)), ("texts", (list, id(rule.texts))))  # type: ignore
+    assert hash(key) == key.hash  # type: ignore
@@ -0,0 +1,46 @@
+from mubble.api.api import API
+from mubble.bot.dispatch.context import Context
+from mubble.node.composer import CONTEXT_STORE_NODES_KEY, compose_nodes
+from mubble.node.text import TextLiteral
+from mubble.tools.magic import freeze_value
+from mubble.types.objects import Update
+from tests.helpers import RecordingAPI, make_message_update
+
+
+def test_equal_parameters_share_the_node() -> None:
+    assert TextLiteral["yes", "no"] is TextLiteral["yes", "no"]
+    assert TextLiteral["yes"] is not TextLiteral["no"]
+
+
+def test_parameters_of_different_types_do_not_share_the_node() -> None:
+    assert TextLiteral[1] is not TextLiteral[True]
+    assert TextLiteral[1] is not TextLiteral[1.0]
+    assert TextLiteral[1].texts == (1,)
+    assert TextLiteral[True].texts == (True,)
+
+
+class Unhashable:
+    __hash__ = None  # type: ignore
+
+
+def test_unhashable_parameters_are_not_interned() -> None:
+    assert TextLiteral[["yes"]] is TextLiteral[["yes"]]
+
+    value = Unhashable()
+    assert TextLiteral[value] is not TextLiteral[value]
+
+
+def test_freeze_value_keeps_types() -> None:
+    assert freeze_value({"a": [1, {2}]}) == freeze_value({"a": [1, {2}]})
+    assert freeze_value([1]) != freeze_value((1,))
+    assert freeze_value({"a": 1}) != freeze_value({"a": True})
+
+
+async def test_interned_nodes_share_per_event_values() -> None:
+    update = make_message_update("yes")
+    ctx = Context(raw_update=update)
+    data = {Update: update, API: RecordingAPI()}
+
+    assert (await compose_nodes({"a": TextLiteral["yes"]}, ctx, data)).unwrap().values == {"a": "yes"}
+    session = ctx[CONTEXT_STORE_NODES_KEY][TextLiteral["yes"]]
+    assert (await compose_nodes({"b": TextLiteral["yes"]}, ctx, data)).unwrap().sessions["b"] is session
@@ -0,0 +1,60 @@
+import difflib
+import random
+
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.rules.fuzzy import FuzzyText
+from mubble.tools.fuzzy_index import FuzzyIndex
+from tests.helpers import RecordingAPI, make_message_update
+
+PHRASES = ["hello", "help", "hello world", "good morning", "goodbye", "yes", "no", "cancel", "", "ёлка"]
+
+
+def linear_ratio(texts: list[str], text: str) -> float:
+    return max(difflib.SequenceMatcher(a=text, b=indexed_text).ratio() for indexed_text in texts)
+
+
+def test_best_ratio_equals_the_linear_scan() -> None:
+    rng = random.Random(0)
+    texts = [*PHRASES, *("".join(rng.choices("abcdelo ё", k=rng.randint(0, 12))) for _ in range(200))]
+    index = FuzzyIndex(texts)
+    queries = [
+        *PHRASES,
+        "helo",
+        "good bye",
+        "cancle",
+        *("".join(rng.choices("abcdelo ", k=rng.randint(0, 12))) for _ in range(200)),
+    ]
+
+    for query in queries:
+        expected = linear_ratio(texts, query)
+        for min_ratio in (0.0, 0.5, 0.7, expected, 1.0):
+            match = index.match(query, min_ratio)
+            if expected < min_ratio:
+                assert match is None, (query, min_ratio)
+            else:
+                assert match is not None, (query, min_ratio)
+                assert match.ratio == expected
+                assert difflib.SequenceMatcher(a=query, b=match.text).ratio() == expected
+
+
+def test_duplicates_are_indexed_once() -> None:
+    index = FuzzyIndex(["yes", "no", "yes"])
+
+    assert len(index) == 2
+    assert index.match("yes").text == "yes"  # type: ignore
+    assert FuzzyIndex([]).match("yes") is None
+
+
+async def test_fuzzy_text_sets_the_ratio() -> None:
+    view, ratios = Dispatch().message, []
+
+    @view(FuzzyText(["hello", "good morning"]))
+    async def greet(fuzzy_ratio: float) -> None:
+        ratios.append(fuzzy_ratio)
+
+    for text in ("helo", "good mornin", "bye"):
+        update = make_message_update(text)
+        await view.process(update, RecordingAPI(), Context(raw_update=update))
+
+    assert ratios == [linear_ratio(["hello"], "helo"), linear_ratio(["good morning"], "good mornin")]
@@ -0,0 +1,80 @@
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import HandlerIndex, Trigger, TriggerKind
+from mubble.bot.rules.command import Command
+from mubble.bot.rules.payload import PayloadEqRule
+from mubble.bot.rules.text import HasText, Text
+from tests.helpers import make_callback_query_update, make_message_update
+
+
+async def select(index: HandlerIndex, update) -> list:
+    return await index.select(update, Context(raw_update=update))
+
+
+def names(handlers) -> list[str]:
+    return [handler.function.__name__ for handler in handlers]
+
+
+def make_handler(view, name: str, *rules):
+    async def function() -> None:
+        pass
+
+    function.__name__ = name
+    return view(*rules)(function)
+
+
+async def test_selects_handlers_by_trigger_in_registration_order() -> None:
+    view = Dispatch().message
+    make_handler(view, "start", Command("start"))
+    make_handler(view, "any_text", HasText())
+    make_handler(view, "help", Command(["help", "h"]))
+    make_handler(view, "hello", Text("Hello", ignore_case=True))
+    make_handler(view, "start_or_help", Command("start") | Command("help"))
+
+    index = view.handler_index
+    assert index is not None
+    assert names(await select(index, make_message_update("/start now"))) == ["start", "any_text", "start_or_help"]
+    assert names(await select(index, make_message_update("/h"))) == ["any_text", "help"]
+    assert names(await select(index, make_message_update("HELLO"))) == ["any_text", "hello"]
+    assert names(await select(index, make_message_update("bye"))) == ["any_text"]
+
+
+async def test_selects_payload_handlers() -> None:
+    view = Dispatch().callback_query
+    make_handler(view, "ping", PayloadEqRule("ping"))
+    make_handler(view, "pong", PayloadEqRule(["pong", "pang"]))
+
+    index = view.handler_index
+    assert index is not None
+    assert names(await select(index, make_callback_query_update("pang"))) == ["pong"]
+    assert names(await select(index, make_callback_query_update("other"))) == []
+
+
+def test_index_is_rebuilt_when_handlers_change() -> None:
+    view = Dispatch().message
+    for name in ("first", "second", "third"):
+        make_handler(view, name, Command(name))
+
+    index = view.handler_index
+    assert view.handler_index is index
+
+    view.handlers[1] = make_handler(Dispatch().message, "replaced", Command("replaced"))
+    assert view.handler_index is not index
+
+
+def test_command_names_can_be_an_iterator() -> None:
+    command = Command(name for name in ("start", "help"))
+
+    assert command.names == ["start", "help"]
+    assert command.get_trigger() == Trigger(TriggerKind.COMMAND, frozenset({"/start", "/help"}))
+    assert command.get_trigger() == command.get_trigger()
+
+
+def test_triggers_merge_only_of_the_same_kind() -> None:
+    text = Trigger(TriggerKind.TEXT, frozenset({"a"}))
+
+    assert text.merge(Trigger(TriggerKind.TEXT, frozenset({"b"}))) == Trigger(
+        TriggerKind.TEXT, frozenset({"a", "b"})
+    )
+    assert text.merge(Trigger(TriggerKind.COMMAND, frozenset({"/a"}))) is None
+    assert text.merge(Trigger(TriggerKind.TEXT, frozenset({"b"}), prefix=True)) is None
@@ -0,0 +1,104 @@
+import typing
+
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.rules.command import Command
+from mubble.bot.rules.text import Text
+from mubble.tools.i18n.abc import ABCI18n, ABCTranslator, I18nEnum
+from tests.helpers import RecordingAPI, make_message_update
+
+CATALOGS = {
+    "en": {},
+    "ru": {"hello": "привет", "bye": "пока"},
+}
+
+
+class DictTranslator(ABCTranslator):
+    def __init__(self, locale: str, catalog: dict[str, str]) -> None:
+        self.catalog = catalog
+        super().__init__(locale)
+
+    def get(self, __key: str, *args: typing.Any, **kwargs: typing.Any) -> str:
+        return self.catalog.get(__key, __key)
+
+
+class DictI18n(ABCI18n):
+    def get_locales(self) -> tuple[str, ...]:
+        return tuple(CATALOGS)
+
+    def get_translator_by_locale(self, locale: str) -> DictTranslator:
+        return DictTranslator(locale, CATALOGS.get(locale, CATALOGS["en"]))
+
+
+def make_dispatch(handled: list[str]) -> Dispatch:
+    dispatch = Dispatch()
+
+    @dispatch.message(Text("hello"))
+    async def hello() -> None:
+        handled.append("hello")
+
+    @dispatch.message(Text("bye"))
+    async def bye() -> None:
+        handled.append("bye")
+
+    @dispatch.message(Command("start"))
+    async def start() -> None:
+        handled.append("start")
+
+    return dispatch
+
+
+def make_context(text: str, locale: str) -> tuple[typing.Any, Context]:
+    update = make_message_update(text)
+    ctx = Context(raw_update=update)
+    ctx[I18nEnum.I18N] = DictI18n().get_translator_by_locale(locale)
+    return update, ctx
+
+
+async def select(dispatch: Dispatch, text: str, locale: str) -> list[str]:
+    update, ctx = make_context(text, locale)
+    return [handler.function.__name__ for handler in await dispatch.message.handler_index.select(update, ctx)]  # type: ignore
+
+
+async def test_tables_are_built_only_for_warmed_up_locales() -> None:
+    handled: list[str] = []
+    dispatch = make_dispatch(handled)
+    await dispatch.warm_up_translations(DictI18n())
+
+    assert await select(dispatch, "привет", "ru") == ["hello"]
+    assert await select(dispatch, "hello", "en") == ["hello"]
+    assert await select(dispatch, "/start", "ru") == ["start"]
+
+    for number in range(100):
+        update, ctx = make_context("hello", f"x{number}")
+        await dispatch.message.process(update, RecordingAPI(), ctx)
+
+    assert set(dispatch.message.handler_index._locale_tables) == {"en", "ru"}  # type: ignore
+    assert handled == ["hello"] * 100
+
+
+async def test_other_locales_let_translatable_rules_decide() -> None:
+    handled: list[str] = []
+    dispatch = make_dispatch(handled)
+
+    assert await select(dispatch, "привет", "ru") == ["hello", "bye"]
+    assert await select(dispatch, "/start", "de") == ["hello", "bye", "start"]
+
+    for text in ("привет", "hello", "пока"):
+        update, ctx = make_context(text, "ru")
+        await dispatch.message.process(update, RecordingAPI(), ctx)
+    assert handled == ["hello", "bye"]
+    assert not dispatch.message.handler_index._locale_tables  # type: ignore
+
+
+async def test_warm_up_survives_rebuilding_the_index() -> None:
+    handled: list[str] = []
+    dispatch = make_dispatch(handled)
+    await dispatch.warm_up_translations(DictI18n())
+
+    @dispatch.message(Text("thanks"))
+    async def thanks() -> None:
+        handled.append("thanks")
+
+    assert await select(dispatch, "пока", "ru") == ["bye"]
+    assert await select(dispatch, "thanks", "ru") == ["thanks"]
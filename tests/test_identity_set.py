@@ -0,0 +1,95 @@
+import os
+import pathlib
+import time
+
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.rules.is_from import IsChatId, IsLanguageCode, IsUserId
+from mubble.tools.identity_set import IdentitySet, SortedIdentities
+from tests.helpers import RecordingAPI, make_message_update
+
+
+async def count_handled(rule: IsUserId | IsChatId, user_ids: list[int]) -> list[int]:
+    view, handled = Dispatch().message, []
+
+    @view(rule)
+    async def handler() -> None:
+        handled.append(True)
+
+    result = []
+    for user_id in user_ids:
+        update = make_message_update("hi", user_id=user_id)
+        await view.process(update, RecordingAPI(), Context(raw_update=update))
+        result.append(len(handled))
+    return result
+
+
+async def test_lists_changed_at_runtime_are_seen_by_rules() -> None:
+    admins = [1]
+    rule = IsUserId(admins)
+    assert await count_handled(rule, [1, 2]) == [1, 1]
+
+    admins.append(2)
+    admins.remove(1)
+    assert await count_handled(rule, [1, 2]) == [0, 1]
+
+
+def test_rules_with_lists_are_memoized_by_the_list() -> None:
+    ids = [1, 2]
+    rule = IsUserId(ids)
+    key = rule.memo_key
+    ids.append(3)
+
+    assert key == IsUserId(ids).memo_key
+    assert key != IsUserId([1, 2]).memo_key
+    assert key != IsUserId([1, 2, 3]).memo_key
+    assert IsLanguageCode("en").memo_key == IsLanguageCode("en").memo_key
+
+    started = time.perf_counter()
+    large = IsUserId(list(range(1_000_000)))
+    for _ in range(1000):
+        hash(large.memo_key)
+    assert time.perf_counter() - started < 0.5
+
+
+async def test_users_without_language_code_do_not_match() -> None:
+    view, handled = Dispatch().message, []
+
+    @view(IsLanguageCode(["en", "de"]))
+    async def handler() -> None:
+        handled.append(True)
+
+    update = make_message_update("hi")
+    await view.process(update, RecordingAPI(), Context(raw_update=update))
+    assert handled == []
+
+
+async def test_single_identities_and_iterables() -> None:
+    assert await count_handled(IsUserId(2), [1, 2]) == [0, 1]
+    assert await count_handled(IsUserId(user_id for user_id in (2, 3)), [1, 2, 3]) == [0, 1, 2]
+    assert await count_handled(IsChatId(IdentitySet([2])), [1, 2]) == [0, 1]
+
+
+def test_large_sets_of_integers_are_sorted_arrays() -> None:
+    identity_set = IdentitySet(range(0, 2000, 2), array_threshold=100)
+
+    assert isinstance(identity_set.members, SortedIdentities)
+    assert len(identity_set) == 1000
+    assert all(identity in identity_set for identity in range(0, 2000, 2))
+    assert not any(identity in identity_set for identity in (-1, 1, 1999, 2000, "2"))
+    assert isinstance(IdentitySet(map(str, range(200)), array_threshold=100).members, frozenset)
+
+
+async def test_identity_set_is_reloaded_when_the_file_changes(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "admins.txt"
+    path.write_text("# admins\n1\n\n2\n")
+    identity_set = IdentitySet.from_file(path)
+    rule = IsUserId(identity_set)
+
+    assert sorted(identity_set) == [1, 2]
+    assert not await identity_set.reload()
+
+    path.write_text("3\n")
+    os.utime(path, ns=(0, 1))
+    assert await identity_set.reload()
+    assert await count_handled(rule, [1, 3]) == [0, 1]
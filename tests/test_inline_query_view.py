@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from mubble.bot.cute_types.inline_query import InlineQueryCute
+from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.middleware.abc import ABCMiddleware
+from mubble.bot.dispatch.view.inline_query import InlineQueryView
+from mubble.tools.inline_cache import InlineQueryCache
+from tests.helpers import RecordingAPI, make_inline_query_update
+
+BANNED_USER_ID = 666
+
+
+class BanMiddleware(ABCMiddleware[InlineQueryCute]):
+    async def pre(self, event: InlineQueryCute, ctx: Context) -> bool:
+        return event.from_user.id != BANNED_USER_ID
+
+
+async def process(view: InlineQueryView, api: RecordingAPI, query: str, *, user_id: int = 1) -> bool:
+    update = make_inline_query_update(query, user_id=user_id)
+    return await view.process(update, api, Context(raw_update=update))
+
+
+async def test_repeated_query_is_answered_from_cache() -> None:
+    api, view, handled = RecordingAPI(), InlineQueryView(cache=InlineQueryCache()), []
+
+    @view()
+    async def handler(query: InlineQueryCute) -> None:
+        handled.append(query.query)
+        await query.answer([], cache_time=5)
+
+    assert await process(view, api, "cats")
+    assert await process(view, api, "cats", user_id=2)
+    assert handled == ["cats"]
+    assert [params["cache_time"] for _, params in api.calls] == [5, 5]
+
+
+async def test_middlewares_run_before_cached_answer() -> None:
+    api, view, handled = RecordingAPI(), InlineQueryView(cache=InlineQueryCache()), []
+    view.middlewares.append(BanMiddleware())
+
+    @view()
+    async def handler(query: InlineQueryCute) -> None:
+        handled.append(query.query)
+        await query.answer([])
+
+    assert await process(view, api, "cats")
+    assert not await process(view, api, "cats", user_id=BANNED_USER_ID)
+    assert len(api.calls) == 1
+
+
+async def test_stale_query_is_cancelled_and_counted_as_handled() -> None:
+    api, view = RecordingAPI(), InlineQueryView(cancel_stale=True)
+    started, cancelled = asyncio.Event(), []
+
+    @view()
+    async def handler(query: InlineQueryCute) -> None:
+        if query.query == "ca":
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(query.query)
+                raise
+        await query.answer([])
+
+    stale = asyncio.create_task(process(view, api, "ca"))
+    await started.wait()
+    assert await process(view, api, "cats")
+    assert await stale
+    assert cancelled == ["ca"]
+    assert len(api.calls) == 1
+
+
+async def test_cancelling_processing_cancels_handling() -> None:
+    api, view = RecordingAPI(), InlineQueryView(cancel_stale=True)
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    @view()
+    async def handler(query: InlineQueryCute) -> None:
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    task = asyncio.create_task(process(view, api, "cats"))
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cancelled.is_set()
+    assert not view._in_flight
+
+
+def test_cache_scopes_personal_answers_and_evicts() -> None:
+    cache = InlineQueryCache(maxsize=2)
+    query = make_inline_query_update("cats", user_id=1).inline_query.unwrap()
+    other_user_query = make_inline_query_update("cats", user_id=2).inline_query.unwrap()
+
+    cache.set(query, {"results": [], "is_personal": True})
+    assert cache.get(query) == {"results": [], "is_personal": True}
+    assert cache.get(other_user_query) is None
+
+    cache.set(make_inline_query_update("dogs").inline_query.unwrap(), {"results": []})
+    cache.set(make_inline_query_update("birds").inline_query.unwrap(), {"results": []})
+    assert len(cache) == 2
+    assert cache.get(query) is None
+
+    cache.invalidate("dogs")
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_expires_answers() -> None:
+    cache = InlineQueryCache(ttl=0)
+    query = make_inline_query_update("cats").inline_query.unwrap()
+
+    cache.set(query, {"results": []})
+    assert cache.get(query) is None
+    assert not len(cache)
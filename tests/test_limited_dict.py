@@ -0,0 +1,59 @@
+import time
+
+from mubble.tools.limited_dict import LimitedDict
+
+
+def test_least_recently_used_item_is_evicted() -> None:
+    items = LimitedDict[str, int](maxlimit=2)
+    items["a"] = 1
+    items["b"] = 2
+    assert items["a"] == 1
+
+    assert items.set("c", 3) == 2
+    assert list(items) == ["a", "c"]
+
+    del items["a"]
+    assert len(items) == 1
+    assert "a" not in items
+
+
+def test_expired_items_are_missing_and_not_counted() -> None:
+    items = LimitedDict[str, int](maxlimit=10)
+    items.set("short", 1, ttl=0.01)
+    items["long"] = 2
+    assert len(items) == 2
+
+    time.sleep(0.02)
+    assert len(items) == 1
+    assert "short" not in items
+    assert list(items) == ["long"]
+    assert items.get("short") is None
+
+
+def test_expired_items_are_evicted_before_live_items() -> None:
+    items = LimitedDict[str, int](maxlimit=2)
+    items["live"] = 1
+    items.set("expiring", 2, ttl=0.01)
+
+    time.sleep(0.02)
+    assert items.set("new", 3) is None
+    assert list(items) == ["live", "new"]
+
+
+def test_reset_item_keeps_its_new_expiration() -> None:
+    items = LimitedDict[str, int](maxlimit=2, ttl=0.01)
+    items["a"] = 1
+    items.set("a", 2, ttl=60)
+
+    time.sleep(0.02)
+    assert items.purge_expired() == 0
+    assert items["a"] == 2
+
+
+def test_expiry_heap_is_compacted() -> None:
+    items = LimitedDict[int, int](maxlimit=10, ttl=60)
+    for i in range(1000):
+        items[i % 5] = i
+
+    assert len(items) == 5
+    assert len(items._expiry_heap) <= 2 * 5 + 65
@@ -0,0 +1,85 @@
+import vbml
+
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import Trigger, TriggerKind
+from mubble.bot.rules.markup import Markup, PatternLiterals, check_string, get_pattern_literals, global_ctx
+from tests.helpers import RecordingAPI, make_message_update
+
+PATTERNS = [
+    "/start <arg>",
+    "/start",
+    "buy <count:int> items",
+    "price: <amount>$",
+    "a.b*c <x> (done)",
+    "<greeting>, bob",
+    "<everything>",
+]
+TEXTS = [
+    "/start",
+    "/start\n",
+    "/start now",
+    "/start now\n",
+    "buy 5 items",
+    "buy five items",
+    "buy 5 items\n",
+    "price: 10$",
+    "price: 10",
+    "a.b*c y (done)",
+    "abbc y done",
+    "hi, bob",
+    "hi, bob\n",
+    "hi,\nbob",
+    "line\nnext",
+    "",
+]
+
+
+def check_without_literals(patterns: list[vbml.Pattern], s: str) -> dict | None:
+    for pattern in patterns:
+        match global_ctx.vbml_patcher.check(pattern, s):
+            case None | False:
+                continue
+            case {**response}:
+                return response
+        return {}
+    return None
+
+
+def test_check_string_agrees_with_unfiltered_checks() -> None:
+    for pattern in PATTERNS:
+        patterns = [vbml.Pattern(pattern, flags=global_ctx.vbml_pattern_flags)]
+        for text in TEXTS:
+            ctx = Context()
+            expected = check_without_literals(patterns, text)
+            assert check_string(patterns, text, ctx) is (expected is not None), (pattern, text)
+            assert dict(ctx) == dict(Context(**(expected or {}))), (pattern, text)
+
+
+def test_pattern_literals() -> None:
+    def literals(pattern: str) -> PatternLiterals:
+        return get_pattern_literals(vbml.Pattern(pattern, flags=global_ctx.vbml_pattern_flags))
+
+    assert literals("/start <arg>") == PatternLiterals("/start ", "")
+    assert literals("price: <amount>$") == PatternLiterals("price: ", "$")
+    assert literals("<greeting>, bob") == PatternLiterals("", ", bob")
+    assert literals("a.b*c <x> (done)") == PatternLiterals("a.b*c ", " (done)")
+    assert literals("/start").fit("/start\n")
+    assert not literals("/start").fit("/stop")
+
+
+async def test_markup_trigger_and_captures() -> None:
+    view, handled = Dispatch().message, []
+    rule = Markup(["/buy <item>", "/sell <item>"])
+
+    @view(rule)
+    async def trade(item: str) -> None:
+        handled.append(item)
+
+    for text in ("/buy milk", "/sell bread\n", "/gift tea"):
+        update = make_message_update(text)
+        await view.process(update, RecordingAPI(), Context(raw_update=update))
+
+    assert rule.get_trigger() == Trigger(TriggerKind.TEXT, frozenset(("/buy ", "/sell ")), prefix=True)
+    assert Markup(["/buy <item>", "<item>"]).get_trigger() is None
+    assert handled == ["milk", "bread"]
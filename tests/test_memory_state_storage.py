@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from mubble.tools.state_storage.abc import StateData
+from mubble.tools.state_storage.memory import MemoryStateStorage
+
+
+async def test_states_are_stored_and_deleted() -> None:
+    storage = MemoryStateStorage()
+    await storage.set(1, "start", {"step": 1})
+
+    assert (await storage.get(1)).unwrap() == StateData("start", {"step": 1})
+    assert not (await storage.get(2))
+
+    await storage.delete(1)
+    await storage.delete(1)
+    assert not (await storage.get(1))
+
+
+async def test_storage_is_unbounded_by_default() -> None:
+    storage = MemoryStateStorage(shards=2)
+    for user_id in range(20_000):
+        await storage.set(user_id, "start", {})
+
+    assert len(storage) == 20_000
+    assert storage.stats().maxsize is None
+    assert storage.evictions == 0
+
+
+async def test_least_recently_used_states_are_evicted_with_maxsize() -> None:
+    storage = MemoryStateStorage(maxsize=2, shards=1)
+    await storage.set(1, "a", {})
+    await storage.set(2, "b", {})
+    await storage.get(1)
+    await storage.set(3, "c", {})
+
+    assert [bool(await storage.get(user_id)) for user_id in (1, 2, 3)] == [True, False, True]
+    assert storage.stats().evictions == 1
+
+
+async def test_expired_states_are_not_counted() -> None:
+    storage = MemoryStateStorage(ttl=0.01)
+    await storage.set(1, "a", {})
+    await storage.set(2, "b", {})
+    assert len(storage) == 2
+
+    await asyncio.sleep(0.02)
+    assert len(storage) == 0
+    assert storage.stats().expirations == 2
+    assert not (await storage.get(1))
+
+
+def test_invalid_options_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        MemoryStateStorage(shards=0)
+    with pytest.raises(ValueError):
+        MemoryStateStorage(maxsize=0)
@@ -0,0 +1,84 @@
+import dataclasses
+import enum
+
+import msgspec
+
+from mubble.tools.callback_data_serilization import MsgPackSerializer, get_model_codec
+
+
+class Currency(enum.StrEnum):
+    USD = "USD"
+    EUR = "EUR"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Price:
+    amount: int
+    currency: str
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Item:
+    id: int
+    title: str
+    price: Price
+    tags: list[str]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Cart:
+    __key__ = "cart"
+
+    user_id: int
+    items: list[Item]
+    featured: Item | None = None
+
+
+class Node(msgspec.Struct):
+    value: int
+    children: list["Node"] = []
+
+
+class Catalog(msgspec.Struct):
+    prices: dict[str, Price]
+    currency: Currency
+
+
+CART = Cart(
+    user_id=1,
+    items=[Item(i, f"item {i}", Price(100 * i, "USD"), ["new"]) for i in range(3)],
+    featured=Item(10, "featured", Price(1000, "EUR"), []),
+)
+# Serialized by the generic `ModelParser` which preceded `ModelCodec`
+PREVIOUS_CART_DATA = "pWNhcnRfkwGTlACmaXRlbSAwkgCjVVNEkaNuZXeUAaZpdGVtIDGSZKNVU0SRo25ld5QCpml0ZW0gMpLMyKNVU0SRo25ld5QKqGZlYXR1cmVkks0D6KNFVVKQ"
+
+
+def test_nested_models_round_trip_in_the_previous_wire_format() -> None:
+    serializer = MsgPackSerializer(Cart)
+
+    assert serializer.serialize(CART) == PREVIOUS_CART_DATA
+    assert serializer.deserialize(PREVIOUS_CART_DATA).unwrap() == CART
+    assert serializer.deserialize(serializer.serialize(Cart(2, []))).unwrap() == Cart(2, [])
+
+
+def test_self_referencing_models_and_dicts_of_models_round_trip() -> None:
+    tree = Node(1, [Node(2), Node(3, [Node(4)])])
+    catalog = Catalog({"a": Price(1, "USD"), "b": Price(2, "EUR")}, Currency.EUR)
+
+    assert MsgPackSerializer(Node).deserialize(MsgPackSerializer(Node).serialize(tree)).unwrap() == tree
+    assert (
+        MsgPackSerializer(Catalog).deserialize(MsgPackSerializer(Catalog).serialize(catalog)).unwrap() == catalog
+    )
+
+
+def test_data_of_another_model_or_malformed_data_is_rejected() -> None:
+    serializer = MsgPackSerializer(Cart)
+
+    assert not serializer.deserialize(MsgPackSerializer(Price, ident_key="price").serialize(Price(1, "USD")))
+    assert not serializer.deserialize("not base64!")
+    assert not serializer.deserialize(PREVIOUS_CART_DATA[:-8])
+
+
+def test_codec_is_compiled_once_per_model() -> None:
+    assert get_model_codec(Cart) is get_model_codec(Cart)
+    assert get_model_codec(Cart).decode(get_model_codec(Cart).encode(CART)) == CART
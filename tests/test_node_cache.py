@@ -0,0 +1,86 @@
+import asyncio
+import gc
+import typing
+import weakref
+
+import pytest
+
+from mubble.bot.dispatch.context import Context
+from mubble.node.base import Node
+from mubble.node.cache import get_node_cache, invalidate_node
+from mubble.node.composer import compose_nodes
+from mubble.node.scope import NodeScope, global_node, per_chat
+from tests.helpers import make_message_update
+
+COMPOSED: list[int] = []
+
+
+@per_chat(maxsize=2)
+class ChatSettings(Node):
+    @classmethod
+    def compose(cls, ctx: Context) -> int:
+        chat_id = ctx.raw_update.message.unwrap().chat.id
+        COMPOSED.append(chat_id)
+        return chat_id
+
+
+@global_node(ttl=0.05)
+class Rates(Node):
+    @classmethod
+    async def compose(cls) -> int:
+        await asyncio.sleep(0.01)
+        COMPOSED.append(0)
+        return len(COMPOSED)
+
+
+async def compose_settings(chat_id: int) -> int:
+    update = make_message_update("hi", chat_id=chat_id)
+    return (
+        (await compose_nodes({"settings": ChatSettings}, Context(raw_update=update))).unwrap().values["settings"]
+    )
+
+
+async def test_per_chat_values_are_cached_by_chat_id() -> None:
+    COMPOSED.clear()
+    invalidate_node(ChatSettings)
+
+    assert [await compose_settings(chat_id) for chat_id in (10, 20, 10, 30, 20)] == [10, 20, 10, 30, 20]
+    assert COMPOSED == [10, 20, 30, 20]
+    assert get_node_cache(ChatSettings).stats().evictions == 2  # type: ignore
+
+    invalidate_node(ChatSettings, 20)
+    await compose_settings(20)
+    assert COMPOSED[-1] == 20
+
+
+def test_generator_nodes_cannot_be_cached() -> None:
+    class Connection(Node):
+        @classmethod
+        async def compose(cls) -> typing.AsyncGenerator[int, None]:
+            yield 1
+
+    with pytest.raises(TypeError):
+        per_chat(Connection)
+    with pytest.raises(TypeError):
+        global_node(ttl=10)(Connection)
+
+    Connection.scope = NodeScope.PER_USER
+    with pytest.raises(TypeError):
+        get_node_cache(Connection)
+
+
+async def test_expired_global_value_is_refreshed_without_the_event() -> None:
+    COMPOSED.clear()
+    invalidate_node(Rates)
+    assert (await compose_nodes({"rates": Rates}, Context())).unwrap().values["rates"] == 1
+    await asyncio.sleep(0.06)
+
+    ctx = Context()
+    ctx_ref = weakref.ref(ctx)
+    assert (await compose_nodes({"rates": Rates}, ctx)).unwrap().values["rates"] == 1
+    del ctx
+    gc.collect()
+    assert ctx_ref() is None
+
+    await asyncio.sleep(0.02)
+    assert (await compose_nodes({"rates": Rates}, Context())).unwrap().values["rates"] == 2
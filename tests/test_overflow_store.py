@@ -0,0 +1,128 @@
+import asyncio
+import contextlib
+import pathlib
+import sqlite3
+import threading
+import time
+
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.rules.payload import PayloadEqRule
+from mubble.tools.callback_data_serilization.overflow import (
+    OVERFLOW_PREFIX,
+    MemoryOverflowStore,
+    SQLiteOverflowStore,
+    fetch_callback_data,
+    pack_callback_data,
+    set_overflow_store,
+    unpack_callback_data,
+)
+from tests.helpers import RecordingAPI, make_callback_query_update
+
+LONG_DATA = "item/" + "x" * 100
+
+
+def count_rows(path: pathlib.Path) -> int:
+    with contextlib.closing(sqlite3.connect(path)) as connection:
+        return connection.execute("SELECT COUNT(*) FROM callback_data").fetchone()[0]
+
+
+def test_only_data_over_the_limit_is_stored() -> None:
+    store = MemoryOverflowStore()
+    set_overflow_store(store)
+    try:
+        packed = pack_callback_data(LONG_DATA)
+        assert packed.startswith(OVERFLOW_PREFIX)
+        assert len(packed.encode()) <= 64
+        assert pack_callback_data(LONG_DATA) == packed
+        assert unpack_callback_data(packed) == LONG_DATA
+        assert pack_callback_data("short") == "short"
+        assert unpack_callback_data(OVERFLOW_PREFIX + "missing") is None
+    finally:
+        set_overflow_store(None)
+
+
+async def test_sqlite_store_writes_behind(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "overflow.db"
+    store = SQLiteOverflowStore(path, flush_interval=0.02)
+    packed = store.pack(LONG_DATA)
+
+    assert count_rows(path) == 0
+    assert store.unpack(packed) == LONG_DATA
+
+    await asyncio.sleep(0.05)
+    assert count_rows(path) == 1
+    assert store.unpack(packed) == LONG_DATA
+    await store.close()
+
+
+async def test_sqlite_store_keeps_data_after_reopening(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "overflow.db"
+    store = SQLiteOverflowStore(path, flush_interval=60)
+    packed = store.pack(LONG_DATA)
+    await store.close()
+
+    store = SQLiteOverflowStore(path)
+    assert store.unpack(packed) == LONG_DATA
+    await store.close()
+
+
+def test_sqlite_store_writes_at_once_outside_of_event_loop(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "overflow.db"
+    store = SQLiteOverflowStore(path, ttl=0.01)
+    packed = store.pack(LONG_DATA)
+
+    assert count_rows(path) == 1
+    assert store.unpack(packed) == LONG_DATA
+    time.sleep(0.02)
+    assert store.unpack(packed) is None
+    asyncio.run(store.close())
+
+
+async def test_reads_are_not_blocked_by_the_writer(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "overflow.db"
+    store = SQLiteOverflowStore(path)
+    packed = store.pack(LONG_DATA)
+    await store.close()
+
+    store = SQLiteOverflowStore(path)
+    writing, release = threading.Event(), threading.Event()
+
+    def long_write() -> None:
+        with store._lock:
+            writing.set()
+            release.wait(1)
+
+    writer = asyncio.create_task(asyncio.to_thread(long_write))
+    await asyncio.to_thread(writing.wait, 1)
+    started = time.perf_counter()
+    assert await store.unpack_async(packed) == LONG_DATA
+    assert time.perf_counter() - started < 0.5
+    assert store.cache.get(packed.removeprefix(OVERFLOW_PREFIX)) is not None
+
+    release.set()
+    await writer
+    await store.close()
+
+
+async def test_overflowed_payload_selects_its_handler(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "overflow.db"
+    store = SQLiteOverflowStore(path)
+    packed = store.pack(LONG_DATA)
+    await store.close()
+
+    set_overflow_store(store := SQLiteOverflowStore(path))
+    try:
+        view, handled = Dispatch().callback_query, []
+
+        @view(PayloadEqRule(LONG_DATA))
+        async def handler() -> None:
+            handled.append(True)
+
+        update = make_callback_query_update(packed)
+        assert await fetch_callback_data(packed) == LONG_DATA
+        await view.process(update, RecordingAPI(), Context(raw_update=update))
+        assert handled == [True]
+    finally:
+        set_overflow_store(None)
+        await store.close()
@@ -0,0 +1,72 @@
+import dataclasses
+
+from mubble.bot.cute_types import CallbackQueryCute
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.rules.payload import PayloadModelRule
+from mubble.tools.callback_data_serilization import CompactMsgPackSerializer, JSONSerializer, MsgPackSerializer
+from tests.helpers import RecordingAPI, make_callback_query_update
+
+SERIALIZERS = (JSONSerializer, MsgPackSerializer, CompactMsgPackSerializer)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Buy:
+    __key__ = "buy"
+
+    item_id: int
+    count: int = 1
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Back:
+    __key__ = "back"
+
+    page: int
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Unkeyed:
+    value: str
+
+
+def test_serialized_data_starts_with_the_serializer_prefix() -> None:
+    for serializer_type in SERIALIZERS:
+        serializer = serializer_type(Buy)
+        prefix = serializer.get_prefix()
+
+        assert prefix
+        for data in (Buy(0), Buy(1, 2), Buy(10**9, 255)):
+            assert serializer.serialize(data).startswith(prefix)
+
+    assert JSONSerializer(Unkeyed).get_prefix() is None
+    assert MsgPackSerializer(Unkeyed).get_prefix() is None
+
+
+async def test_only_handlers_of_the_payload_key_are_selected() -> None:
+    for serializer_type in SERIALIZERS:
+        view, handled = Dispatch().callback_query, []
+
+        @view(PayloadModelRule(Back, serializer=serializer_type))
+        async def back(model: Back) -> None:
+            handled.append(model)
+
+        @view(PayloadModelRule(Buy, serializer=serializer_type))
+        async def buy(model: Buy) -> None:
+            handled.append(model)
+
+        update = make_callback_query_update(serializer_type(Buy).serialize(Buy(7, 2)))
+        selected = await view.handler_index.select(update, Context(raw_update=update))  # type: ignore
+        assert [handler.function.__name__ for handler in selected] == ["buy"]
+
+        await view.process(update, RecordingAPI(), Context(raw_update=update))
+        assert handled == [Buy(7, 2)]
+
+
+def test_decoded_data_is_cached_per_target_type() -> None:
+    update = make_callback_query_update('{"page": 2}')
+    callback_query = CallbackQueryCute.from_update(update.callback_query.unwrap(), RecordingAPI())
+
+    assert callback_query.decode_data().unwrap() == {"page": 2}
+    assert callback_query.decode_data(to=Back).unwrap() == Back(2)
+    assert callback_query.decode_data(to=str).unwrap() == '{"page": 2}'
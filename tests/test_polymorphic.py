@@ -0,0 +1,57 @@
+from mubble.api.api import API
+from mubble.bot.cute_types import CallbackQueryCute, MessageCute
+from mubble.bot.dispatch.context import Context
+from mubble.node.composer import compose_nodes
+from mubble.node.polymorphic import Polymorphic, get_event_implementations, impl
+from mubble.node.source import Source
+from mubble.types.objects import CallbackQuery, Message, Update
+from tests.helpers import RecordingAPI, make_callback_query_update, make_message_update
+
+TRIED: list[str] = []
+
+
+class Kind(Polymorphic):
+    @impl
+    def compose_message(cls, message: MessageCute) -> str:
+        TRIED.append("message")
+        return "message"
+
+    @impl
+    def compose_callback_query(cls, callback_query: CallbackQueryCute) -> str:
+        TRIED.append("callback_query")
+        return "callback_query"
+
+    @impl
+    def compose_any(cls) -> str:
+        TRIED.append("any")
+        return "any"
+
+
+async def compose(node: type, update: Update) -> object:
+    data = {Update: update, API: RecordingAPI()}
+    return (await compose_nodes({"value": node}, Context(raw_update=update), data)).unwrap().values["value"]
+
+
+def test_implementations_are_selected_by_event_type() -> None:
+    assert [impl_.__name__ for _, impl_ in get_event_implementations(Kind, Message)] == [
+        "compose_message",
+        "compose_any",
+    ]
+    assert [i for i, _ in get_event_implementations(Kind, CallbackQuery)] == [1, 2]
+    assert get_event_implementations(Kind, Message) is get_event_implementations(Kind, Message)
+
+
+async def test_only_implementations_of_the_event_are_tried() -> None:
+    TRIED.clear()
+
+    assert await compose(Kind, make_callback_query_update("data")) == "callback_query"
+    assert await compose(Kind, make_message_update("hi")) == "message"
+    assert TRIED == ["callback_query", "message"]
+
+
+async def test_source_is_composed_for_callback_queries() -> None:
+    source = await compose(Source, make_callback_query_update("data", user_id=7))
+
+    assert isinstance(source, Source)
+    assert source.from_user.id == 7
+    assert source.chat.unwrap().id == 7
@@ -0,0 +1,93 @@
+import random
+import re
+
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.index import Trigger, TriggerKind
+from mubble.bot.rules.regex import Regex
+from mubble.tools.regex_set import RegexSet, compile_batches, get_literal_prefix
+from tests.helpers import RecordingAPI, make_message_update
+
+PATTERNS = [
+    r"/start(?: (?P<arg>\w+))?",
+    r"(?i)hello",
+    r"(\d+)-(\d+)",
+    r"(?P<arg>[a-z]+)@(?P<domain>[a-z.]+)",
+    r"(a)\1",
+    r"price: (?P<price>\d+)\$",
+    r"[abc]+x",
+    r"(?x) b  c  d",
+    r".*",
+]
+TEXTS = ["/start", "/start now", "HeLLo", "12-34", "bob@mail.com", "aa", "price: 10$", "abcx", "bcd", "", "zzz"]
+
+
+def sequential_match(patterns: list[re.Pattern[str]], text: str, start: int) -> tuple | None:
+    for index, pattern in enumerate(patterns[start:], start=start):
+        if match := pattern.match(text):
+            return (index, match.group(), match.groups(), match.groupdict())
+    return None
+
+
+def test_finds_the_same_first_match_as_sequential_matching() -> None:
+    regex_set = RegexSet(PATTERNS)
+    rng = random.Random(0)
+    texts = [*TEXTS, *("".join(rng.choices("abcdx@.-/1 $", k=rng.randint(0, 8))) for _ in range(300))]
+
+    for text in texts:
+        for start in range(len(PATTERNS)):
+            match = regex_set.match(text, start)
+            expected = sequential_match(regex_set.patterns, text, start)
+            actual = match and (match.index, match.group(), match.groups(), match.groupdict())
+            assert actual == expected, (text, start)
+
+
+def test_batches_are_split_by_flags_names_and_references() -> None:
+    batches = compile_batches([re.compile(pattern) for pattern in PATTERNS])
+
+    assert [(batch.start, batch.stop) for batch in batches] == [
+        (0, 1),
+        (1, 2),
+        (2, 4),
+        (4, 5),
+        (5, 7),
+        (7, 8),
+        (8, 9),
+    ]
+
+    batches = compile_batches([re.compile(r"(?P<a>x)"), re.compile(r"(?P<b>y)"), re.compile(r"(?P<a>z)")])
+    assert [(batch.start, batch.stop) for batch in batches] == [(0, 2), (2, 3)]
+
+
+def test_literal_prefixes() -> None:
+    assert get_literal_prefix(re.compile(r"/start(?: \w+)?")) == "/start"
+    assert get_literal_prefix(re.compile(r"^price\: \d")) == "price: "
+    assert get_literal_prefix(re.compile(r"abc?")) == "ab"
+    assert get_literal_prefix(re.compile(r"a|b")) == ""
+    assert get_literal_prefix(re.compile(r"abc", re.IGNORECASE)) == ""
+
+
+def test_regex_trigger_requires_a_prefix_for_every_pattern() -> None:
+    assert Regex([r"/buy \w+", r"/sell"]).get_trigger() == Trigger(
+        TriggerKind.TEXT, frozenset(("/buy ", "/sell")), prefix=True
+    )
+    assert Regex([r"/buy \w+", r"\d+"]).get_trigger() is None
+
+
+async def test_regex_rules_share_one_set() -> None:
+    regex_set, view, handled = RegexSet(), Dispatch().message, []
+
+    @view(Regex(r"/buy (?P<item>\w+)", regex_set=regex_set))
+    async def buy(item: str) -> None:
+        handled.append(("buy", item))
+
+    @view(Regex([r"(\d+)\+(\d+)", r"(\d+)"], regex_set=regex_set))
+    async def add(matches: tuple) -> None:
+        handled.append(("add", matches))
+
+    for text in ("/buy milk", "2+3", "7", "nothing"):
+        update = make_message_update(text)
+        await view.process(update, RecordingAPI(), Context(raw_update=update))
+
+    assert len(regex_set) == 3
+    assert handled == [("buy", "milk"), ("add", ("2", "3")), ("add", ("7",))]
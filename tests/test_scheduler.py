@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from mubble.bot.dispatch.scheduler import DEFAULT_LANE_NAME, DEFAULT_LANES, Lane, LaneScheduler
+from mubble.types.enums import UpdateType
+from tests.helpers import make_callback_query_update, make_message_update, make_pre_checkout_query_update
+
+PAYMENTS = Lane("payments", frozenset({UpdateType.PRE_CHECKOUT_QUERY}), priority=1, concurrency=2, reserved=1)
+
+
+class Feeder:
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.fed: list[UpdateType] = []
+
+    async def __call__(self, update) -> None:
+        await self.release.wait()
+        self.fed.append(update.update_type)
+
+
+def test_routes_update_types_to_lanes() -> None:
+    scheduler = LaneScheduler()
+
+    assert scheduler.get_lane(UpdateType.PRE_CHECKOUT_QUERY).name == "payments"
+    assert scheduler.get_lane(UpdateType.CALLBACK_QUERY).name == "interactive"
+    assert scheduler.get_lane(UpdateType.MESSAGE).name == DEFAULT_LANE_NAME
+
+
+async def test_reserved_slots_are_kept_for_higher_priority_lanes() -> None:
+    scheduler = LaneScheduler((PAYMENTS,), default_lane=Lane(DEFAULT_LANE_NAME, concurrency=4), max_concurrency=4)
+    feeder = Feeder()
+
+    for update_id in range(10):
+        scheduler.submit(make_message_update("flood", update_id=update_id), feeder)
+    assert scheduler.stats()[DEFAULT_LANE_NAME].active == 3
+
+    scheduler.submit(make_pre_checkout_query_update("payload"), feeder)
+    assert scheduler.stats()["payments"].active == 1
+
+    feeder.release.set()
+    await scheduler.join()
+    assert feeder.fed.count(UpdateType.MESSAGE) == 10
+    assert scheduler.stats()["payments"].processed == 1
+
+
+async def test_default_lanes_reserve_payments_slots() -> None:
+    scheduler = LaneScheduler(max_concurrency=256)
+    feeder = Feeder()
+
+    for update_id in range(300):
+        scheduler.submit(make_message_update("flood", update_id=update_id), feeder)
+        scheduler.submit(make_callback_query_update("data", update_id=update_id), feeder)
+    scheduler.submit(make_pre_checkout_query_update("payload"), feeder)
+
+    assert scheduler.stats()["payments"].active == 1
+    feeder.release.set()
+    await scheduler.join()
+
+
+async def test_higher_priority_lane_takes_free_slots_first() -> None:
+    scheduler = LaneScheduler((PAYMENTS,), max_concurrency=2)
+    feeder = Feeder()
+
+    scheduler.submit(make_message_update("first"), feeder)
+    scheduler.submit(make_message_update("second"), feeder)
+    scheduler.submit(make_pre_checkout_query_update("payload"), feeder)
+    feeder.release.set()
+    await scheduler.join()
+
+    assert feeder.fed == [UpdateType.MESSAGE, UpdateType.PRE_CHECKOUT_QUERY, UpdateType.MESSAGE]
+
+
+async def test_failed_feed_is_counted_and_does_not_stop_the_lane() -> None:
+    async def feed(update) -> None:
+        raise RuntimeError("failed")
+
+    scheduler = LaneScheduler()
+    scheduler.submit(make_message_update("first"), feed)
+    scheduler.submit(make_message_update("second"), feed)
+    await scheduler.join()
+
+    stats = scheduler.stats()[DEFAULT_LANE_NAME]
+    assert (stats.processed, stats.active, stats.pending) == (2, 0, 0)
+    assert stats.p50 is not None
+
+
+def test_lanes_are_validated() -> None:
+    with pytest.raises(ValueError):
+        LaneScheduler((Lane(DEFAULT_LANE_NAME),))
+    with pytest.raises(ValueError):
+        LaneScheduler((PAYMENTS,), max_concurrency=1)
+
+
+def test_default_lanes_fit_a_small_max_concurrency() -> None:
+    assert LaneScheduler().lanes[:2] == DEFAULT_LANES
+
+    for max_concurrency in (1, 2, 16, 24, 64):
+        scheduler = LaneScheduler(max_concurrency=max_concurrency)
+        assert sum(lane.reserved for lane in scheduler.lanes) < max_concurrency
+        assert all(1 <= lane.concurrency <= max_concurrency for lane in scheduler.lanes)
+        assert scheduler.get_lane(UpdateType.CALLBACK_QUERY).name == "interactive"
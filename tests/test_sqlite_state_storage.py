@@ -0,0 +1,113 @@
+import asyncio
+import enum
+import pathlib
+import sqlite3
+import threading
+
+import pytest
+
+from mubble.tools.state_storage.abc import StateData
+from mubble.tools.state_storage.sqlite import SQLiteStateStorage
+
+
+class Step(enum.StrEnum):
+    NAME = "name"
+
+
+def count_rows(path: pathlib.Path) -> int:
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM states").fetchone()[0]
+
+
+async def test_changes_are_written_behind(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "states.db"
+    storage = SQLiteStateStorage(path, flush_interval=0.02)
+    await storage.set(1, Step.NAME, {"tries": 1})
+    await storage.set(2, "age", {})
+    await storage.delete(2)
+
+    assert (await storage.get(1)).unwrap() == StateData(Step.NAME, {"tries": 1})
+    assert not (await storage.get(2))
+    assert count_rows(path) == 0
+
+    await asyncio.sleep(0.05)
+    assert count_rows(path) == 1
+    await storage.close()
+
+
+async def test_changes_are_flushed_when_the_buffer_is_full(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "states.db"
+    storage = SQLiteStateStorage(path, flush_interval=60, flush_size=10)
+    for user_id in range(10):
+        await storage.set(user_id, "start", {})
+
+    await asyncio.sleep(0.05)
+    assert count_rows(path) == 10
+    await storage.close()
+
+
+async def test_states_are_read_back_after_reopening(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "states.db"
+    storage = SQLiteStateStorage(path)
+    await storage.set(1, Step.NAME, {"name": "bob"})
+    await storage.set(2, "age", {"age": 30})
+    await storage.close()
+
+    storage = SQLiteStateStorage(path)
+    assert (await storage.get(1)).unwrap() == StateData("name", {"name": "bob"})
+    assert await storage.get_many([1, 2, 3]) == {
+        1: StateData("name", {"name": "bob"}),
+        2: StateData("age", {"age": 30}),
+    }
+    assert 3 in storage.cache
+    await storage.close()
+
+
+async def test_failed_write_keeps_the_changes(tmp_path: pathlib.Path) -> None:
+    storage = SQLiteStateStorage(tmp_path / "states.db", flush_interval=60)
+    write = storage._write
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def flaky_write(changes: dict) -> None:
+        if failures:
+            raise failures.pop()
+        write(changes)
+
+    storage._write = flaky_write  # type: ignore
+    await storage.set(1, "start", {})
+    with pytest.raises(sqlite3.OperationalError):
+        await storage.flush()
+
+    await storage.set(2, "start", {})
+    await storage.flush()
+    assert count_rows(tmp_path / "states.db") == 2
+    await storage.close()
+
+
+async def test_changes_made_while_reading_are_not_overwritten_by_the_read(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "states.db"
+    storage = SQLiteStateStorage(path)
+    await storage.set(1, "old", {})
+    await storage.close()
+
+    storage = SQLiteStateStorage(path, flush_interval=60)
+    select, reading, release = storage._select, threading.Event(), threading.Event()
+
+    def blocked_select(user_ids: list[int]) -> list:
+        # The rows are read, the result is returned after the change is written
+        rows = select(user_ids)
+        reading.set()
+        release.wait(1)
+        return rows
+
+    storage._select = blocked_select  # type: ignore
+    get = asyncio.create_task(storage.get(1))
+    await asyncio.to_thread(reading.wait, 1)
+    await storage.set(1, "new", {})
+    await storage.flush()
+    release.set()
+
+    assert (await get).unwrap().key == "new"
+    assert (await storage.get(1)).unwrap().key == "new"
+    assert 1 in storage.cache
+    await storage.close()
@@ -0,0 +1,123 @@
+from mubble.bot.dispatch import Dispatch
+from mubble.bot.dispatch.context import Context
+from mubble.bot.dispatch.process import CONTEXT_STORE_STATES_KEY
+from mubble.bot.rules.state import StateMeta, get_user_state
+from mubble.bot.rules.text import HasText
+from mubble.tools.state_storage.memory import MemoryStateStorage
+from tests.helpers import RecordingAPI, make_message_update
+
+USER_ID = 1
+
+
+class CountingStorage(MemoryStateStorage):
+    def __init__(self) -> None:
+        super().__init__()
+        self.fetched = 0
+
+    async def get(self, user_id: int):
+        self.fetched += 1
+        return await super().get(user_id)
+
+
+async def feed(view, text: str = "text") -> None:
+    update = make_message_update(text, user_id=USER_ID)
+    await view.process(update, RecordingAPI(), Context(raw_update=update))
+
+
+async def test_storage_writes_are_counted() -> None:
+    storage = MemoryStateStorage()
+
+    await storage.set(USER_ID, "key", {})
+    await storage.delete(USER_ID)
+    assert storage.version == 2
+
+
+async def test_user_state_is_cached_per_event_until_written() -> None:
+    storage, ctx = CountingStorage(), Context()
+    ctx[CONTEXT_STORE_STATES_KEY] = {}
+
+    assert not await get_user_state(storage, USER_ID, ctx)
+    assert not await get_user_state(storage, USER_ID, ctx)
+    assert storage.fetched == 1
+
+    await storage.set(USER_ID, "key", {})
+    assert (await get_user_state(storage, USER_ID, ctx)).unwrap().key == "key"
+    assert storage.fetched == 2
+
+
+async def test_state_set_by_non_final_handler_is_seen_by_next_handlers() -> None:
+    storage, view, handled = MemoryStateStorage(), Dispatch().message, []
+
+    @view(storage.State(StateMeta.NO_STATE), final=False)
+    async def start() -> None:
+        handled.append("start")
+        await storage.set(USER_ID, "name", {})
+
+    @view(HasText(), final=False)
+    async def any_text() -> None:
+        handled.append("any_text")
+
+    @view(storage.State(StateMeta.NO_STATE))
+    async def still_without_state() -> None:
+        handled.append("still_without_state")
+
+    @view(storage.State("name"))
+    async def name() -> None:
+        handled.append("name")
+
+    await feed(view)
+    assert handled == ["start", "any_text", "name"]
+
+
+async def test_state_changes_without_index() -> None:
+    storage, view, handled = MemoryStateStorage(), Dispatch().message, []
+    view.index_handlers = False
+
+    @view(storage.State(StateMeta.NO_STATE), final=False)
+    async def start() -> None:
+        handled.append("start")
+        await storage.set(USER_ID, "name", {})
+
+    @view(storage.State(StateMeta.NO_STATE))
+    async def still_without_state() -> None:
+        handled.append("still_without_state")
+
+    @view(storage.State("name"))
+    async def name() -> None:
+        handled.append("name")
+
+    await feed(view)
+    assert handled == ["start", "name"]
+
+
+async def test_state_handlers_are_selected_by_the_user_state_key() -> None:
+    storage, view, handled = CountingStorage(), Dispatch().message, []
+    for i in range(100):
+
+        async def step(i: int = i) -> None:
+            handled.append(i)
+
+        view(storage.State(f"step_{i}"))(step)
+
+    @view(storage.State(StateMeta.ANY), final=False)
+    async def any_state() -> None:
+        handled.append("any_state")
+
+    await storage.set(USER_ID, "step_42", {})
+    update = make_message_update("text", user_id=USER_ID)
+    selected = await view.handler_index.select(update, Context(**{CONTEXT_STORE_STATES_KEY: {}}))  # type: ignore
+    assert [handler.function.__name__ for handler in selected] == ["step", "any_state"]
+
+    storage.fetched = 0
+    await feed(view)
+    assert handled == [42]
+    assert storage.fetched == 1
+
+    await storage.delete(USER_ID)
+    await feed(view)
+    assert handled == [42]
+    assert storage.fetched == 2
+
+    await storage.set(USER_ID, "unknown", {})
+    await feed(view)
+    assert handled == [42, "any_state"]
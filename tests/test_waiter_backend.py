@@ -0,0 +1,178 @@
+import asyncio
+import time
+import typing
+
+import pytest
+
+from mubble.bot.dispatch.view.message import MessageView
+from mubble.bot.dispatch.waiter_machine.backend import ABCWaiterBackend, RedisWaiterBackend, SQLiteWaiterBackend
+from mubble.bot.dispatch.waiter_machine.backend.redis import RedisConnection
+from mubble.bot.dispatch.waiter_machine.hasher.message import MESSAGE_FROM_USER
+from mubble.bot.dispatch.waiter_machine.hasher.state import StateViewHasher
+from mubble.bot.dispatch.waiter_machine.machine import WaiterMachine
+from mubble.msgspec_utils import decoder
+from mubble.types.objects import Update
+from tests.helpers import make_message_update
+
+type Reply = bytes | int | list[Reply] | None
+
+
+class RedisStandIn:
+    """Local server speaking the subset of the Redis protocol used by `RedisWaiterBackend`."""
+
+    def __init__(self) -> None:
+        self.values: dict[bytes, tuple[bytes, float | None]] = {}
+        self.sets: dict[bytes, set[bytes]] = {}
+        self.lists: dict[bytes, list[bytes]] = {}
+        self.pushed = asyncio.Condition()
+        self.server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+
+    def get(self, key: bytes) -> bytes | None:
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.time():
+            del self.values[key]
+            return None
+        return value
+
+    @staticmethod
+    def encode(reply: Reply) -> bytes:
+        match reply:
+            case None:
+                return b"$-1\r\n"
+            case int():
+                return b":%d\r\n" % reply
+            case bytes():
+                return b"$%d\r\n%s\r\n" % (len(reply), reply)
+            case list():
+                return b"*%d\r\n" % len(reply) + b"".join(map(RedisStandIn.encode, reply))
+
+    async def execute(self, command: bytes, *args: bytes) -> Reply:
+        match command.upper(), args:
+            case b"SET", (key, value):
+                self.values[key] = (value, None)
+            case b"SET", (key, value, b"PXAT", expires_at):
+                self.values[key] = (value, int(expires_at) / 1000)
+            case b"GET", (key,):
+                return self.get(key)
+            case b"DEL", keys:
+                return sum(
+                    any(storage.pop(key, None) is not None for storage in (self.values, self.sets, self.lists))
+                    for key in keys
+                )
+            case b"SADD", (key, member):
+                self.sets.setdefault(key, set()).add(member)
+            case b"SREM", (key, member):
+                self.sets.get(key, set()).discard(member)
+            case b"SMEMBERS", (key,):
+                return list(self.sets.get(key, ()))
+            case b"RPUSH", (key, value):
+                self.lists.setdefault(key, []).append(value)
+                async with self.pushed:
+                    self.pushed.notify_all()
+            case b"BLPOP", (key, timeout):
+                try:
+                    async with self.pushed:
+                        await asyncio.wait_for(self.pushed.wait_for(lambda: self.lists.get(key)), float(timeout))
+                except TimeoutError:
+                    return None
+                return [key, self.lists[key].pop(0)]
+            case _:
+                raise AssertionError(f"Unexpected command {command!r} {args!r}")
+        return 1
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while line := await reader.readline():
+            args = []
+            for _ in range(int(line[1:-2])):
+                length = int((await reader.readline())[1:-2])
+                args.append((await reader.readexactly(length + 2))[:-2])
+            writer.write(self.encode(await self.execute(*args)))
+            await writer.drain()
+        writer.close()
+
+
+@pytest.fixture(params=["redis", "sqlite"])
+async def backend(request: pytest.FixtureRequest, tmp_path: typing.Any) -> typing.AsyncIterator[ABCWaiterBackend]:
+    if request.param == "sqlite":
+        backend = SQLiteWaiterBackend(tmp_path / "waiters.db", poll_interval=0.01)
+        yield backend
+        await backend.close()
+        return
+
+    server = RedisStandIn()
+    backend = RedisWaiterBackend("127.0.0.1", await server.start(), block_timeout=1)
+    yield backend
+    await backend.close()
+    await server.stop()
+
+
+async def test_waiters_are_owned_by_the_registering_process(backend: ABCWaiterBackend) -> None:
+    await backend.register("hasher", "1", "a")
+    await backend.register("hasher", "2", "a", expires_at=time.time() - 1)
+    assert await backend.get_owner("hasher", "1") == "a"
+    assert await backend.get_owner("hasher", "2") is None
+
+    await backend.unregister("hasher", "1", "b")
+    assert await backend.get_owner("hasher", "1") == "a"
+    await backend.unregister("hasher", "1", "a")
+    assert await backend.get_owner("hasher", "1") is None
+
+    await backend.register("hasher", "3", "a")
+    await backend.drop_owner("a")
+    assert await backend.get_owner("hasher", "3") is None
+
+
+async def test_updates_are_sent_to_the_owner(backend: ABCWaiterBackend) -> None:
+    await backend.notify("a", b"first")
+    await backend.notify("a", b"second")
+    updates = backend.listen("a")
+
+    assert await asyncio.wait_for(anext(updates), 1) == b"first"
+    assert await asyncio.wait_for(anext(updates), 1) == b"second"
+
+
+async def test_update_is_forwarded_to_the_machine_which_waits(backend: ABCWaiterBackend) -> None:
+    owner = WaiterMachine(backend=backend, owner="owner")
+    other = WaiterMachine(backend=backend, owner="other")
+    waiter = asyncio.create_task(owner.wait(MESSAGE_FROM_USER, 1, lifetime=10))
+    await asyncio.sleep(0.01)
+
+    update = make_message_update("hi", user_id=1, update_id=10)
+    assert await other.forward(MESSAGE_FROM_USER, 1, update)
+    assert not await other.forward(MESSAGE_FROM_USER, 2, update)
+    forwarded = await asyncio.wait_for(anext(backend.listen("owner")), 1)
+    assert decoder.decode(forwarded, type=Update).update_id == 10
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+
+async def test_cancelled_command_does_not_leave_its_reply_to_the_next_one() -> None:
+    server = RedisStandIn()
+    connection = RedisConnection("127.0.0.1", await server.start())
+    await connection.execute("SET", "key", "value")
+
+    blpop = asyncio.create_task(connection.execute("BLPOP", "updates", 1))
+    await asyncio.sleep(0.05)
+    blpop.cancel()
+    await asyncio.gather(blpop, return_exceptions=True)
+
+    assert await asyncio.wait_for(connection.execute("GET", "key"), 0.5) == b"value"
+    await connection.close()
+    await server.stop()
+
+
+def test_state_hashers_of_different_views_are_different() -> None:
+    first, second = MessageView(), MessageView()
+
+    assert StateViewHasher(first) == StateViewHasher(first)
+    assert StateViewHasher(first) != StateViewHasher(second)
+    assert StateViewHasher(first, name="messages") == StateViewHasher(second, name="messages")
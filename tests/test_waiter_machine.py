@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from mubble.bot.dispatch.waiter_machine.hasher.message import MESSAGE_FROM_USER, MESSAGE_IN_CHAT
+from mubble.bot.dispatch.waiter_machine.machine import WaiterMachine
+
+
+async def wait(wm: WaiterMachine, user_id: int, lifetime: float, dropped: list[int]) -> asyncio.Task[object]:
+    task = asyncio.create_task(
+        wm.wait(MESSAGE_FROM_USER, user_id, lifetime=lifetime, on_drop=lambda _: dropped.append(user_id)),
+    )
+    await asyncio.sleep(0)
+    return task
+
+
+async def test_waiters_are_dropped_on_time_in_expiration_order() -> None:
+    wm = WaiterMachine()
+    dropped: list[int] = []
+    late = await wait(wm, 1, 0.08, dropped)
+    early = await wait(wm, 2, 0.03, dropped)
+    kept = await wait(wm, 3, 60, dropped)
+
+    await asyncio.sleep(0.05)
+    assert dropped == [2]
+    with pytest.raises(asyncio.CancelledError):
+        await early
+
+    await asyncio.sleep(0.05)
+    assert dropped == [2, 1]
+    assert late.cancelled()
+    assert list(wm.storage[MESSAGE_FROM_USER]) == [3]
+
+    await wm.drop_all()
+    await asyncio.gather(kept, return_exceptions=True)
+    assert kept.cancelled()
+    assert dropped == [2, 1]
+
+
+async def test_wait_many_is_dropped_once() -> None:
+    wm = WaiterMachine()
+    dropped: list[object] = []
+    task = asyncio.create_task(
+        wm.wait_many((MESSAGE_FROM_USER, 1), (MESSAGE_IN_CHAT, 1), lifetime=0.02, on_drop=dropped.append),
+    )
+    await asyncio.sleep(0.05)
+
+    assert len(dropped) == 1
+    assert task.cancelled()
+    assert not wm.storage[MESSAGE_FROM_USER] and not wm.storage[MESSAGE_IN_CHAT]
+
+
+async def test_released_waiters_do_not_pile_up_in_the_heap() -> None:
+    wm = WaiterMachine()
+    dropped: list[int] = []
+    tasks = [await wait(wm, user_id, 60, dropped) for user_id in range(100)]
+
+    for user_id in range(100):
+        await wm.drop(MESSAGE_FROM_USER, user_id)
+
+    assert dropped == list(range(100))
+    assert len(wm._expirations) <= 50
+    assert await wm.drop_expired() == 0
+    await asyncio.gather(*tasks, return_exceptions=True)